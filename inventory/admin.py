@@ -1,29 +1,36 @@
 # inventory/admin.py (production-ready, deduped + map column)
 from __future__ import annotations
 
+import csv
 import io
 import json
 import logging
-import uuid
 import zipfile
 from datetime import timedelta
 from typing import Any, Dict, Optional
 
 from django import forms
+from django.conf import settings
 from django.contrib import admin, messages
-from django.contrib.admin import AdminSite
+from django.contrib.admin import AdminSite, helpers
+from django.contrib.admin.views.main import ChangeList
 from django.core.cache import cache
-from django.core.files.base import ContentFile
-from django.db.models import Count, Q, QuerySet
-from django.http import FileResponse, HttpRequest, HttpResponse, JsonResponse
-from django.shortcuts import get_object_or_404, render
+from django.db import transaction
+from django.db.models import Case, Count, Q, QuerySet, Value, When
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import path, reverse
 from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.text import slugify
 
 from . import views_admin_workflow as wf
+from .device_moves import bulk_relocate, bulk_set_status
+from .geo.admin_units import fix_location_admin_units
 from .pdf_passport import generate_device_passport_pdf_bytes
+from .qr_images import evict_qr_images
+from .qr_labels import QR_LABELS_ADMIN_MAX, build_qr_labels_file
+from .qr_render import enqueue_qr_render, qr_batch_progress, queue_qr_regeneration, regenerate_qr
 from .reports_hub_compat import (
     reports_hub_view,
     reports_chart_json,
@@ -37,6 +44,7 @@ from .reports_hub_compat import (
     reports_export_auth_audit_csv,
     reports_table_json,
 )
+from .serials import find_devices_by_serial, normalize_serial
 from .views_dashboard_general import general_dashboard_view
 
 from .models import (
@@ -47,6 +55,7 @@ from .models import (
     InstrumentCatalog,
     Device,
     DeviceMovement,
+    DeviceStatusChange,
     MaintenanceService,
     ControlAdjustment,
     MaintenanceEvidence,
@@ -55,6 +64,7 @@ from .models import (
     SparePartItem,
     UserProfile,
     AuthAuditLog,
+    QrRenderJob,
 )
 
 logger = logging.getLogger(__name__)
@@ -273,12 +283,13 @@ class VerificationBucketFilter(admin.SimpleListFilter):
 # ============================================================
 # QR Actions (lazy-import qrcode)
 # ============================================================
+# Үүнээс олон багаж сонгосон бол generate_qr нь background (QrRenderJob) горимд шилжинэ
+QR_INLINE_LIMIT = 200
 
 @admin.action(description="🔳 QR үүсгэх / шинэчлэх")
 def generate_qr(modeladmin, request: HttpRequest, queryset: QuerySet):
     try:
-        import qrcode  # type: ignore
-        from qrcode.constants import ERROR_CORRECT_M  # type: ignore
+        import qrcode  # type: ignore  # noqa: F401
     except Exception:
         modeladmin.message_user(
             request,
@@ -287,41 +298,23 @@ def generate_qr(modeladmin, request: HttpRequest, queryset: QuerySet):
         )
         return
 
-    for d in queryset:
-        if not getattr(d, "qr_token", None):
-            d.qr_token = uuid.uuid4()
-
-        if hasattr(d, "qr_revoked_at"):
-            d.qr_revoked_at = None
-        if hasattr(d, "qr_expires_at"):
-            d.qr_expires_at = timezone.now() + timedelta(days=365)
-
-        try:
-            rel = reverse("inventory:qr_device_lookup", args=[d.qr_token])
-        except Exception:
-            rel = f"/qr/device/{d.qr_token}/"
-        url = request.build_absolute_uri(rel)
-
-        qr = qrcode.QRCode(version=None, error_correction=ERROR_CORRECT_M, box_size=10, border=2)
-        qr.add_data(url)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        buf.seek(0)
-
-        serial = (getattr(d, "serial_number", "") or "").strip()
-        base_name = slugify(serial)[:40] if serial else f"device_{d.pk}"
-        filename = f"qr/devices/{base_name}_{d.qr_token}.png"
-
-        if getattr(d, "qr_image", None) is not None:
-            d.qr_image.save(filename, ContentFile(buf.getvalue()), save=False)
-
-        update_fields = [f for f in ("qr_token", "qr_image", "qr_revoked_at", "qr_expires_at") if hasattr(d, f)]
-        d.save(update_fields=update_fields or None)
+    # Том сонголт (аймаг бүхэлдээ г.м.): request timeout-оос сэргийлж worker-т өгнө
+    if queryset.count() > QR_INLINE_LIMIT:
+        batch, queued = queue_qr_regeneration(queryset)
+        url = reverse(f"{modeladmin.admin_site.name}:inventory_qrrenderjob_progress", args=[batch])
+        modeladmin.message_user(
+            request,
+            format_html('QR дараалалд орлоо: {} багаж. <a href="{}">Явцыг харах</a> (process_qr_jobs worker зурна)', queued, url),
+            level=messages.SUCCESS,
+        )
+        return
 
-    modeladmin.message_user(request, f"QR үүсгэлээ: {queryset.count()} багаж", level=messages.SUCCESS)
+    total, errors = regenerate_qr(queryset)
+    modeladmin.message_user(request, f"QR үүсгэлээ: {total} багаж", level=messages.SUCCESS)
+    if errors:
+        modeladmin.message_user(
+            request, f"QR зурж чадсангүй: {len(errors)} багаж — дараалалд орууллаа.", level=messages.WARNING
+        )
 
 
 @admin.action(description="⛔ QR хүчингүй болгох")
@@ -330,8 +323,11 @@ def revoke_qr(modeladmin, request: HttpRequest, queryset: QuerySet):
         modeladmin.message_user(request, "Device дээр qr_revoked_at талбар алга байна.", level=messages.WARNING)
         return
     now = timezone.now()
+    tokens = list(queryset.values_list("qr_token", flat=True))
     queryset.update(qr_revoked_at=now)
-    modeladmin.message_user(request, f"QR хүчингүй болголоо: {queryset.count()} багаж", level=messages.SUCCESS)
+    # Хүчингүй token-ий кэшлэгдсэн зургийг (LRU + диск) commit-ийн дараа устгана
+    transaction.on_commit(lambda: evict_qr_images(tokens))
+    modeladmin.message_user(request, f"QR хүчингүй болголоо: {len(tokens)} багаж", level=messages.SUCCESS)
 
 
 # ============================================================
@@ -367,6 +363,127 @@ def download_device_passport(modeladmin, request: HttpRequest, queryset: QuerySe
     return resp
 
 
+@admin.action(description="🏷️ QR шошго (A4, PDF)")
+def print_qr_labels(modeladmin, request: HttpRequest, queryset: QuerySet):
+    # PDF-ийг бүтнээр нь зурж байж хариулдаг тул proxy timeout-оос өмнө дуусах хэмжээгээр хязгаарлана
+    n = queryset.count()
+    if n > QR_LABELS_ADMIN_MAX:
+        modeladmin.message_user(
+            request,
+            f"{n} багаж сонгосон — admin-аас нэг дор {QR_LABELS_ADMIN_MAX} хүртэл шошго хэвлэнэ. "
+            "Их хэмжээгээр: `python manage.py print_qr_labels --out labels.pdf [--aimag ID --location ID ...]`.",
+            level=messages.WARNING,
+        )
+        return None
+    f, _n = build_qr_labels_file(queryset)
+    return FileResponse(f, as_attachment=True, filename="qr_labels.pdf", content_type="application/pdf")
+
+
+# ============================================================
+# Бөөн шилжүүлэлт (нэг UPDATE + bulk DeviceMovement)
+# ============================================================
+
+class BulkRelocateForm(forms.Form):
+    to_location = forms.ModelChoiceField(queryset=Location.objects.none(), label="Шинэ байршил")
+    reason = forms.CharField(
+        label="Шилжилтийн шалтгаан",
+        required=False,
+        max_length=255,
+        widget=forms.TextInput(attrs={"size": 60, "placeholder": "Ж: Станцын шинэчлэлтээр нөөц агуулах руу"}),
+    )
+
+    def __init__(self, *args, request: HttpRequest, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["to_location"].queryset = _scope_location_qs(request).order_by("name")
+
+
+class BulkStatusForm(forms.Form):
+    status = forms.ChoiceField(choices=Device.STATUS_CHOICES, label="Шинэ төлөв")
+    reason = forms.CharField(label="Шалтгаан", required=False, max_length=255, widget=forms.TextInput(attrs={"size": 60}))
+
+
+def _bulk_action_form(modeladmin, request: HttpRequest, queryset: QuerySet, form, *, title: str, intro: str, submit_label: str):
+    """Сонгосон мөрүүдийг hidden талбараар дамжуулж, action-ийг apply=1-тэйгээр дахин POST хийх хуудас."""
+    ctx = {
+        **modeladmin.admin_site.each_context(request),
+        "title": title,
+        "intro": intro,
+        "submit_label": submit_label,
+        "opts": modeladmin.model._meta,
+        "form": form,
+        "count": queryset.count(),
+        "action": request.POST.get("action", ""),
+        "select_across": request.POST.get("select_across", "0"),
+        "index": request.POST.get("index", "0"),
+        "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+    }
+    return render(request, "admin/inventory/device/bulk_action_form.html", ctx)
+
+
+def _request_profile_id(request: HttpRequest):
+    prof = getattr(request.user, "profile", None) or getattr(request.user, "userprofile", None)
+    return getattr(prof, "pk", None)
+
+
+@admin.action(description="🚚 Байршил бөөнөөр шилжүүлэх")
+def bulk_relocate_devices(modeladmin, request: HttpRequest, queryset: QuerySet):
+    form = BulkRelocateForm(request.POST if "apply" in request.POST else None, request=request)
+    if not form.is_valid():
+        return _bulk_action_form(
+            modeladmin, request, queryset, form,
+            title="🚚 Байршил бөөнөөр шилжүүлэх",
+            intro="Шинэ байршилд аль хэдийн байгаа багажийг алгасна; бусдад нь DeviceMovement түүх бичигдэнэ.",
+            submit_label="Шилжүүлэх",
+        )
+    moved = bulk_relocate(
+        queryset,
+        form.cleaned_data["to_location"],
+        reason=form.cleaned_data["reason"],
+        moved_by=_request_profile_id(request),
+    )
+    modeladmin.message_user(
+        request, f"Шилжүүллээ: {moved} багаж -> {form.cleaned_data['to_location']}", level=messages.SUCCESS
+    )
+    return None
+
+
+@admin.action(description="🔧 Төлөв бөөнөөр солих")
+def bulk_set_device_status(modeladmin, request: HttpRequest, queryset: QuerySet):
+    form = BulkStatusForm(request.POST if "apply" in request.POST else None)
+    if not form.is_valid():
+        return _bulk_action_form(
+            modeladmin, request, queryset, form,
+            title="🔧 Төлөв бөөнөөр солих",
+            intro="Тухайн төлөвтэй багажийг алгасна; бусдад нь DeviceStatusChange түүх бичигдэнэ.",
+            submit_label="Солих",
+        )
+    status = form.cleaned_data["status"]
+    changed = bulk_set_status(queryset, status, reason=form.cleaned_data["reason"], changed_by=_request_profile_id(request))
+    label = dict(Device.STATUS_CHOICES)[status]
+    modeladmin.message_user(request, f"Төлөв солилоо: {changed} багаж -> {label}", level=messages.SUCCESS)
+    return None
+
+
+# ============================================================
+# Location: координатаар аймаг/сум засах
+# ============================================================
+
+@admin.action(description="📍 Координатаар аймаг/сум засах")
+def fix_admin_units_from_coords(modeladmin, request: HttpRequest, queryset: QuerySet):
+    try:
+        res = fix_location_admin_units(queryset, base_dir=settings.BASE_DIR)
+    except FileNotFoundError:
+        modeladmin.message_user(request, "Улсын хилийн давхарга (mn_admin_units.geojson) олдсонгүй.", level=messages.ERROR)
+        return
+    modeladmin.message_user(
+        request,
+        f"Шалгасан: {res.scanned}, хилээр тодорхойлсон: {res.resolved}, "
+        f"аймаг өөрчлөгдсөн: {res.aimag_changed}, сум өөрчлөгдсөн: {res.sum_changed}",
+        level=messages.SUCCESS,
+    )
+
+
 # ============================================================
 # Inlines
 # ============================================================
@@ -431,6 +548,16 @@ class DeviceMovementInline(admin.TabularInline):
     ordering = ("-moved_at", "-id")
 
 
+class DeviceStatusChangeInline(admin.TabularInline):
+    model = DeviceStatusChange
+    extra = 0
+    can_delete = False
+    show_change_link = False
+    readonly_fields = ("changed_at", "from_status", "to_status", "reason", "changed_by")
+    fields = readonly_fields
+    ordering = ("-changed_at", "-id")
+
+
 class SparePartItemInline(admin.TabularInline):
     model = SparePartItem
     extra = 1
@@ -465,6 +592,14 @@ class InstrumentCatalogAdmin(admin.ModelAdmin):
     search_fields = ("code", "name_mn")
     ordering = ("kind", "code")
 
+    def save_model(self, request: HttpRequest, obj: InstrumentCatalog, form, change: bool) -> None:
+        super().save_model(request, obj, form, change)
+        # Цикл өөрчлөгдвөл signals.recompute_catalog_verification бүх багажийг шинэчилсэн
+        res = getattr(obj, "_verification_recompute", None)
+        if res is not None:
+            moves = ", ".join(f"{old}→{new}: {n}" for (old, new), n in sorted(res.moves.items())) or "bucket өөрчлөгдөөгүй"
+            self.message_user(request, f"Дараагийн шалгалтын огноо шинэчлэгдлээ: {res.updated} багаж ({moves})", level=messages.INFO)
+
 
 # ============================================================
 # LocationAdmin (✅ нэг л ширхэг, map + 📍 баганатай)
@@ -487,6 +622,7 @@ class LocationAdmin(admin.ModelAdmin):
     )
     list_filter = ("aimag_ref", SumDuuregByAimagFilter, LocationTypeFilter)
     search_fields = ("name", "code", "wmo_index")
+    actions = [fix_admin_units_from_coords]
 
     def get_queryset(self, request):
         qs = super().get_queryset(request).annotate(
@@ -512,6 +648,8 @@ class LocationAdmin(admin.ModelAdmin):
             path("sums-by-aimag/", self.admin_site.admin_view(self.sums_by_aimag_view), name="locations-sums-by-aimag"),
             path("map/", self.admin_site.admin_view(self.map_view), name="inventory_location_map"),
             path("<int:location_id>/map-one/", self.admin_site.admin_view(self.map_one_view), name="inventory_location_map_one"),
+            path("<int:location_id>/nearest/", self.admin_site.admin_view(self.nearest_view), name="inventory_location_nearest"),
+            path("coord-qa/", self.admin_site.admin_view(self.coord_qa_view), name="inventory_location_coord_qa"),
         ]
         return custom + urls
 
@@ -579,6 +717,99 @@ class LocationAdmin(admin.ModelAdmin):
         )
         return render(request, "inventory/location_map.html", ctx)
 
+    def nearest_view(self, request: HttpRequest, location_id: int):
+        """Тухайн станцаас хамгийн ойр станцууд (?k=10&radius_km=50&location_type=AWS)."""
+        from .map_data import nearest_stations
+
+        loc = self.get_queryset(request).filter(id=location_id).values("latitude", "longitude").first()
+        if not loc or loc["latitude"] is None or loc["longitude"] is None:
+            return JsonResponse({"ok": False, "error": "location not found"}, status=404)
+        k = self._safe_int(request.GET.get("k")) or 10
+        try:
+            radius_km = float(request.GET["radius_km"]) if request.GET.get("radius_km") else None
+        except ValueError:
+            radius_km = None
+        items = nearest_stations(
+            request,
+            float(loc["longitude"]),
+            float(loc["latitude"]),
+            k=max(1, min(k, 500)),
+            radius_km=radius_km,
+            exclude_id=location_id,
+        )
+        return JsonResponse({"ok": True, "items": items}, json_dumps_params={"ensure_ascii": False})
+
+    def coord_qa_view(self, request: HttpRequest):
+        """Координатын QA тайлан (?radius=50, ?format=csv)."""
+        from .geo.coord_qa import DEFAULT_DUPLICATE_RADIUS_M, QA_FLAG_LABELS, run_coordinate_qa
+
+        try:
+            radius_m = max(1.0, min(float(request.GET.get("radius") or DEFAULT_DUPLICATE_RADIUS_M), 5000.0))
+        except ValueError:
+            radius_m = DEFAULT_DUPLICATE_RADIUS_M
+        flag = (request.GET.get("flag") or "").strip()
+
+        try:
+            res = run_coordinate_qa(_scope_location_qs(request), base_dir=settings.BASE_DIR, radius_m=radius_m)
+        except FileNotFoundError:
+            messages.error(request, "Засаг захиргааны хилийн GeoJSON файл олдсонгүй.")
+            return redirect(reverse(f"{self.admin_site.name}:inventory_location_changelist"))
+
+        issues = [it for it in res.issues if not flag or it.flag == flag]
+        loc_ids = {it.location_id for it in issues} | {it.other_id for it in issues if it.other_id}
+        locs = {
+            o["id"]: o
+            for o in Location.objects.filter(id__in=loc_ids).values(
+                "id", "name", "latitude", "longitude", "aimag_ref__name", "sum_ref__name"
+            )
+        }
+        aimag_names = dict(Aimag.objects.values_list("id", "name"))
+
+        rows = []
+        for it in issues:
+            loc = locs.get(it.location_id, {})
+            other = locs.get(it.other_id, {}) if it.other_id else {}
+            rows.append(
+                {
+                    "location_id": it.location_id,
+                    "name": loc.get("name", ""),
+                    "aimag": loc.get("aimag_ref__name") or "",
+                    "sum": loc.get("sum_ref__name") or "",
+                    "lat": loc.get("latitude"),
+                    "lon": loc.get("longitude"),
+                    "flag": it.flag,
+                    "flag_label": QA_FLAG_LABELS.get(it.flag, it.flag),
+                    "detail": it.detail,
+                    "other_id": it.other_id or "",
+                    "other_name": other.get("name", ""),
+                    "distance_m": it.distance_m if it.distance_m is not None else "",
+                    "detected_aimag": aimag_names.get(it.detected_aimag_id, "") if it.detected_aimag_id else "",
+                }
+            )
+
+        if (request.GET.get("format") or "").lower() == "csv":
+            resp = HttpResponse(content_type="text/csv; charset=utf-8")
+            resp["Content-Disposition"] = 'attachment; filename="location_coord_qa.csv"'
+            resp.write("\ufeff")  # Excel BOM
+            cols = ["location_id", "name", "aimag", "sum", "lat", "lon", "flag", "detail",
+                    "other_id", "other_name", "distance_m", "detected_aimag"]
+            w = csv.writer(resp)
+            w.writerow(cols)
+            w.writerows([[r[c] for c in cols] for r in rows])
+            return resp
+
+        ctx = dict(
+            self.admin_site.each_context(request),
+            title="Координатын чанарын шалгалт",
+            scanned=res.scanned,
+            counts=[(k, QA_FLAG_LABELS[k], v) for k, v in res.counts().items()],
+            rows=rows[:5000],
+            truncated=len(rows) > 5000,
+            radius=radius_m,
+            flag=flag,
+        )
+        return render(request, "admin/inventory/reports/coord_qa.html", ctx)
+
     @admin.display(description="Багаж")
     def device_count_col(self, obj):
         return int(getattr(obj, "device_count", 0) or 0)
@@ -600,7 +831,7 @@ class DeviceAdminForm(forms.ModelForm):
         label="Шилжилтийн шалтгаан",
         required=False,
         widget=forms.Textarea(attrs={"rows": 2, "placeholder": "Ж: Эвдэрсэн тул нөөц станц руу шилжүүлэв"}),
-        help_text="Зөвхөн байршил өөрчлөгдөх үед DeviceMovement түүхэнд хадгалагдана.",
+        help_text="Байршил/төлөв өөрчлөгдөх үед DeviceMovement / DeviceStatusChange түүхэнд хадгалагдана.",
     )
 
     class Meta:
@@ -608,10 +839,21 @@ class DeviceAdminForm(forms.ModelForm):
         fields = "__all__"
 
 
+class DeviceChangeList(ChangeList):
+    """Хайлтын үр дүнд серийн дугаар нь яг таарсан багажууд эхэндээ."""
+
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        key = normalize_serial(self.query)
+        if not key:
+            return ordering
+        return [Case(When(serial_normalized=key, then=Value(0)), default=Value(1)).asc(), *ordering]
+
+
 class DeviceAdmin(admin.ModelAdmin):
     form = DeviceAdminForm
-    actions = [generate_qr, revoke_qr, download_device_passport]
-    inlines = [MaintenanceHistoryInline, ControlHistoryInline, DeviceMovementInline]
+    actions = [generate_qr, revoke_qr, download_device_passport, print_qr_labels, bulk_relocate_devices, bulk_set_device_status]
+    inlines = [MaintenanceHistoryInline, ControlHistoryInline, DeviceMovementInline, DeviceStatusChangeInline]
 
     list_display = (
         "serial_number",
@@ -634,14 +876,25 @@ class DeviceAdmin(admin.ModelAdmin):
         )
 
     def get_queryset(self, request: HttpRequest) -> QuerySet:
-        qs = super().get_queryset(request).select_related("location", "location__aimag_ref", "location__sum_ref")
-        return _scope_qs(request, qs, aimag_field="location__aimag_ref")
+        qs = super().get_queryset(request).select_related("location", "location__aimag_ref", "location__sum_ref", "qr_job")
+        return _scope_qs(request, qs, aimag_field="aimag_ref")
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "location":
             kwargs["queryset"] = _scope_location_qs(request).order_by("name")
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+    def get_changelist(self, request, **kwargs):
+        return DeviceChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        # Ердийн icontains хайлт + серийн дугаар нормчилсон утгаараа яг таарсан мөрүүд
+        # ("a123-456" -> "A123 456"); яг таарсныг DeviceChangeList эхэнд эрэмбэлнэ
+        qs, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if normalize_serial(search_term):
+            qs = qs | find_devices_by_serial(search_term, queryset)
+        return qs, may_have_duplicates
+
     def get_urls(self):
         urls = super().get_urls()
         custom = [
@@ -715,20 +968,28 @@ class DeviceAdmin(admin.ModelAdmin):
 
     @admin.display(description="QR")
     def qr_preview(self, obj: Device):
-        img = getattr(obj, "qr_image", None)
-        if not img:
+        # Хадгалсан файлаас биш, qr_token-оос on-demand (кэштэй) зурагдсан зураг
+        token = getattr(obj, "qr_token", None)
+        if not obj.pk or not token:
             return "-"
-        try:
-            url = img.url
-        except Exception:
-            return "-"
-        return format_html(
-            '<a href="{}" target="_blank" rel="noopener">'
-            '<img src="{}" style="height:48px;border:1px solid #ccc;border-radius:4px" />'
+        img_url = reverse("inventory:qr_device_image", args=[token, "png"])
+        preview = format_html(
+            '<a href="{}?size=512" target="_blank" rel="noopener">'
+            '<img src="{}?size=96" style="height:48px;border:1px solid #ccc;border-radius:4px" loading="lazy" />'
             "</a>",
-            url,
-            url,
+            img_url,
+            img_url,
         )
+        # Хадгалсан qr_image-ийн render job-ийн төлөв (QrRenderJob)
+        try:
+            job = obj.qr_job
+        except QrRenderJob.DoesNotExist:
+            job = None
+        if job is not None and job.status in (QrRenderJob.Status.PENDING, QrRenderJob.Status.RUNNING):
+            return format_html('{}<br><span style="color:#6c757d">⏳ {}</span>', preview, job.get_status_display())
+        if job is not None and job.status == QrRenderJob.Status.FAILED:
+            return format_html('{}<br><span style="color:#dc3545" title="{}">⚠️ QR алдаа</span>', preview, job.last_error)
+        return preview
 
     @admin.display(description="Калибровка")
     def verification_badge(self, obj: Device):
@@ -751,28 +1012,10 @@ class DeviceAdmin(admin.ModelAdmin):
         return format_html('<span style="color:#198754;font-weight:700">✅ OK ({} өдөр)</span>', left)
 
     def save_model(self, request: HttpRequest, obj: Device, form, change: bool) -> None:
-        old_loc_id = None
-        if change and obj.pk:
-            old_loc_id = Device.objects.filter(pk=obj.pk).values_list("location_id", flat=True).first()
-
+        # Шилжилт/төлвийн түүхийг Device.save() нэг удаа бичнэ; энд зөвхөн шалтгаан/хэн
+        obj.set_movement_info(form.cleaned_data.get("movement_reason") or "", _request_profile_id(request))
         super().save_model(request, obj, form, change)
 
-        try:
-            new_loc_id = obj.location_id
-            if change and old_loc_id != new_loc_id:
-                prof = getattr(request.user, "profile", None) or getattr(request.user, "userprofile", None)
-                moved_by = getattr(prof, "pk", None)
-                reason = (form.cleaned_data.get("movement_reason") or "").strip()
-                DeviceMovement.objects.create(
-                    device=obj,
-                    from_location_id=old_loc_id,
-                    to_location_id=new_loc_id,
-                    moved_by_id=moved_by,
-                    reason=reason,
-                )
-        except Exception:
-            logger.exception("DeviceMovement auto-log failed for device_id=%s", obj.pk)
-
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
 
@@ -789,7 +1032,7 @@ class MaintenanceServiceAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request: HttpRequest) -> QuerySet:
         qs = super().get_queryset(request).select_related("device", "device__location", "device__location__aimag_ref", "device__location__sum_ref")
-        return _scope_qs(request, qs, aimag_field="device__location__aimag_ref")
+        return _scope_qs(request, qs, aimag_field="device__aimag_ref")
 
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
@@ -807,7 +1050,7 @@ class ControlAdjustmentAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request: HttpRequest) -> QuerySet:
         qs = super().get_queryset(request).select_related("device", "device__location", "device__location__aimag_ref", "device__location__sum_ref")
-        return _scope_qs(request, qs, aimag_field="device__location__aimag_ref")
+        return _scope_qs(request, qs, aimag_field="device__aimag_ref")
 
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
@@ -840,6 +1083,68 @@ class AuthAuditLogAdmin(admin.ModelAdmin):
     ordering = ("-created_at", "-id")
 
 
+@admin.action(description="🔁 Дахин оролдох")
+def retry_qr_jobs(modeladmin, request: HttpRequest, queryset: QuerySet):
+    n = enqueue_qr_render(queryset.values_list("device_id", flat=True), reset=True)
+    modeladmin.message_user(request, f"Дахин дараалалд орлоо: {n}", level=messages.SUCCESS)
+
+
+class QrRenderJobAdmin(admin.ModelAdmin):
+    list_display = ("device", "status", "attempts", "requested_at", "next_attempt_at", "finished_at", "short_error")
+    list_filter = ("status",)
+    search_fields = ("device__serial_number", "last_error")
+    ordering = ("-requested_at", "-id")
+    list_select_related = ("device", "device__catalog_item")
+    readonly_fields = (
+        "device", "status", "attempts", "requested_at", "started_at", "finished_at",
+        "next_attempt_at", "rendered_payload", "last_error",
+    )
+    actions = [retry_qr_jobs]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        return _scope_qs(request, super().get_queryset(request), aimag_field="device__aimag_ref")
+
+    def get_urls(self):
+        custom = [
+            path(
+                "progress/<slug:batch>/",
+                self.admin_site.admin_view(self.progress_view),
+                name="inventory_qrrenderjob_progress",
+            ),
+        ]
+        return custom + super().get_urls()
+
+    def progress_view(self, request: HttpRequest, batch: str):
+        counts = qr_batch_progress(batch)
+        if not counts["total"]:
+            raise Http404("Batch not found")
+        finished = counts[QrRenderJob.Status.DONE] + counts[QrRenderJob.Status.FAILED]
+        progress = {
+            "batch": batch,
+            "counts": counts,
+            "finished": finished,
+            "percent": round(100.0 * finished / counts["total"], 1),
+            "complete": finished >= counts["total"],
+        }
+        if request.GET.get("format") == "json":
+            return JsonResponse({"ok": True, **progress}, json_dumps_params={"ensure_ascii": False})
+        ctx = {
+            **self.admin_site.each_context(request),
+            "title": "QR зурах явц",
+            "progress": progress,
+            "status_rows": [(label, counts[value]) for value, label in QrRenderJob.Status.choices],
+            "changelist_url": reverse(f"{self.admin_site.name}:inventory_qrrenderjob_changelist") + f"?batch={batch}",
+        }
+        return render(request, "admin/inventory/reports/qr_progress.html", ctx)
+
+    @admin.display(description="Алдаа")
+    def short_error(self, obj: QrRenderJob):
+        return (obj.last_error or "")[:80]
+
+    def has_add_permission(self, request):
+        return False
+
+
 # Optional: AuditEvent admin
 if AuditEvent is not None:
     class AuditEventAdmin(admin.ModelAdmin):
@@ -901,6 +1206,7 @@ inventory_admin_site.register(ControlAdjustment, ControlAdjustmentAdmin)
 inventory_admin_site.register(SparePartOrder, SparePartOrderAdmin)
 inventory_admin_site.register(UserProfile, UserProfileAdmin)
 inventory_admin_site.register(AuthAuditLog, AuthAuditLogAdmin)
+inventory_admin_site.register(QrRenderJob, QrRenderJobAdmin)
 
 if AuditEvent is not None:
     inventory_admin_site.register(AuditEvent, AuditEventAdmin)
@@ -17,7 +17,9 @@ from django.http import HttpRequest, JsonResponse, HttpResponse
 from django.shortcuts import render
 from django.utils import timezone
 
+from .device_status import status_at, status_counts_at, status_timeline
 from .models import Device, Location, MaintenanceService, ControlAdjustment, DeviceMovement
+from .placements import placements_at
 
 # ---------------------------------------------------------
 # 1. Helpers & Setup
@@ -124,39 +126,17 @@ def _build_workflow_counts_for_range(user, devices_qs, date_from: date, date_to:
     return {"axis": axis, "ms": ms, "ca": ca}
 
 def _build_status_timeline(user, devices_qs, date_from: date, date_to: date):
-    qs = devices_qs.filter(installation_date__gte=date_from, installation_date__lte=date_to)
-    data = qs.values_list("installation_date", "status")
-    counts = {}
-    
-    for dt_val, status_val in data:
-        if not dt_val: continue
-        real_date = dt_val.date() if isinstance(dt_val, datetime) else dt_val
-        d_str = real_date.strftime("%Y-%m-%d")
-        st = str(status_val or "UNKNOWN")
-        
-        if d_str not in counts:
-            counts[d_str] = {"Active": 0, "Broken": 0, "Repair": 0, "Stored": 0, "Other": 0}
-            
-        if st in ["Active", "Broken", "Repair", "Stored"]:
-            counts[d_str][st] += 1
-        else:
-            counts[d_str]["Other"] += 1
-
-    axis = []
-    series = {"Active": [], "Broken": [], "Repair": [], "Stored": []}
-    
-    curr = date_from
-    while curr <= date_to:
-        d_str = curr.strftime("%Y-%m-%d")
-        axis.append(d_str)
-        day_data = counts.get(d_str, {})
-        series["Active"].append(day_data.get("Active", 0))
-        series["Broken"].append(day_data.get("Broken", 0))
-        series["Repair"].append(day_data.get("Repair", 0))
-        series["Stored"].append(day_data.get("Stored", 0))
-        curr += timedelta(days=1)
-        
-    return {"axis": axis, "series": series}
+    # DeviceStatusChange түүхээс өдөр бүрийн эцсийн төлөв (installation_date proxy биш)
+    tl = status_timeline(devices_qs, date_from, date_to)
+    counts = tl["counts"]
+    series = {
+        "Active": counts.get("Active", []),
+        "Broken": counts.get("Broken", []),
+        "Repair": counts.get("Repair", []),
+        # Графикийн "Stored" цуваа = Нөөц (Spare)
+        "Stored": counts.get("Spare", []),
+    }
+    return {"axis": tl["axis"], "series": series}
 
 
 # ---------------------------------------------------------
@@ -281,10 +261,10 @@ def reports_table_json(request: HttpRequest):
     # ==========================
     if report == "devices":
         qs = Device.objects.select_related("location", "instrument")
-        qs = _apply_aimag_scope(qs, request, "location__aimag_ref_id") # Note: using ref_id
+        qs = _apply_aimag_scope(qs, request, "aimag_ref_id")  # Device.aimag_ref (denormalized, JOIN-гүй)
 
-        if aimag_id: qs = qs.filter(location__aimag_ref_id=aimag_id)
-        if sum_id: qs = qs.filter(location__sum_ref_id=sum_id)
+        if aimag_id: qs = qs.filter(aimag_ref_id=aimag_id)
+        if sum_id: qs = qs.filter(sum_ref_id=sum_id)
         if kind: qs = qs.filter(kind=kind)
         if status: qs = qs.filter(status=status)
         if loc_type: qs = qs.filter(location__location_type=loc_type)
@@ -361,7 +341,7 @@ def reports_table_json(request: HttpRequest):
     # ==========================
     elif report == "maintenance":
         qs = MaintenanceService.objects.select_related("device", "device__location")
-        qs = _apply_aimag_scope(qs, request, "device__location__aimag_ref_id")
+        qs = _apply_aimag_scope(qs, request, "device__aimag_ref_id")
 
         # ⬇⬇⬇ ШҮҮЛТҮҮРҮҮД ⬇⬇⬇
         if date_from:
@@ -372,7 +352,7 @@ def reports_table_json(request: HttpRequest):
         if loc_type:
             qs = qs.filter(device__location__location_type=loc_type)
         
-        if aimag_id: qs = qs.filter(device__location__aimag_ref_id=aimag_id)
+        if aimag_id: qs = qs.filter(device__aimag_ref_id=aimag_id)
         if status: qs = qs.filter(workflow_status=status)
         if q: qs = qs.filter(device__serial_number__icontains=q)
         # ⬆⬆⬆ 
@@ -391,7 +371,7 @@ def reports_table_json(request: HttpRequest):
     # ==========================
     elif report == "control":
         qs = ControlAdjustment.objects.select_related("device", "device__location")
-        qs = _apply_aimag_scope(qs, request, "device__location__aimag_ref_id")
+        qs = _apply_aimag_scope(qs, request, "device__aimag_ref_id")
 
         # ⬇⬇⬇ ШҮҮЛТҮҮРҮҮД ⬇⬇⬇
         if date_from:
@@ -402,7 +382,7 @@ def reports_table_json(request: HttpRequest):
         if loc_type:
             qs = qs.filter(device__location__location_type=loc_type)
         
-        if aimag_id: qs = qs.filter(device__location__aimag_ref_id=aimag_id)
+        if aimag_id: qs = qs.filter(device__aimag_ref_id=aimag_id)
         if status: qs = qs.filter(workflow_status=status)
         if q: qs = qs.filter(device__serial_number__icontains=q)
         # ⬆⬆⬆ 
@@ -457,11 +437,64 @@ def export_movements_csv(request: HttpRequest):
 
 @staff_member_required(login_url="/django-admin/login/")
 def chart_status_json(request: HttpRequest):
-    devices_qs = Device.objects.all()
+    devices_qs = _apply_aimag_scope(Device.objects.all(), request, "aimag_ref_id")
     if request.GET.get("kind"): devices_qs = devices_qs.filter(kind=request.GET.get("kind"))
+    # ?at=YYYY-MM-DD -> тухайн өдрийн эцсийн төлвөөр (DeviceStatusChange түүхээс)
+    at = _parse_date(request.GET.get("at"))
+    if at:
+        counts = status_counts_at(at, devices_qs)
+        return JsonResponse([{"name": k, "value": int(v)} for k, v in sorted(counts.items())], safe=False)
     status_counts = list(devices_qs.values("status").annotate(c=Count("id")).order_by("status"))
     return JsonResponse([{"name": (r["status"] or "UNKNOWN"), "value": int(r["c"] or 0)} for r in status_counts], safe=False)
 
+@staff_member_required(login_url="/django-admin/login/")
+def location_devices_at_json(request: HttpRequest):
+    """?location=<id>&at=YYYY-MM-DD -> тухайн өдөр станцад байсан багажууд (DevicePlacementInterval)."""
+    try:
+        location_id = int(request.GET.get("location") or "")
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "location is required"}, status=400)
+    at = _parse_date(request.GET.get("at"))
+    # Түүхийг станцын аймгаар шүүнэ (багажийн одоогийн аймгаар биш: шилжсэн багажийн
+    # өмнөх байрлал тэр станцын аймгийнхад харагдана)
+    rows = (
+        _apply_aimag_scope(placements_at(at, location=location_id), request, "location__aimag_ref_id")
+        .order_by("device__serial_number")
+        .values("device_id", "device__serial_number", "device__kind", "valid_from", "valid_to")
+    )
+    items = [
+        {
+            "device_id": r["device_id"],
+            "serial_number": r["device__serial_number"],
+            "kind": r["device__kind"],
+            "valid_from": r["valid_from"],
+            "valid_to": r["valid_to"],
+        }
+        for r in rows
+    ]
+    return JsonResponse(
+        {"ok": True, "location": location_id, "at": at, "devices": items},
+        encoder=DjangoJSONEncoder,
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+@staff_member_required(login_url="/django-admin/login/")
+def device_status_at_json(request: HttpRequest):
+    """?device=<id>&at=YYYY-MM-DD -> тухайн үеийн төлөв (at байхгүй бол одоо)."""
+    try:
+        device_id = int(request.GET.get("device") or "")
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "device is required"}, status=400)
+    # Хэрэглэгчийн аймгаас гадуурх багажийн түүхийг харуулахгүй
+    if not _apply_aimag_scope(Device.objects.filter(pk=device_id), request, "aimag_ref_id").exists():
+        return JsonResponse({"ok": False, "error": "device not found"}, status=404)
+    at = _parse_date(request.GET.get("at"))
+    return JsonResponse(
+        {"ok": True, "device": device_id, "at": at, "status": status_at(device_id, at)},
+        encoder=DjangoJSONEncoder,
+        json_dumps_params={"ensure_ascii": False},
+    )
+
 @staff_member_required(login_url="/django-admin/login/")
 def chart_workflow_json(request: HttpRequest):
     user = request.user
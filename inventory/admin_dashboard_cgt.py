@@ -300,7 +300,7 @@ def reports_table_json(request: HttpRequest):
     # ✅ MAINTENANCE
     elif report == "maintenance":
         qs = MaintenanceService.objects.select_related("device", "device__location")
-        qs = _apply_aimag_scope(qs, request, "device__location__aimag_ref_id")
+        qs = _apply_aimag_scope(qs, request, "device__aimag_ref_id")
 
         # ⬇⬇⬇ FILTERS ⬇⬇⬇
         if date_from:
@@ -324,7 +324,7 @@ def reports_table_json(request: HttpRequest):
     # ✅ CONTROL
     elif report == "control":
         qs = ControlAdjustment.objects.select_related("device", "device__location")
-        qs = _apply_aimag_scope(qs, request, "device__location__aimag_ref_id")
+        qs = _apply_aimag_scope(qs, request, "device__aimag_ref_id")
 
         # ⬇⬇⬇ FILTERS ⬇⬇⬇
         if date_from:
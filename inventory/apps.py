@@ -1,4 +1,9 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class InventoryConfig(AppConfig):
@@ -7,3 +12,23 @@ class InventoryConfig(AppConfig):
 
     def ready(self):
         from . import signals  # noqa: F401
+
+        if getattr(settings, "GEO_PRELOAD_ON_STARTUP", True):
+            self._preload_geo_indexes()
+
+    @staticmethod
+    def _preload_geo_indexes():
+        """
+        Worker эхлэхэд хилийн индексүүдийг (WKB кэшээс) ачаална,
+        ингэснээр deploy-ийн дараах эхний request parse хийж зогсохгүй.
+        """
+        from .geo.admin_units import load_admin_units_index
+        from .geo.district_lookup import load_ub_district_index
+
+        for loader in (load_ub_district_index, load_admin_units_index):
+            try:
+                loader(settings.BASE_DIR)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                logger.exception("Geo index preload failed: %s", loader.__name__)
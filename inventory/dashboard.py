@@ -26,7 +26,7 @@ def scoped_devices_qs(user):
         return qs
     aimag = get_user_aimag(user)
     if aimag:
-        return qs.filter(location__aimag_ref=aimag)
+        return qs.filter(aimag_ref=aimag)
     if is_aimag_engineer(user):
         return qs.none()
     return qs
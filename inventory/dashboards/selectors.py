@@ -45,6 +45,5 @@ def scoped_devices_qs(user: User, base_qs: Optional[QuerySet] = None) -> QuerySe
     if not aimag_id:
         return qs.none()
 
-    # Try common relations: device.location.aimag or device.location.aimag_ref
-    # If your Location uses aimag_ref, this still works.
-    return qs.filter(location__aimag_id=aimag_id) | qs.filter(location__aimag_ref_id=aimag_id)
+    # Device.aimag_ref нь байршлын аймгийн denormalized хуулбар (индекстэй, JOIN-гүй)
+    return qs.filter(aimag_ref_id=aimag_id)
@@ -220,24 +220,12 @@ def build_map_points(
         except Exception:
             pass
 
+    # Device.aimag_ref / sum_ref (байршлаас denormalized) -> location JOIN-гүй
     if aimag_id:
-        # common: location__aimag_ref or location__aimag
-        try:
-            qs = qs.filter(location__aimag_ref_id=aimag_id)
-        except Exception:
-            try:
-                qs = qs.filter(location__aimag_id=aimag_id)
-            except Exception:
-                pass
+        qs = qs.filter(aimag_ref_id=aimag_id)
 
     if sum_id:
-        try:
-            qs = qs.filter(location__sum_duureg_id=sum_id)
-        except Exception:
-            try:
-                qs = qs.filter(location__sum_id=sum_id)
-            except Exception:
-                pass
+        qs = qs.filter(sum_ref_id=sum_id)
 
     points: List[Dict[str, Any]] = []
     for d in qs.select_related("location"):
@@ -0,0 +1,167 @@
+# inventory/device_moves.py
+"""
+Багажийн бөөн үйлдлүүд (service layer):
+
+- bulk_relocate: олон багажийг нэг станц руу нэг UPDATE + нэг bulk_create
+  (DeviceMovement)-оор, нэг transaction дотор шилжүүлнэ (+ байрлалын интервал).
+- bulk_set_status: төлөв солих + DeviceStatusChange түүх (мөн адил).
+- sync_device_admin_units: Device.aimag_ref/sum_ref-ийг байршлаас нь нэг UPDATE-аар.
+
+Device.save()-ийг дуудахгүй (QR, next_verification, signal-ууд ажиллахгүй) тул
+газрын зургийн кэшийг commit-ийн дараа энд өөрөө шинэчилнэ. queryset.update()-ээр
+төлөв/байршил шууд солихгүй — түүх алдагдана.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Union
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.utils import timezone
+
+from .models import Device, DeviceMovement, DeviceStatusChange, Location, UserProfile
+from .placements import record_placements
+
+# Нэг UPDATE/SELECT-д орох id-ийн тоо (SQLite-ийн параметрийн хязгаараас доош)
+RELOCATE_CHUNK = 5000
+MOVEMENT_BATCH = 2000
+
+
+def _device_ids(devices) -> List[int]:
+    if isinstance(devices, QuerySet):
+        return list(devices.order_by().values_list("pk", flat=True))
+    return [d.pk if isinstance(d, Device) else int(d) for d in devices]
+
+
+def _invalidate_map(location_ids: Iterable[int]) -> None:
+    from .map_data import bump_map_cache_version
+    from .station_tiles import invalidate_station_tiles
+
+    bump_map_cache_version(clear_tiles=False)
+    ids = {i for i in location_ids if i}
+    if ids:
+        invalidate_station_tiles(Location.objects.filter(id__in=ids).values_list("longitude", "latitude"))
+
+
+def bulk_relocate(
+    devices: Union[QuerySet, Iterable],
+    to_location: Optional[Union[Location, int]],
+    reason: str = "",
+    moved_by: Optional[Union[UserProfile, int]] = None,
+) -> int:
+    """
+    devices (queryset / Device / id) -> to_location руу шилжүүлнэ.
+    Аль хэдийн тэнд байгаа багажийг алгасна. Шилжүүлсэн тоог буцаана.
+    """
+    to_id = to_location.pk if isinstance(to_location, Location) else to_location
+    moved_by_id = moved_by.pk if isinstance(moved_by, UserProfile) else moved_by
+    reason = (reason or "").strip()[:255]
+    ids = _device_ids(devices)
+    now = timezone.now()
+    aimag_id, sum_id = (
+        Location.objects.filter(pk=to_id).values_list("aimag_ref_id", "sum_ref_id").first() if to_id else None
+    ) or (None, None)
+
+    moved = 0
+    from_ids = set()
+    with transaction.atomic():
+        for start in range(0, len(ids), RELOCATE_CHUNK):
+            chunk = ids[start:start + RELOCATE_CHUNK]
+            qs = Device.objects.select_for_update().filter(pk__in=chunk)
+            qs = qs.exclude(location_id=to_id) if to_id else qs.filter(location__isnull=False)
+            rows = list(qs.order_by().values_list("id", "location_id"))
+            if not rows:
+                continue
+            Device.objects.filter(pk__in=[r[0] for r in rows]).update(
+                location_id=to_id, aimag_ref_id=aimag_id, sum_ref_id=sum_id
+            )
+            DeviceMovement.objects.bulk_create(
+                [
+                    DeviceMovement(
+                        device_id=dev_id,
+                        from_location_id=old_loc,
+                        to_location_id=to_id,
+                        moved_at=now,
+                        reason=reason,
+                        moved_by_id=moved_by_id,
+                    )
+                    for dev_id, old_loc in rows
+                ],
+                batch_size=MOVEMENT_BATCH,
+            )
+            record_placements(((dev_id, to_id) for dev_id, _old in rows), now)
+            from_ids.update(r[1] for r in rows)
+            moved += len(rows)
+
+        if moved:
+            transaction.on_commit(lambda: _invalidate_map(from_ids | {to_id}))
+    return moved
+
+
+def bulk_set_status(
+    devices: Union[QuerySet, Iterable],
+    status: str,
+    reason: str = "",
+    changed_by: Optional[Union[UserProfile, int]] = None,
+) -> int:
+    """
+    devices-ийн төлвийг status болгоно (нэг UPDATE + bulk DeviceStatusChange).
+    Аль хэдийн тэр төлөвтэйг алгасна. Өөрчилсөн тоог буцаана.
+    """
+    if status not in dict(Device.STATUS_CHOICES):
+        raise ValueError(f"Unknown device status: {status}")
+    changed_by_id = changed_by.pk if isinstance(changed_by, UserProfile) else changed_by
+    reason = (reason or "").strip()[:255]
+    ids = _device_ids(devices)
+    now = timezone.now()
+
+    changed = 0
+    location_ids = set()
+    with transaction.atomic():
+        for start in range(0, len(ids), RELOCATE_CHUNK):
+            chunk = ids[start:start + RELOCATE_CHUNK]
+            qs = Device.objects.select_for_update().filter(pk__in=chunk).exclude(status=status)
+            rows = list(qs.order_by().values_list("id", "status", "location_id"))
+            if not rows:
+                continue
+            Device.objects.filter(pk__in=[r[0] for r in rows]).update(status=status)
+            DeviceStatusChange.objects.bulk_create(
+                [
+                    DeviceStatusChange(
+                        device_id=dev_id,
+                        from_status=old or "",
+                        to_status=status,
+                        changed_at=now,
+                        reason=reason,
+                        changed_by_id=changed_by_id,
+                    )
+                    for dev_id, old, _loc in rows
+                ],
+                batch_size=MOVEMENT_BATCH,
+            )
+            location_ids.update(r[2] for r in rows)
+            changed += len(rows)
+
+        if changed:
+            transaction.on_commit(lambda: _invalidate_map(location_ids))
+    return changed
+
+
+def sync_device_admin_units(location_ids: Optional[Iterable[int]] = None, *, using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Device.aimag_ref/sum_ref-ийг location-ийнхоор шинэчилнэ (correlated subquery бүхий
+    нэг UPDATE). location_ids=None бол бүх багаж (байршилгүй -> NULL).
+    """
+    loc = Location.objects.using(using).filter(pk=OuterRef("location_id"))
+    values = {
+        "aimag_ref_id": Subquery(loc.values("aimag_ref_id")[:1]),
+        "sum_ref_id": Subquery(loc.values("sum_ref_id")[:1]),
+    }
+    qs = Device.objects.using(using)
+    if location_ids is None:
+        return qs.update(**values)
+    ids = list(location_ids)
+    return sum(
+        qs.filter(location_id__in=ids[start:start + RELOCATE_CHUNK]).update(**values)
+        for start in range(0, len(ids), RELOCATE_CHUNK)
+    )
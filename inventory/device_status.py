@@ -0,0 +1,100 @@
+# inventory/device_status.py
+"""
+Багажийн төлвийн түүх (DeviceStatusChange) дээрх as-of асуулгууд.
+
+- status_at(device, T): (device, changed_at) индексээр нэг seek.
+- status_counts_at(T, devices): багаж бүрт T-с өмнөх сүүлийн мөрийг correlated
+  subquery (index seek)-ээр авч GROUP BY — хүснэгтийг бүтнээр нь replay хийхгүй.
+- status_timeline(devices, from, to): эхний өдрийн as-of тоо + хугацааны доторх
+  өөрчлөлтүүдийг (changed_at индексийн range) өдөр өдрөөр нэмж/хасна.
+
+T нь date бол тухайн өдрийн эцэс (local time) гэж үзнэ.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Union
+
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.utils import timezone
+
+from .models import Device, DeviceStatusChange
+
+AsOf = Union[date, datetime]
+
+
+def as_of_datetime(when: Optional[AsOf]) -> datetime:
+    if when is None:
+        return timezone.now()
+    if isinstance(when, datetime):
+        return when if timezone.is_aware(when) else timezone.make_aware(when)
+    return timezone.make_aware(datetime.combine(when, time.max))
+
+
+def _latest_status(when: datetime):
+    return Subquery(
+        DeviceStatusChange.objects.filter(device_id=OuterRef("pk"), changed_at__lte=when)
+        .order_by("-changed_at", "-id")
+        .values("to_status")[:1]
+    )
+
+
+def status_at(device: Union[Device, int], when: Optional[AsOf] = None) -> Optional[str]:
+    """T үеийн төлөв; тэр үед түүх байхгүй (бүртгэгдээгүй) бол None."""
+    device_id = device.pk if isinstance(device, Device) else device
+    return (
+        DeviceStatusChange.objects.filter(device_id=device_id, changed_at__lte=as_of_datetime(when))
+        .order_by("-changed_at", "-id")
+        .values_list("to_status", flat=True)
+        .first()
+    )
+
+
+def statuses_at(when: Optional[AsOf] = None, devices: Optional[QuerySet] = None) -> QuerySet:
+    """devices queryset-ийг T үеийн төлвөөр (status_as_of) annotate хийнэ."""
+    qs = Device.objects.all() if devices is None else devices
+    return qs.annotate(status_as_of=_latest_status(as_of_datetime(when)))
+
+
+def status_counts_at(when: Optional[AsOf] = None, devices: Optional[QuerySet] = None) -> Dict[str, int]:
+    """{төлөв: тоо} — T үед бүртгэлтэй байсан багажуудаар."""
+    rows = (
+        statuses_at(when, devices)
+        .exclude(status_as_of=None)
+        .order_by()
+        .values("status_as_of")
+        .annotate(n=Count("pk"))
+    )
+    return {r["status_as_of"]: r["n"] for r in rows}
+
+
+def status_timeline(devices: Optional[QuerySet], date_from: date, date_to: date) -> Dict[str, object]:
+    """
+    Өдөр бүрийн эцэст төлөв тус бүрт хэдэн багаж байсныг буцаана:
+    {"axis": ["YYYY-MM-DD", ...], "counts": {status: [n, ...]}}.
+    """
+    counts = status_counts_at(date_from - timedelta(days=1), devices)
+    days = (date_to - date_from).days + 1
+    deltas: List[Dict[str, int]] = [{} for _ in range(max(days, 0))]
+
+    changes = DeviceStatusChange.objects.filter(
+        changed_at__gt=as_of_datetime(date_from - timedelta(days=1)),
+        changed_at__lte=as_of_datetime(date_to),
+    )
+    if devices is not None:
+        changes = changes.filter(device__in=devices.order_by().values("pk"))
+    for changed_at, old, new in changes.order_by().values_list("changed_at", "from_status", "to_status").iterator():
+        delta = deltas[(timezone.localdate(changed_at) - date_from).days]
+        if old:
+            delta[old] = delta.get(old, 0) - 1
+        delta[new] = delta.get(new, 0) + 1
+
+    axis: List[str] = []
+    series: Dict[str, List[int]] = {code: [] for code, _label in Device.STATUS_CHOICES}
+    for i, delta in enumerate(deltas):
+        for code, n in delta.items():
+            counts[code] = counts.get(code, 0) + n
+        axis.append((date_from + timedelta(days=i)).strftime("%Y-%m-%d"))
+        for code in series:
+            series[code].append(int(counts.get(code, 0)))
+    return {"axis": axis, "counts": series}
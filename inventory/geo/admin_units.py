@@ -0,0 +1,236 @@
+# inventory/geo/admin_units.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.db import transaction
+
+from inventory.geo.geometry_cache import load_geojson_features
+from inventory.geo.polygon_index import PolygonIndex
+
+# Улсын хэмжээний сум/дүүргийн хил (feature бүр = 1 сум/дүүрэг).
+# properties: aimag_code, aimag_name (эсвэл aimag_mn), sum_code, sum_name (эсвэл name_mn)
+ADMIN_UNITS_GEOJSON_REL = Path("static") / "data" / "mn_admin_units.geojson"
+
+
+def _norm(s: Any) -> str:
+    return " ".join(str(s or "").split()).casefold()
+
+
+def props_aimag(props: Dict[str, Any]) -> Tuple[str, str]:
+    return _norm(props.get("aimag_code")), _norm(props.get("aimag_name") or props.get("aimag_mn"))
+
+
+def _props_sum(props: Dict[str, Any]) -> Tuple[str, str]:
+    return _norm(props.get("sum_code")), _norm(props.get("sum_name") or props.get("name_mn"))
+
+
+@lru_cache(maxsize=1)
+def load_admin_features(base_dir: Path):
+    return load_geojson_features(base_dir / ADMIN_UNITS_GEOJSON_REL)
+
+
+@lru_cache(maxsize=1)
+def load_admin_units_index(base_dir: Path) -> PolygonIndex:
+    """Аймаг+сумын бүх polygon нэг STRtree индекст."""
+    return PolygonIndex(load_admin_features(base_dir))
+
+
+# ============================================================
+# GeoJSON feature -> DB (Aimag.id, SumDuureg.id)
+# ============================================================
+@dataclass
+class AdminUnitMatcher:
+    """
+    Feature properties-ийг Aimag / SumDuureg мөртэй тааруулна.
+    Эхлээд code-оор, олдохгүй бол нэрээр (том/жижиг үсэг, зай үл хамаарна).
+    """
+
+    aimag_by_code: Dict[str, int] = field(default_factory=dict)
+    aimag_by_name: Dict[str, int] = field(default_factory=dict)
+    sum_by_code: Dict[Tuple[int, str], int] = field(default_factory=dict)
+    sum_by_name: Dict[Tuple[int, str], int] = field(default_factory=dict)
+
+    @classmethod
+    def from_db(cls) -> "AdminUnitMatcher":
+        from inventory.models import Aimag, SumDuureg
+
+        m = cls()
+        for aid, name, code in Aimag.objects.values_list("id", "name", "code"):
+            if _norm(code):
+                m.aimag_by_code.setdefault(_norm(code), aid)
+            m.aimag_by_name.setdefault(_norm(name), aid)
+        for sid, aid, name, code in SumDuureg.objects.values_list("id", "aimag_id", "name", "code"):
+            if _norm(code):
+                m.sum_by_code.setdefault((aid, _norm(code)), sid)
+            m.sum_by_name.setdefault((aid, _norm(name)), sid)
+        return m
+
+    def match(self, props: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+        a_code, a_name = props_aimag(props)
+        aimag_id = (a_code and self.aimag_by_code.get(a_code)) or self.aimag_by_name.get(a_name)
+        if not aimag_id:
+            return None, None
+
+        s_code, s_name = _props_sum(props)
+        sum_id = (s_code and self.sum_by_code.get((aimag_id, s_code))) or self.sum_by_name.get((aimag_id, s_name))
+        return aimag_id, (sum_id or None)
+
+    def match_features(self, index: PolygonIndex) -> Tuple[np.ndarray, np.ndarray]:
+        """feature index -> (aimag_id, sum_id) lookup arrays (0 = тааруулж чадаагүй)."""
+        aimag_ids = np.zeros(len(index), dtype=np.int64)
+        sum_ids = np.zeros(len(index), dtype=np.int64)
+        for i, props in enumerate(index.props):
+            a, s = self.match(props)
+            aimag_ids[i] = a or 0
+            sum_ids[i] = s or 0
+        return aimag_ids, sum_ids
+
+
+def resolve_admin_units(
+    lons, lats, base_dir: Path, matcher: Optional[AdminUnitMatcher] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized: (lons, lats) -> (aimag_ids, sum_ids) int массив.
+    0 = хилийн гадна эсвэл DB-д тохирох мөр олдоогүй.
+    """
+    index = load_admin_units_index(base_dir)
+    matcher = matcher or AdminUnitMatcher.from_db()
+    feat_aimag, feat_sum = matcher.match_features(index)
+
+    hit = index.locate(lons, lats)
+    inside = hit >= 0
+    aimag_ids = np.zeros(hit.shape, dtype=np.int64)
+    sum_ids = np.zeros(hit.shape, dtype=np.int64)
+    aimag_ids[inside] = feat_aimag[hit[inside]]
+    sum_ids[inside] = feat_sum[hit[inside]]
+    return aimag_ids, sum_ids
+
+
+def resolve_admin_unit(lon: float, lat: float, base_dir: Path) -> Tuple[Optional[int], Optional[int]]:
+    """Нэг цэг -> (aimag_id, sum_id); олдоогүй бол None."""
+    index = load_admin_units_index(base_dir)
+    i = index.locate_one(float(lon), float(lat))
+    if i < 0:
+        return None, None
+    return AdminUnitMatcher.from_db().match(index.props[i])
+
+
+# ============================================================
+# Bulk: бүх Location-ийн aimag_ref / sum_ref-ийг нэг дамжлагаар засах
+# ============================================================
+@dataclass
+class AdminUnitFixResult:
+    scanned: int = 0
+    resolved: int = 0
+    aimag_changed: int = 0
+    sum_changed: int = 0
+    district_changed: int = 0
+    updated: int = 0
+    changes: List[Tuple[int, Optional[int], Optional[int], Optional[int], Optional[int], str, str]] = field(
+        default_factory=list
+    )
+
+
+def iter_chunks(it: Iterable, size: int):
+    buf = []
+    for x in it:
+        buf.append(x)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def fix_location_admin_units(
+    queryset=None,
+    *,
+    base_dir: Path,
+    chunk_size: int = 2000,
+    dry_run: bool = False,
+    fix_aimag: bool = True,
+    admin_units: bool = True,
+    districts: bool = False,
+) -> AdminUnitFixResult:
+    """
+    Координаттай Location бүрийг хилийн давхаргаар шийдэж aimag_ref / sum_ref-ийг
+    шинэчилнэ. Зөвхөн өөрчлөгдсөн мөрүүдийг bulk_update-ээр бичнэ
+    (Location.save() дуудахгүй).
+
+    fix_aimag=False: aimag_ref-ийг хөндөхгүй, зөвхөн тэр аймагт таарсан sum_ref-ийг засна.
+    admin_units=False: улсын хилийн давхаргыг ачаалахгүй (aimag_ref / sum_ref хэвээр).
+    districts=True: Улаанбаатарын байршлын district_name-ийг UB дүүргийн давхаргаар засна.
+
+    changes: (location_id, old_aimag_id, new_aimag_id, old_sum_id, new_sum_id, old_district, new_district)
+    """
+    from inventory.models import Aimag, Location
+
+    qs = queryset if queryset is not None else Location.objects.all()
+    qs = qs.filter(latitude__isnull=False, longitude__isnull=False).order_by("pk")
+
+    matcher = AdminUnitMatcher.from_db() if admin_units else None
+    ub_index = ub_names = None
+    ub_aimag_ids: set = set()
+    if districts:
+        from inventory.geo.district_lookup import load_ub_district_index
+
+        ub_index = load_ub_district_index(base_dir)
+        # locate() -1 (дүүрэгт ороогүй) -> сүүлийн "" элемент
+        ub_names = np.asarray([(p.get("name_mn") or "") for p in ub_index.props] + [""], dtype=object)
+        ub_aimag_ids = {a.id for a in Aimag.objects.all() if a.name.strip() == "Улаанбаатар"}
+
+    fields = ["sum_ref"] + (["aimag_ref"] if fix_aimag else []) + (["district_name"] if districts else [])
+    res = AdminUnitFixResult()
+
+    rows = qs.values_list("id", "longitude", "latitude", "aimag_ref_id", "sum_ref_id", "district_name").iterator(
+        chunk_size=chunk_size
+    )
+    for chunk in iter_chunks(rows, chunk_size):
+        ids, lons, lats, old_aimag, old_sum, old_district = zip(*chunk)
+        res.scanned += len(chunk)
+        if admin_units:
+            new_aimag, new_sum = resolve_admin_units(lons, lats, base_dir, matcher=matcher)
+            new_aimag, new_sum = new_aimag.tolist(), new_sum.tolist()
+        else:
+            new_aimag = new_sum = [0] * len(chunk)
+        new_district = ub_names[ub_index.locate(lons, lats)].tolist() if districts else old_district
+
+        to_update = []
+        for i, loc_id in enumerate(ids):
+            oa, os_, od, na, ns = old_aimag[i], old_sum[i], old_district[i], new_aimag[i], new_sum[i]
+            aimag_id, sum_id, district = oa, os_, od
+            if na:
+                res.resolved += 1
+                if fix_aimag:
+                    aimag_id = na
+                if na == aimag_id:
+                    # Сум тааруулж чадаагүй бол: аймаг хэвээр -> хуучин сумыг үлдээнэ
+                    sum_id = ns or (os_ if aimag_id == oa else None)
+            if aimag_id in ub_aimag_ids and new_district[i]:
+                district = new_district[i]
+            if (aimag_id, sum_id, district) == (oa, os_, od):
+                continue
+            res.aimag_changed += int(aimag_id != oa)
+            res.sum_changed += int(sum_id != os_)
+            res.district_changed += int(district != od)
+            res.changes.append((loc_id, oa, aimag_id, os_, sum_id, od, district))
+            to_update.append(Location(id=loc_id, aimag_ref_id=aimag_id, sum_ref_id=sum_id, district_name=district))
+
+        if to_update and not dry_run:
+            from inventory.device_moves import sync_device_admin_units
+
+            with transaction.atomic():
+                Location.objects.bulk_update(to_update, fields, batch_size=chunk_size)
+                sync_device_admin_units([loc.id for loc in to_update])
+            res.updated += len(to_update)
+
+    if res.updated:
+        # bulk_update нь post_save дуудахгүй
+        from inventory.map_data import bump_map_cache_version
+        bump_map_cache_version()
+    return res
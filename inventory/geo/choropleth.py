@@ -0,0 +1,88 @@
+# inventory/geo/choropleth.py
+from __future__ import annotations
+
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import shapely
+
+from inventory.geo.admin_units import load_admin_features, props_aimag
+
+logger = logging.getLogger(__name__)
+
+CHOROPLETH_LEVELS = ("aimag", "sum")
+
+# (дээд zoom, simplify tolerance (градус)) — zoom багасах тусам бүдүүн хил
+ZOOM_TIERS: Tuple[Tuple[int, float], ...] = (
+    (5, 0.02),
+    (8, 0.005),
+    (11, 0.001),
+    (99, 0.0002),
+)
+# Гаралтын координатын нарийвчлал (≈1 м)
+COORD_GRID = 1e-5
+
+
+def zoom_tier(zoom: int) -> int:
+    """Zoom -> ZOOM_TIERS индекс."""
+    for i, (max_zoom, _tol) in enumerate(ZOOM_TIERS):
+        if zoom <= max_zoom:
+            return i
+    return len(ZOOM_TIERS) - 1
+
+
+def _dissolve_aimags(geoms: np.ndarray, props: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """Сумын polygon-уудыг аймгаар нэгтгэнэ."""
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, p in enumerate(props):
+        code, name = props_aimag(p)
+        groups.setdefault((code, name) if code else ("", name), []).append(i)
+
+    out_geoms, out_props = [], []
+    for idx in groups.values():
+        p = props[idx[0]]
+        out_geoms.append(shapely.union_all(geoms[idx]))
+        out_props.append({"aimag_code": p.get("aimag_code"), "aimag_name": p.get("aimag_name") or p.get("aimag_mn")})
+    return np.asarray(out_geoms, dtype=object), out_props
+
+
+def _simplify_coverage(geoms: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Хөрш polygon-уудын нийтлэг хилийг хамтад нь хялбаршуулна (coverage simplify),
+    ингэснээр аймаг/сумын хооронд завсар, давхцал үүсэхгүй.
+    Coverage буруу (давхцалтай) бол polygon тус бүрийг preserve_topology-оор хялбаршуулна.
+    """
+    if len(geoms) and shapely.coverage_is_valid(geoms):
+        out = shapely.coverage_simplify(geoms, tolerance)
+    else:
+        logger.warning("Admin boundaries are not a valid coverage; simplifying polygons one by one")
+        out = shapely.simplify(geoms, tolerance, preserve_topology=True)
+    return shapely.set_precision(out, COORD_GRID)
+
+
+@lru_cache(maxsize=len(CHOROPLETH_LEVELS) * len(ZOOM_TIERS))
+def simplified_boundaries(base_dir: Path, level: str, tier: int) -> Tuple[Tuple[Dict[str, Any], Dict[str, Any]], ...]:
+    """
+    (level, zoom tier) бүрт нэг л удаа хялбаршуулсан хил:
+      ((props, geojson_geometry), ...)
+    props нь AdminUnitMatcher.match()-д шууд өгч болох aimag_*/sum_* түлхүүртэй.
+    """
+    if level not in CHOROPLETH_LEVELS:
+        raise ValueError(f"level must be one of {CHOROPLETH_LEVELS}")
+
+    features = load_admin_features(base_dir)
+    geoms = np.asarray([g for g, _p in features], dtype=object)
+    props = [p for _g, p in features]
+    if level == "aimag":
+        geoms, props = _dissolve_aimags(geoms, props)
+
+    simplified = _simplify_coverage(geoms, ZOOM_TIERS[tier][1])
+    return tuple(
+        (p, json.loads(shapely.to_geojson(g)))
+        for p, g in zip(props, simplified)
+        if g is not None and not shapely.is_empty(g)
+    )
@@ -0,0 +1,97 @@
+# inventory/geo/clustering.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from inventory.geo.tiles import TILE_SIZE, lonlat_to_unit
+
+# Кластерын ойролцоогоор радиус (дэлгэцийн пиксел)
+CLUSTER_RADIUS_PX = 60
+# Энэ zoom-оос дээш бүх цэгийг тус тусад нь буцаана
+MAX_CLUSTER_ZOOM = 16
+
+# Байршлын төлөвийн код (views.location_map-тай ижил утга)
+STATUS_OK = 0        # Хэвийн
+STATUS_BROKEN = 1    # Эвдрэлтэй
+STATUS_EMPTY = 2     # Багажгүй
+STATUS_KEYS = ("ok", "broken", "empty")
+
+
+def grid_cell_size(zoom: int, radius_px: int = CLUSTER_RADIUS_PX) -> float:
+    """Zoom -> grid нүдний хэмжээ (Web Mercator unit)."""
+    return radius_px / (TILE_SIZE * float(2 ** zoom))
+
+
+def cluster_points(
+    lons: np.ndarray,
+    lats: np.ndarray,
+    status: np.ndarray,
+    device_count: np.ndarray,
+    pending_total: np.ndarray,
+    zoom: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Цэгүүдийг zoom-д тохирох тогтмол grid-ээр бүлэглэнэ (бүгд NumPy, O(n log n)).
+
+    Буцаах: кластер бүрийн массивууд —
+      lon, lat (төв = цэгүүдийн дундаж), count, device_count, pending_total,
+      status (k x 3: ok/broken/empty), first (бүлгийн анхны цэгийн индекс).
+    """
+    n = len(lons)
+    if n == 0:
+        empty_i = np.zeros(0, dtype=np.int64)
+        return {
+            "lon": np.zeros(0), "lat": np.zeros(0), "count": empty_i,
+            "device_count": empty_i, "pending_total": empty_i,
+            "status": np.zeros((0, 3), dtype=np.int64), "first": empty_i,
+        }
+
+    if zoom >= MAX_CLUSTER_ZOOM:
+        inv = np.arange(n)
+        k = n
+        first = inv
+    else:
+        ux, uy = lonlat_to_unit(lons, lats)
+        cell = grid_cell_size(zoom)
+        cols = np.floor(ux / cell).astype(np.int64)
+        rows = np.floor(uy / cell).astype(np.int64)
+        keys = rows * (np.int64(1) << 32) + cols
+        _, first, inv = np.unique(keys, return_index=True, return_inverse=True)
+        k = first.shape[0]
+
+    count = np.bincount(inv, minlength=k)
+    out = {
+        "lon": np.bincount(inv, weights=lons, minlength=k) / count,
+        "lat": np.bincount(inv, weights=lats, minlength=k) / count,
+        "count": count,
+        "device_count": np.bincount(inv, weights=device_count, minlength=k).astype(np.int64),
+        "pending_total": np.bincount(inv, weights=pending_total, minlength=k).astype(np.int64),
+        "status": np.zeros((k, 3), dtype=np.int64),
+        "first": first,
+    }
+    np.add.at(out["status"], (inv, status), 1)
+    return out
+
+
+def clusters_to_json(clusters: Dict[str, np.ndarray], ids: Sequence[int], names: Sequence[str]) -> List[Dict[str, Any]]:
+    """Кластерын массивуудыг JSON-д бэлэн dict жагсаалт болгоно."""
+    items: List[Dict[str, Any]] = []
+    for i in range(len(clusters["count"])):
+        cnt = int(clusters["count"][i])
+        st = clusters["status"][i]
+        it: Dict[str, Any] = {
+            "lat": round(float(clusters["lat"][i]), 6),
+            "lon": round(float(clusters["lon"][i]), 6),
+            "count": cnt,
+            "device_count": int(clusters["device_count"][i]),
+            "pending_total": int(clusters["pending_total"][i]),
+            "status": {k: int(st[j]) for j, k in enumerate(STATUS_KEYS)},
+        }
+        if cnt == 1:
+            j = int(clusters["first"][i])
+            it["id"] = int(ids[j])
+            it["name"] = names[j]
+        items.append(it)
+    return items
@@ -0,0 +1,192 @@
+# inventory/geo/coord_qa.py
+"""
+Location координатын чанарын шалгалт (бүх хүснэгтийг нэг дор, vectorized).
+
+Тэмдэглэгээ (flag):
+  zero            — (0, 0) координат
+  out_of_country  — Монгол улсын хилийн гадна
+  swapped         — хилийн гадна боловч lat/lon-ийг сольвол дотор орно
+  wrong_aimag     — aimag_ref-ийн polygon дотор биш (detected_aimag_id = жинхэнэ аймаг)
+  near_duplicate  — өөр станцаас radius_m метрээс ойр
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+from inventory.geo.admin_units import AdminUnitMatcher, load_admin_features, load_admin_units_index
+from inventory.geo.nearest import EARTH_RADIUS_KM
+
+QA_FLAGS = ("zero", "out_of_country", "swapped", "wrong_aimag", "near_duplicate")
+QA_FLAG_LABELS = {
+    "zero": "(0, 0) координат",
+    "out_of_country": "Монголын хилийн гадна",
+    "swapped": "Өргөрөг/уртраг солигдсон",
+    "wrong_aimag": "Өөр аймагт байна",
+    "near_duplicate": "Давхардсан байж болзошгүй",
+}
+DEFAULT_DUPLICATE_RADIUS_M = 50.0
+
+
+@dataclass
+class CoordIssue:
+    location_id: int
+    flag: str
+    detail: str = ""
+    other_id: Optional[int] = None
+    distance_m: Optional[float] = None
+    detected_aimag_id: Optional[int] = None
+
+
+@dataclass
+class CoordQAResult:
+    scanned: int = 0
+    issues: List[CoordIssue] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        out = {f: 0 for f in QA_FLAGS}
+        for it in self.issues:
+            out[it.flag] += 1
+        return out
+
+
+@lru_cache(maxsize=1)
+def load_country_geometry(base_dir: Path):
+    """Бүх сум/дүүргийн polygon-ийн нэгдэл = улсын хил (prepared)."""
+    geom = shapely.union_all([g for g, _p in load_admin_features(base_dir)])
+    shapely.prepare(geom)
+    return geom
+
+
+def load_aimag_geometries(base_dir: Path, matcher: AdminUnitMatcher) -> Dict[int, Any]:
+    """Aimag.id -> аймгийн нэгдсэн polygon (prepared)."""
+    index = load_admin_units_index(base_dir)
+    feat_aimag, _feat_sum = matcher.match_features(index)
+    out: Dict[int, Any] = {}
+    for aimag_id in np.unique(feat_aimag[feat_aimag > 0]).tolist():
+        geom = shapely.union_all(index.geoms[feat_aimag == aimag_id])
+        shapely.prepare(geom)
+        out[int(aimag_id)] = geom
+    return out
+
+
+def find_near_duplicates(lons, lats, radius_m: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    radius_m-ээс ойр цэгийн хосууд (i < j): (i, j, distance_m).
+
+    Цэгүүдийг radius_m хэмжээтэй (equirectangular) grid-д хувааж, зөвхөн
+    өөрийн болон хөрш 8 нүдний цэгүүдтэй харьцуулна — O(n log n).
+    Уртрагийг бүх цэгт нэг ижил cos(max|lat|)-ээр үржүүлдэг тул radius_m
+    доторх хос хэзээ ч хөрш бус нүдэнд хуваагдахгүй.
+    """
+    lon = np.radians(np.asarray(lons, dtype="float64"))
+    lat = np.radians(np.asarray(lats, dtype="float64"))
+    n = lon.shape[0]
+    empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+    if n < 2 or radius_m <= 0:
+        return empty
+
+    r_m = EARTH_RADIUS_KM * 1000.0
+    c0 = max(float(np.cos(np.abs(lat).max())), 1e-3)
+    cx = np.floor(r_m * lon * c0 / radius_m).astype(np.int64)
+    cy = np.floor(r_m * lat / radius_m).astype(np.int64)
+    span = np.int64(1) << 32
+    keys = cx * span + cy
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    ii, jj = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            target = (cx + dx) * span + (cy + dy)
+            lo = np.searchsorted(sorted_keys, target, side="left")
+            hi = np.searchsorted(sorted_keys, target, side="right")
+            cnt = hi - lo
+            if not cnt.any():
+                continue
+            src = np.repeat(np.arange(n), cnt)
+            starts = np.repeat(lo - np.cumsum(cnt) + cnt, cnt)
+            dst = order[starts + np.arange(src.shape[0])]
+            keep = src < dst
+            ii.append(src[keep])
+            jj.append(dst[keep])
+    if not ii:
+        return empty
+
+    i = np.concatenate(ii)
+    j = np.concatenate(jj)
+    a = np.sin((lat[j] - lat[i]) / 2.0) ** 2 + np.cos(lat[i]) * np.cos(lat[j]) * np.sin((lon[j] - lon[i]) / 2.0) ** 2
+    d = 2.0 * r_m * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    close = d <= radius_m
+    return i[close], j[close], d[close]
+
+
+def run_coordinate_qa(
+    queryset=None,
+    *,
+    base_dir: Path,
+    radius_m: float = DEFAULT_DUPLICATE_RADIUS_M,
+) -> CoordQAResult:
+    """Координаттай бүх Location-ийг шалгаж CoordQAResult буцаана."""
+    from inventory.models import Location
+
+    qs = queryset if queryset is not None else Location.objects.all()
+    rows = list(
+        qs.filter(latitude__isnull=False, longitude__isnull=False)
+        .order_by("pk")
+        .values_list("id", "longitude", "latitude", "aimag_ref_id")
+    )
+    res = CoordQAResult(scanned=len(rows))
+    if not rows:
+        return res
+
+    ids_t, lons_t, lats_t, aimag_t = zip(*rows)
+    ids = np.asarray(ids_t, dtype=np.int64)
+    lons = np.asarray(lons_t, dtype="float64")
+    lats = np.asarray(lats_t, dtype="float64")
+    ref_aimag = np.asarray([a or 0 for a in aimag_t], dtype=np.int64)
+
+    matcher = AdminUnitMatcher.from_db()
+    country = load_country_geometry(base_dir)
+
+    zero = (np.abs(lons) < 1e-9) & (np.abs(lats) < 1e-9)
+    inside = shapely.contains_xy(country, lons, lats)
+    outside = ~inside & ~zero
+    swapped = outside & shapely.contains_xy(country, lats, lons)
+
+    for k in np.flatnonzero(zero).tolist():
+        res.issues.append(CoordIssue(int(ids[k]), "zero", "0, 0"))
+    for k in np.flatnonzero(outside).tolist():
+        if swapped[k]:
+            res.issues.append(CoordIssue(int(ids[k]), "swapped", f"lat={lons[k]:.6f}, lon={lats[k]:.6f} болгож засах"))
+        else:
+            res.issues.append(CoordIssue(int(ids[k]), "out_of_country", f"{lats[k]:.6f}, {lons[k]:.6f}"))
+
+    # Өөрийн аймгийн polygon-оор (аймаг бүрт нэг vectorized дуудлага)
+    aimag_geoms = load_aimag_geometries(base_dir, matcher)
+    wrong = np.zeros(ids.shape, dtype=bool)
+    for aimag_id, geom in aimag_geoms.items():
+        sel = np.flatnonzero(inside & (ref_aimag == aimag_id))
+        if sel.size:
+            wrong[sel] = ~shapely.contains_xy(geom, lons[sel], lats[sel])
+    if wrong.any():
+        index = load_admin_units_index(base_dir)
+        feat_aimag, _ = matcher.match_features(index)
+        hit = index.locate(lons[wrong], lats[wrong])
+        detected = np.where(hit >= 0, feat_aimag[np.maximum(hit, 0)], 0)
+        for k, det in zip(np.flatnonzero(wrong).tolist(), detected.tolist()):
+            res.issues.append(
+                CoordIssue(int(ids[k]), "wrong_aimag", f"aimag_ref={int(ref_aimag[k])}", detected_aimag_id=int(det) or None)
+            )
+
+    # Давхардлыг зөвхөн хил доторх цэгүүдэд (буруу координат grid-ийг сарниулахгүй)
+    vidx = np.flatnonzero(inside)
+    di, dj, dd = find_near_duplicates(lons[vidx], lats[vidx], radius_m)
+    for a, b, d in zip(vidx[di].tolist(), vidx[dj].tolist(), dd.tolist()):
+        res.issues.append(CoordIssue(int(ids[a]), "near_duplicate", f"{d:.1f} м", other_id=int(ids[b]), distance_m=round(d, 1)))
+    return res
@@ -1,12 +1,12 @@
 # inventory/geo/district_lookup.py
 from __future__ import annotations
 
-import json
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
-from shapely.geometry import shape, Point
+from inventory.geo.geometry_cache import load_geojson_features
+from inventory.geo.polygon_index import PolygonIndex
 
 # Path in your project: BASE_DIR/static/data/ub_districts.geojson
 # We keep it relative so it works on Windows too.
@@ -15,15 +15,14 @@ UB_GEOJSON_REL = Path("static") / "data" / "ub_districts.geojson"
 
 @lru_cache(maxsize=1)
 def _load_features(base_dir: Path):
-    fp = base_dir / UB_GEOJSON_REL
-    data = json.loads(fp.read_text(encoding="utf-8"))
-    feats = data.get("features", [])
-    parsed = []
-    for ft in feats:
-        geom = shape(ft["geometry"])
-        props = ft.get("properties", {})
-        parsed.append((geom, props))
-    return parsed
+    # GeoJSON-ийг зөвхөн файл өөрчлөгдсөн үед parse хийнэ (WKB кэш)
+    return load_geojson_features(base_dir / UB_GEOJSON_REL)
+
+
+@lru_cache(maxsize=1)
+def load_ub_district_index(base_dir: Path) -> PolygonIndex:
+    """STRtree + prepared polygons, built once per process."""
+    return PolygonIndex(_load_features(base_dir))
 
 
 def lookup_ub_district(lon: float, lat: float, base_dir: Path) -> Optional[Dict[str, Any]]:
@@ -31,8 +30,13 @@ def lookup_ub_district(lon: float, lat: float, base_dir: Path) -> Optional[Dict[
     Returns district properties if (lon,lat) falls inside a UB district polygon.
     base_dir should be your Django BASE_DIR (Path object).
     """
-    pt = Point(float(lon), float(lat))
-    for geom, props in _load_features(base_dir):
-        if geom.contains(pt):
-            return props
-    return None
\ No newline at end of file
+    return load_ub_district_index(base_dir).lookup(float(lon), float(lat))
+
+
+def lookup_ub_districts(lons, lats, base_dir: Path) -> List[Optional[Dict[str, Any]]]:
+    """
+    Batch хувилбар: lons/lats (list эсвэл NumPy массив) -> district props жагсаалт.
+    Бүх цэгийг нэг vectorized point-in-polygon дамжлагаар шийднэ;
+    олдоогүй цэг дээр None буцаана.
+    """
+    return load_ub_district_index(base_dir).lookup_many(lons, lats)
@@ -0,0 +1,106 @@
+# inventory/geo/geohash.py
+from __future__ import annotations
+
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_ARR = np.frombuffer(BASE32.encode("ascii"), dtype=np.uint8)
+
+# Location.geohash-д хадгалах нарийвчлал (~4.8m x 4.8m)
+GEOHASH_PRECISION = 9
+# bbox-ийг хамрах prefix-ийн дээд тоо (түүнээс олон бол бүдүүн prefix сонгоно)
+MAX_COVER_CELLS = 32
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """precision -> (lon_deg, lat_deg) нүдний хэмжээ."""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 360.0 / (1 << lon_bits), 180.0 / (1 << lat_bits)
+
+
+def encode_many(lons, lats, precision: int = GEOHASH_PRECISION) -> List[str]:
+    """Vectorized geohash encode; NaN координатад "" буцаана."""
+    lon = np.asarray(lons, dtype="float64").ravel()
+    lat = np.asarray(lats, dtype="float64").ravel()
+    valid = np.isfinite(lon) & np.isfinite(lat)
+
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+
+    # [0, 2^k) бүхэл индекс болгох
+    xi = np.floor((np.clip(np.where(valid, lon, 0.0), -180.0, 180.0) + 180.0) / 360.0 * (1 << lon_bits)).astype(np.int64)
+    yi = np.floor((np.clip(np.where(valid, lat, 0.0), -90.0, 90.0) + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64)
+    xi = np.minimum(xi, (1 << lon_bits) - 1)
+    yi = np.minimum(yi, (1 << lat_bits) - 1)
+
+    # Interleave: хамгийн ахлах бит = lon
+    code = np.zeros(lon.shape, dtype=np.int64)
+    xb, yb = lon_bits - 1, lat_bits - 1
+    for i in range(bits):
+        if i % 2 == 0:
+            code = (code << 1) | ((xi >> xb) & 1)
+            xb -= 1
+        else:
+            code = (code << 1) | ((yi >> yb) & 1)
+            yb -= 1
+
+    chars = np.empty((lon.shape[0], precision), dtype=np.uint8)
+    for j in range(precision):
+        shift = 5 * (precision - 1 - j)
+        chars[:, j] = _BASE32_ARR[(code >> shift) & 31]
+
+    out = [row.tobytes().decode("ascii") for row in chars]
+    return [h if ok else "" for h, ok in zip(out, valid.tolist())]
+
+
+def encode(lon: float, lat: float, precision: int = GEOHASH_PRECISION) -> str:
+    return encode_many([lon], [lat], precision)[0]
+
+
+def cover_bbox(
+    min_lon: float, min_lat: float, max_lon: float, max_lat: float, max_cells: int = MAX_COVER_CELLS
+) -> List[str]:
+    """
+    bbox-ийг бүрэн хамрах geohash prefix-ууд. Prefix бүр индекс дээрх нэг
+    range scan (geohash >= p AND geohash < p + "{") болно.
+    """
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+
+    precision = 1
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        dlon, dlat = _cell_size(p)
+        nx = math.floor(max_lon / dlon) - math.floor(min_lon / dlon) + 1
+        ny = math.floor(max_lat / dlat) - math.floor(min_lat / dlat) + 1
+        if nx * ny <= max_cells:
+            precision = p
+            break
+
+    dlon, dlat = _cell_size(precision)
+    xs = np.arange(math.floor(min_lon / dlon), math.floor(max_lon / dlon) + 1) * dlon + dlon / 2
+    ys = np.arange(math.floor(min_lat / dlat), math.floor(max_lat / dlat) + 1) * dlat + dlat / 2
+    gx, gy = np.meshgrid(np.clip(xs, -180, 180), np.clip(ys, -90, 90))
+    return sorted(set(encode_many(gx.ravel(), gy.ravel(), precision)))
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """'wx4' -> 'wx4{'  ('{' нь base32-ийн бүх тэмдэгтээс их)."""
+    return prefix + "{"
+
+
+def merge_prefixes(prefixes: Sequence[str]) -> List[Tuple[str, str]]:
+    """Prefix-уудыг [lo, hi) range болгож, давхцлыг нэгтгэнэ."""
+    ranges = sorted((p, prefix_upper_bound(p)) for p in prefixes)
+    merged: List[Tuple[str, str]] = []
+    for lo, hi in ranges:
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
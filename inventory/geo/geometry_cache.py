@@ -0,0 +1,126 @@
+# inventory/geo/geometry_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import shapely
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from shapely.geometry import shape
+
+logger = logging.getLogger(__name__)
+
+# Кэш файлын бүтэц өөрчлөгдвөл нэмэгдүүлнэ
+CACHE_FORMAT_VERSION = 1
+CACHE_SUFFIX = ".cache"
+
+
+def _served_dirs() -> List[Path]:
+    dirs = [getattr(settings, "MEDIA_ROOT", None), getattr(settings, "STATIC_ROOT", None)]
+    for entry in getattr(settings, "STATICFILES_DIRS", None) or []:
+        dirs.append(entry[1] if isinstance(entry, (list, tuple)) else entry)
+    return [Path(d).resolve() for d in dirs if d]
+
+
+def geometry_cache_root() -> Path:
+    """
+    settings.GEOMETRY_CACHE_DIR (default BASE_DIR/var/geometry_cache). Pickle-ийг вэбээр
+    serve хийгддэг (static/media) хавтсаас ачаалахгүй — ImproperlyConfigured.
+    """
+    base = getattr(settings, "GEOMETRY_CACHE_DIR", None) or Path(settings.BASE_DIR) / "var" / "geometry_cache"
+    root = Path(base).resolve()
+    for served in _served_dirs():
+        if root == served or served in root.parents:
+            raise ImproperlyConfigured(f"GEOMETRY_CACHE_DIR must not be inside a served directory ({served}).")
+    return root
+
+
+def cache_path_for(fp: Path) -> Path:
+    """static/data/ub_districts.geojson -> <GEOMETRY_CACHE_DIR>/ub_districts.geojson-<зам hash>.cache"""
+    path_hash = hashlib.sha1(str(Path(fp).resolve()).encode("utf-8")).hexdigest()[:10]
+    return geometry_cache_root() / f"{fp.name}-{path_hash}{CACHE_SUFFIX}"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _parse_geojson(raw: bytes) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    data = json.loads(raw.decode("utf-8"))
+    geoms, props = [], []
+    for ft in data.get("features", []):
+        geoms.append(shape(ft["geometry"]))
+        props.append(ft.get("properties", {}))
+    return geoms, props
+
+
+def _read_cache(cache_fp: Path) -> Dict[str, Any] | None:
+    try:
+        with cache_fp.open("rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Geometry cache unreadable, rebuilding: %s", cache_fp)
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    return payload
+
+
+def _write_cache(cache_fp: Path, payload: Dict[str, Any]) -> None:
+    tmp = cache_fp.with_name(f"{cache_fp.name}.{os.getpid()}.tmp")
+    try:
+        cache_fp.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_fp)
+    except OSError:
+        # read-only хавтас гэх мэт: кэшгүйгээр үргэлжилнэ
+        logger.warning("Geometry cache not writable: %s", cache_fp)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def load_geojson_features(fp: Path) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    GeoJSON -> [(geometry, properties), ...] with a compiled WKB cache.
+
+    Кэш (GEOMETRY_CACHE_DIR доторх <file>-<hash>.cache) нь файлын mtime/size-аар хүчинтэй эсэхээ шалгана;
+    тэдгээр өөрчлөгдсөн ч агуулгын sha256 ижил бол (git checkout г.м.)
+    GeoJSON-ийг дахин parse хийлгүй зөвхөн толгойг шинэчилнэ.
+    """
+    st = fp.stat()  # FileNotFoundError -> дуудагч талд
+    cache_fp = cache_path_for(fp)
+    payload = _read_cache(cache_fp)
+
+    if payload and payload["mtime_ns"] == st.st_mtime_ns and payload["size"] == st.st_size:
+        geoms = shapely.from_wkb(payload["wkb"])
+        return list(zip(geoms.tolist(), payload["props"]))
+
+    raw = fp.read_bytes()
+    digest = _sha256(raw)
+
+    if payload and payload["sha256"] == digest:
+        geoms = shapely.from_wkb(payload["wkb"]).tolist()
+        props = payload["props"]
+    else:
+        geoms, props = _parse_geojson(raw)
+        payload = {"wkb": shapely.to_wkb(geoms).tolist() if geoms else [], "props": props}
+
+    payload.update(
+        version=CACHE_FORMAT_VERSION,
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+        sha256=digest,
+    )
+    _write_cache(cache_fp, payload)
+    return list(zip(geoms, props))
@@ -0,0 +1,185 @@
+# inventory/geo/layers.py
+"""
+Хилийн GeoJSON давхаргуудыг (УБ дүүрэг, аймаг/сум) вэбээр түгээх хувилбарууд.
+
+Давхарга бүрийг нарийвчлал (precision = аравтын орон) тус бүрт:
+  <cache>/<name>-<precision>-<source_sha>.geojson      — минимал JSON
+  <cache>/<name>-<precision>-<source_sha>.geojson.gz   — gzip -9
+  <cache>/<name>-<precision>-<source_sha>.geojson.br   — brotli (суусан бол)
+болгон урьдчилан шахна. precision=None бол эх координатыг хэвээр үлдээнэ;
+4 орон ≈ 11 м, 3 орон ≈ 110 м — алслагдсан аймгийн удаан сүлжээнд хэд дахин бага.
+
+ETag = хувилбарын агуулгын sha256 тул эх файл өөрчлөгдөх үед л өөрчлөгдөнө.
+Шинэ src_sha-тай хувилбар бичигдэхэд тэр (name, precision)-ийн хуучин файлуудыг устгана.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import shapely
+from django.conf import settings
+
+from inventory.geo.admin_units import ADMIN_UNITS_GEOJSON_REL
+from inventory.geo.district_lookup import UB_GEOJSON_REL
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# URL-ийн нэр -> BASE_DIR-ээс харьцангуй зам
+GEO_LAYERS: Dict[str, Path] = {
+    "ub_districts": UB_GEOJSON_REL,
+    "admin_units": ADMIN_UNITS_GEOJSON_REL,
+}
+# Зөвшөөрөгдсөн quantize нарийвчлал (аравтын орон); None = эх координат
+LAYER_PRECISIONS: Tuple[Optional[int], ...] = (None, 6, 5, 4, 3)
+# Хувилбарын файлын бүтэц өөрчлөгдвөл нэмэгдүүлнэ
+LAYER_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LayerVariant:
+    name: str
+    precision: Optional[int]
+    path: Path
+    etag: str
+    # "br" / "gzip" -> шахсан файлын зам
+    encoded: Dict[str, Path] = field(default_factory=dict)
+
+    def size(self, encoding: str = "") -> int:
+        return (self.encoded.get(encoding) or self.path).stat().st_size
+
+
+def layer_cache_root() -> Path:
+    return Path(getattr(settings, "GEO_LAYER_CACHE_DIR", None) or Path(settings.MEDIA_ROOT) / "geo_layers")
+
+
+def _round_coords(coords: Any, digits: int) -> Any:
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(c, digits) for c in coords]
+    return [_round_coords(c, digits) for c in coords]
+
+
+def quantize_geojson(raw: bytes, digits: Optional[int]) -> bytes:
+    """
+    GeoJSON FeatureCollection -> минимал (зай хоосон зайгүй) bytes.
+
+    digits өгвөл координатыг 10**-digits grid-д topology хадгалан (shapely.set_precision)
+    буулгаж, давхардсан оройг хасна. Grid-ээс жижиг болж алга болсон geometry-г орхино.
+    """
+    data = json.loads(raw.decode("utf-8"))
+    if digits is not None:
+        grid = 10.0 ** -digits
+        features = []
+        for ft in data.get("features", []):
+            geom_json = ft.get("geometry")
+            if geom_json:
+                geom = shapely.set_precision(shapely.from_geojson(json.dumps(geom_json)), grid)
+                if geom.is_empty:
+                    logger.info("Feature dropped at precision %s: %s", digits, ft.get("properties"))
+                    continue
+                geom_json = json.loads(shapely.to_geojson(geom))
+                geom_json["coordinates"] = _round_coords(geom_json["coordinates"], digits)
+            features.append({"type": "Feature", "properties": ft.get("properties") or {}, "geometry": geom_json})
+        data = {"type": "FeatureCollection", "features": features}
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_atomic(fp: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=fp.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, fp)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _encoded_paths(fp: Path) -> Dict[str, Path]:
+    out = {"gzip": fp.with_name(fp.name + ".gz")}
+    if brotli is not None:
+        out["br"] = fp.with_name(fp.name + ".br")
+    return out
+
+
+def _remove_stale_variants(root: Path, prefix: str, keep) -> None:
+    """Эх файл (src_sha) эсвэл LAYER_FORMAT_VERSION өөрчлөгдсөн хуучин хувилбарын файлуудыг устгана."""
+    for old in root.glob(f"{prefix}v*.geojson*"):
+        if old in keep or old.suffix == ".tmp":
+            continue
+        try:
+            old.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Stale geo layer variant not removed: %s (%s)", old, e)
+
+
+def build_layer_variant(base_dir: Path, name: str, precision: Optional[int]) -> LayerVariant:
+    """Хувилбарыг (байхгүй бол) бүтээж диск дээр хадгална. FileNotFoundError -> эх файл алга."""
+    src = Path(base_dir) / GEO_LAYERS[name]
+    raw = src.read_bytes()
+    src_sha = hashlib.sha256(raw).hexdigest()[:16]
+    tag = "full" if precision is None else f"p{precision}"
+    root = layer_cache_root()
+    root.mkdir(parents=True, exist_ok=True)
+    fp = root / f"{name}-{tag}-v{LAYER_FORMAT_VERSION}-{src_sha}.geojson"
+
+    encoded = _encoded_paths(fp)
+    try:
+        body = fp.read_bytes()
+    except FileNotFoundError:
+        body = quantize_geojson(raw, precision)
+        _write_atomic(fp, body)
+        _remove_stale_variants(root, f"{name}-{tag}-", keep={fp, *encoded.values()})
+
+    for enc, efp in encoded.items():
+        if efp.exists():
+            continue
+        if enc == "gzip":
+            # mtime=0: ижил оролт -> ижил bytes
+            _write_atomic(efp, gzip.compress(body, compresslevel=9, mtime=0))
+        else:
+            _write_atomic(efp, brotli.compress(body, quality=11))
+
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    return LayerVariant(name=name, precision=precision, path=fp, etag=etag, encoded=encoded)
+
+
+# (name, precision) -> (эх файлын (mtime_ns, size), LayerVariant)
+_variants: Dict[Tuple[str, Optional[int]], Tuple[Tuple[int, int], LayerVariant]] = {}
+_variants_lock = threading.Lock()
+
+
+def get_layer_variant(base_dir: Path, name: str, precision: Optional[int]) -> LayerVariant:
+    """
+    Process дотор memo-той get: эх файлын mtime/size өөрчлөгдөөгүй, хувилбарын
+    файл устаагүй бол дискээс дахин уншихгүй.
+    """
+    st = (Path(base_dir) / GEO_LAYERS[name]).stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = (name, precision)
+    with _variants_lock:
+        hit = _variants.get(key)
+    if hit and hit[0] == stamp and hit[1].path.exists():
+        return hit[1]
+    variant = build_layer_variant(base_dir, name, precision)
+    with _variants_lock:
+        _variants[key] = (stamp, variant)
+    return variant
@@ -0,0 +1,134 @@
+# inventory/geo/location_sync.py
+"""
+Location-ийн координатаас хамаарах талбаруудыг (aimag_ref, sum_ref, district_name)
+transaction commit хийгдсэний дараа, нэг transaction доторх бүх өөрчлөлтийг
+нэг vectorized дамжлагаар шинэчилнэ.
+
+Location.save() зөвхөн координат өөрчлөгдсөн үед schedule_location_geo_sync()-ийг дуудна.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Set
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from inventory.geo.admin_units import AdminUnitMatcher, resolve_admin_units
+from inventory.geo.district_lookup import lookup_ub_districts
+
+logger = logging.getLogger(__name__)
+
+UB_AIMAG_NAME = "Улаанбаатар"
+
+_local = threading.local()
+
+
+class _PendingBatch:
+    def __init__(self, using: str):
+        self.using = using
+        self.ids: Set[int] = set()
+
+    def flush(self) -> None:
+        batches = getattr(_local, "batches", {})
+        if batches.get(self.using) is self:
+            del batches[self.using]
+        if self.ids:
+            sync_location_geo(self.ids, base_dir=Path(settings.BASE_DIR), using=self.using)
+
+
+def _is_registered(batch: _PendingBatch) -> bool:
+    # Savepoint/transaction rollback хийгдвэл on_commit callback устдаг
+    conn = transaction.get_connection(batch.using)
+    return any(item[1] == batch.flush for item in conn.run_on_commit)
+
+
+def schedule_location_geo_sync(location_id: int, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    location_id-г commit-ийн дараах batch-д нэмнэ. Нэг transaction доторх
+    олон save -> нэг on_commit callback; autocommit үед шууд ажиллана.
+    """
+    batches = _local.__dict__.setdefault("batches", {})
+    batch = batches.get(using)
+    if batch is not None and _is_registered(batch):
+        batch.ids.add(int(location_id))
+        return
+
+    batch = batches[using] = _PendingBatch(using)
+    batch.ids.add(int(location_id))
+    transaction.on_commit(batch.flush, using=using)
+
+
+def sync_location_geo(location_ids: Iterable[int], *, base_dir: Path, using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Өгсөн Location-уудын aimag_ref / sum_ref / district_name-ийг координатаас
+    тооцоолж, өөрчлөгдсөнийг нь bulk_update хийнэ. Шинэчилсэн мөрийн тоог буцаана.
+
+    Хилийн GeoJSON байхгүй бол (dev орчин) анхааруулга бичээд алгасна;
+    бусад алдаа дээш дамжина.
+    """
+    from inventory.models import Aimag, Location
+
+    ids = sorted({int(i) for i in location_ids})
+    if not ids:
+        return 0
+
+    rows = list(
+        Location.objects.using(using)
+        .filter(id__in=ids, latitude__isnull=False, longitude__isnull=False)
+        .values_list("id", "longitude", "latitude", "aimag_ref_id", "sum_ref_id", "district_name")
+    )
+    if not rows:
+        return 0
+    loc_ids, lons, lats, old_aimag, old_sum, old_district = zip(*rows)
+
+    try:
+        new_aimag, new_sum = resolve_admin_units(lons, lats, base_dir, matcher=AdminUnitMatcher.from_db())
+    except FileNotFoundError as e:
+        logger.warning("Admin unit boundaries not available, aimag/sum not resolved: %s", e)
+        new_aimag = new_sum = None
+
+    ub_ids = {aid for aid, name in Aimag.objects.using(using).values_list("id", "name") if (name or "").strip() == UB_AIMAG_NAME}
+
+    out = []
+    for k, loc_id in enumerate(loc_ids):
+        aimag_id, sum_id = old_aimag[k], old_sum[k]
+        if new_aimag is not None and new_aimag[k]:
+            na, ns = int(new_aimag[k]), int(new_sum[k])
+            if ns:
+                sum_id = ns
+            elif na != aimag_id:
+                sum_id = None
+            aimag_id = na
+        out.append([loc_id, lons[k], lats[k], aimag_id, sum_id, old_district[k]])
+
+    ub_rows = [r for r in out if r[3] in ub_ids]
+    if ub_rows:
+        try:
+            props = lookup_ub_districts([r[1] for r in ub_rows], [r[2] for r in ub_rows], base_dir)
+        except FileNotFoundError as e:
+            logger.warning("UB district boundaries not available: %s", e)
+            props = [None] * len(ub_rows)
+        for r, p in zip(ub_rows, props):
+            if p and p.get("name_mn"):
+                r[5] = p["name_mn"]
+
+    changed = [
+        Location(id=r[0], aimag_ref_id=r[3], sum_ref_id=r[4], district_name=r[5])
+        for k, r in enumerate(out)
+        if (r[3], r[4], r[5]) != (old_aimag[k], old_sum[k], old_district[k])
+    ]
+    if changed:
+        Location.objects.using(using).bulk_update(changed, ["aimag_ref", "sum_ref", "district_name"])
+        # bulk_update нь post_save дуудахгүй: багажийн aimag/sum, scope-оор шүүсэн кэшүүдийг шинэчилнэ
+        from inventory.device_moves import sync_device_admin_units
+        from inventory.map_data import bump_map_cache_version
+        from inventory.station_tiles import invalidate_station_tiles
+
+        changed_ids = {c.id for c in changed}
+        sync_device_admin_units(changed_ids, using=using)
+        bump_map_cache_version(clear_tiles=False)
+        invalidate_station_tiles([(r[1], r[2]) for r in out if r[0] in changed_ids])
+    return len(changed)
@@ -0,0 +1,134 @@
+# inventory/geo/mvt.py
+"""
+Mapbox Vector Tile (v2.1) — зөвхөн Point давхаргад зориулсан жижиг encoder.
+
+mapbox_vector_tile / protobuf хамаарал нэмэхгүйн тулд vector_tile.proto-гийн
+хэрэгтэй хэсгийг гараар кодлоно:
+
+  Tile    { repeated Layer layers = 3; }
+  Layer   { required uint32 version = 15; required string name = 1;
+            repeated Feature features = 2; repeated string keys = 3;
+            repeated Value values = 4; optional uint32 extent = 5; }
+  Feature { optional uint64 id = 1; repeated uint32 tags = 2 [packed];
+            optional GeomType type = 3; repeated uint32 geometry = 4 [packed]; }
+  Value   { string_value = 1; double_value = 3; sint64_value = 6; bool_value = 7; ... }
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, List, Sequence, Tuple
+
+MVT_VERSION = 2
+DEFAULT_EXTENT = 4096
+
+GEOM_POINT = 1
+_CMD_MOVE_TO = 1
+
+_WIRE_VARINT = 0
+_WIRE_64BIT = 1
+_WIRE_LEN = 2
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    n &= (1 << 64) - 1
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _tag(field: int, wire: int) -> bytes:
+    return _varint((field << 3) | wire)
+
+
+def _len_field(field: int, payload: bytes) -> bytes:
+    return _tag(field, _WIRE_LEN) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values: Sequence[int]) -> bytes:
+    return _len_field(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(v: Any) -> bytes:
+    if isinstance(v, bool):
+        return _tag(7, _WIRE_VARINT) + _varint(int(v))
+    if isinstance(v, int):
+        return _tag(6, _WIRE_VARINT) + _varint(_zigzag(v))
+    if isinstance(v, float):
+        return _tag(3, _WIRE_64BIT) + struct.pack("<d", v)
+    return _len_field(1, str(v).encode("utf-8"))
+
+
+def _value_key(v: Any) -> Tuple[str, Any]:
+    # 1 ба True, 1 ба 1.0-ийг ялгаж dedupe хийнэ
+    return (type(v).__name__, v)
+
+
+def encode_point_layer(
+    name: str,
+    points: Sequence[Tuple[int, int]],
+    properties: Sequence[Dict[str, Any]],
+    ids: Sequence[int] | None = None,
+    extent: int = DEFAULT_EXTENT,
+) -> bytes:
+    """
+    Нэг Point давхарга (Layer message). points нь tile-ийн пикселийн
+    координат (0..extent, buffer-ийн улмаас хасах/давсан байж болно).
+    None утгатай property алгасагдана.
+    """
+    keys: List[str] = []
+    key_idx: Dict[str, int] = {}
+    values: List[Any] = []
+    value_idx: Dict[Tuple[str, Any], int] = {}
+
+    features = bytearray()
+    for i, ((px, py), props) in enumerate(zip(points, properties)):
+        tags: List[int] = []
+        for k, v in props.items():
+            if v is None:
+                continue
+            ki = key_idx.get(k)
+            if ki is None:
+                ki = key_idx[k] = len(keys)
+                keys.append(k)
+            vk = _value_key(v)
+            vi = value_idx.get(vk)
+            if vi is None:
+                vi = value_idx[vk] = len(values)
+                values.append(v)
+            tags.extend((ki, vi))
+
+        geom = (_CMD_MOVE_TO & 0x7) | (1 << 3), _zigzag(int(px)), _zigzag(int(py))
+        feat = bytearray()
+        if ids is not None:
+            feat += _tag(1, _WIRE_VARINT) + _varint(int(ids[i]))
+        if tags:
+            feat += _packed(2, tags)
+        feat += _tag(3, _WIRE_VARINT) + _varint(GEOM_POINT)
+        feat += _packed(4, geom)
+        features += _len_field(2, bytes(feat))
+
+    layer = bytearray()
+    layer += _tag(15, _WIRE_VARINT) + _varint(MVT_VERSION)
+    layer += _len_field(1, name.encode("utf-8"))
+    layer += features
+    for k in keys:
+        layer += _len_field(3, k.encode("utf-8"))
+    for v in values:
+        layer += _len_field(4, _encode_value(v))
+    layer += _tag(5, _WIRE_VARINT) + _varint(extent)
+    return bytes(layer)
+
+
+def encode_tile(layers: Sequence[bytes]) -> bytes:
+    """Layer message-үүдийг Tile болгоно."""
+    return b"".join(_len_field(3, layer) for layer in layers)
@@ -0,0 +1,88 @@
+# inventory/geo/nearest.py
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_xyz(lons, lats) -> np.ndarray:
+    """lon/lat (degree) -> бөмбөрцгийн нэгж вектор (n x 3)."""
+    lon = np.radians(np.asarray(lons, dtype="float64"))
+    lat = np.radians(np.asarray(lats, dtype="float64"))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def haversine_km(lon1, lat1, lons2, lats2) -> np.ndarray:
+    """Нэг цэгээс олон цэг хүртэлх haversine зай (км), vectorized."""
+    lon1, lat1 = np.radians(lon1), np.radians(lat1)
+    lon2 = np.radians(np.asarray(lons2, dtype="float64"))
+    lat2 = np.radians(np.asarray(lats2, dtype="float64"))
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class NearestIndex:
+    """
+    Координатын санах ойн индекс: k-nearest ба радиусын хайлт.
+
+    Цэгүүдийг нэгж вектор болгон нэг удаа хадгална; хайлт бүр нь нэг
+    матриц-вектор үржвэр (n x 3) + argpartition тул хэдэн мянган станцад
+    миллисекундээс бага хугацаа зарцуулна.
+
+    Зай нь хөвчийн уртаас (chord) great-circle зай руу хөрвүүлсэн тул
+    haversine-тай ижил утгатай.
+    """
+
+    def __init__(self, lons, lats):
+        self.lons = np.asarray(lons, dtype="float64")
+        self.lats = np.asarray(lats, dtype="float64")
+        self.xyz = unit_xyz(self.lons, self.lats)
+
+    def __len__(self) -> int:
+        return int(self.lons.shape[0])
+
+    def distances_km(self, lon: float, lat: float, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        q = unit_xyz([lon], [lat])[0]
+        cos_d = self.xyz @ q
+        d = EARTH_RADIUS_KM * np.arccos(np.clip(cos_d, -1.0, 1.0))
+        if mask is not None:
+            d = np.where(mask, d, np.inf)
+        return d
+
+    def query(
+        self,
+        lon: float,
+        lat: float,
+        k: Optional[int] = None,
+        radius_km: Optional[float] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (индексүүд, зай км) — ойроос хол руу эрэмбэлсэн.
+
+        k өгвөл хамгийн ойр k, radius_km өгвөл тэр радиус доторх бүгд
+        (хоёуланг нь өгвөл радиус доторх хамгийн ойр k).
+        mask=False цэгүүдийг (төрөл, өөрийгөө гэх мэт) хасна.
+        """
+        n = len(self)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0))
+        if n == 0 or (k is not None and k <= 0):
+            return empty
+
+        d = self.distances_km(lon, lat, mask)
+        if radius_km is not None:
+            idx = np.flatnonzero(d <= radius_km)
+        else:
+            idx = np.flatnonzero(np.isfinite(d))
+
+        if k is not None and idx.shape[0] > k:
+            part = np.argpartition(d[idx], k - 1)[:k]
+            idx = idx[part]
+
+        order = np.argsort(d[idx], kind="stable")
+        idx = idx[order]
+        return idx, d[idx]
@@ -0,0 +1,81 @@
+# inventory/geo/polygon_index.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+
+class PolygonIndex:
+    """
+    Point-in-polygon index over a fixed list of (geometry, properties).
+
+    - STRtree нь bbox-оор нэр дэвшигчдийг O(log n)-ээр шүүнэ.
+    - Polygon-ууд prepare() хийгдсэн тул contains шалгалт хурдан.
+    - locate() нь NumPy массив цэгүүдийг нэг дор (vectorized) шийднэ.
+
+    Давхцсан polygon-д цэг орвол жагсаалтын эхний feature ялна
+    (хуучин `for geom in features: if geom.contains(pt)` логиктой ижил).
+    """
+
+    def __init__(self, features: Sequence[Tuple[Any, Dict[str, Any]]]):
+        self.geoms = np.asarray([g for g, _ in features], dtype=object)
+        self.props: List[Dict[str, Any]] = [p for _, p in features]
+        shapely.prepare(self.geoms)
+        self.tree = STRtree(self.geoms)
+
+    def __len__(self) -> int:
+        return len(self.props)
+
+    def locate(self, lons, lats) -> np.ndarray:
+        """
+        Return an int array (same length as input) with the index of the
+        containing feature, or -1 when the point is outside every polygon
+        (or lon/lat is NaN).
+        """
+        xs = np.asarray(lons, dtype="float64").ravel()
+        ys = np.asarray(lats, dtype="float64").ravel()
+        if xs.shape != ys.shape:
+            raise ValueError("lons and lats must have the same length")
+
+        n = xs.shape[0]
+        out = np.full(n, -1, dtype=np.int64)
+        if n == 0 or len(self) == 0:
+            return out
+
+        valid = np.isfinite(xs) & np.isfinite(ys)
+        if not valid.any():
+            return out
+
+        pts = np.full(n, None, dtype=object)
+        pts[valid] = shapely.points(xs[valid], ys[valid])
+
+        # 1) bbox candidates from the tree: shape (2, k) -> (point_idx, feature_idx)
+        pt_idx, ft_idx = self.tree.query(pts[valid])
+        if pt_idx.size == 0:
+            return out
+        pt_idx = np.flatnonzero(valid)[pt_idx]
+
+        # 2) exact test on prepared polygons, vectorized
+        hit = shapely.contains(self.geoms[ft_idx], pts[pt_idx])
+        if not hit.any():
+            return out
+
+        # 3) first matching feature per point
+        first = np.full(n, len(self), dtype=np.int64)
+        np.minimum.at(first, pt_idx[hit], ft_idx[hit])
+        found = first < len(self)
+        out[found] = first[found]
+        return out
+
+    def locate_one(self, lon: float, lat: float) -> int:
+        return int(self.locate([lon], [lat])[0])
+
+    def lookup(self, lon: float, lat: float) -> Optional[Dict[str, Any]]:
+        i = self.locate_one(lon, lat)
+        return self.props[i] if i >= 0 else None
+
+    def lookup_many(self, lons, lats) -> List[Optional[Dict[str, Any]]]:
+        return [self.props[i] if i >= 0 else None for i in self.locate(lons, lats).tolist()]
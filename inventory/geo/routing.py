@@ -0,0 +1,118 @@
+# inventory/geo/routing.py
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from inventory.geo.nearest import EARTH_RADIUS_KM, unit_xyz
+
+# 2-opt-ийн бүтэн давталтын дээд тоо (ихэвчлэн 5-15 давталтад тогтворждог)
+TWO_OPT_MAX_PASSES = 50
+_EPS = 1e-9
+
+
+def distance_matrix_km(lons, lats) -> np.ndarray:
+    """n x n great-circle зайн матриц (км), нэг матриц үржвэрээр."""
+    xyz = unit_xyz(lons, lats)
+    cos_d = np.clip(xyz @ xyz.T, -1.0, 1.0)
+    d = EARTH_RADIUS_KM * np.arccos(cos_d)
+    np.fill_diagonal(d, 0.0)
+    return d
+
+
+def nearest_neighbour_tour(dist: np.ndarray, start: int = 0) -> np.ndarray:
+    """Хамгийн ойр хөршийн (greedy) тойрог: start-аас эхэлнэ."""
+    n = dist.shape[0]
+    tour = np.empty(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=bool)
+    cur = start
+    for k in range(n):
+        tour[k] = cur
+        visited[cur] = True
+        if k == n - 1:
+            break
+        row = np.where(visited, np.inf, dist[cur])
+        cur = int(np.argmin(row))
+    return tour
+
+
+def two_opt(dist: np.ndarray, tour: np.ndarray, max_passes: int = TWO_OPT_MAX_PASSES) -> np.ndarray:
+    """
+    Битүү тойргийг 2-opt-оор сайжруулна. i бүрт бүх j-ийн өөрчлөлтийг
+    vectorized-аар тооцоолж хамгийн сайныг нь авна; tour[0] байрандаа үлдэнэ.
+    """
+    t = tour.copy()
+    m = t.shape[0]
+    if m < 4:
+        return t
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(m - 2):
+            a, b = t[i], t[i + 1]
+            js = np.arange(i + 2, m if i > 0 else m - 1)
+            if js.size == 0:
+                continue
+            c = t[js]
+            d = t[(js + 1) % m]
+            delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+            k = int(np.argmin(delta))
+            if delta[k] < -_EPS:
+                j = int(js[k])
+                t[i + 1 : j + 1] = t[i + 1 : j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return t
+
+
+def solve_route(
+    dist: np.ndarray, start: Optional[int] = None, return_to_start: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Зочлох дараалал (nearest-neighbour + 2-opt) ба алхам бүрийн зай.
+
+    start=None бол хамгийн богино нээлттэй замыг (эхлэл чөлөөтэй) хайна.
+    return_to_start=True бол эхлэл рүү буцах битүү тойрог, сүүлийн
+    алхам (буцах зам) legs-д орно.
+
+    Нээлттэй замыг "dummy" оройтой битүү тойрог болгон шийднэ:
+    dummy -> start зай 0, бусад руу ижил тогтмол C тул dummy-ийн нэг
+    хөрш заавал start болж, нөгөө хөрш нь замын төгсгөл болно.
+    """
+    n = dist.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    if n == 1:
+        return np.zeros(1, dtype=np.int64), np.zeros(1 if return_to_start else 0)
+
+    if return_to_start:
+        s = 0 if start is None else int(start)
+        tour = two_opt(dist, nearest_neighbour_tour(dist, s))
+        legs = dist[tour, np.roll(tour, -1)]
+        return tour, legs
+
+    big = float(dist.max()) * n + 1.0
+    ext = np.zeros((n + 1, n + 1), dtype="float64")
+    ext[:n, :n] = dist
+    if start is not None:
+        ext[n, :n] = big
+        ext[:n, n] = big
+        ext[n, int(start)] = ext[int(start), n] = 0.0
+
+    first = n if start is None else int(start)
+    tour = two_opt(ext, nearest_neighbour_tour(ext, first))
+    # dummy дээр тасалж, start-аас эхлэх чиглэлд эргүүлнэ
+    pos = int(np.flatnonzero(tour == n)[0])
+    path = np.concatenate([tour[pos + 1 :], tour[:pos]])
+    if start is not None and path[0] != start:
+        path = path[::-1]
+    legs = dist[path[:-1], path[1:]]
+    return path.astype(np.int64), legs
+
+
+def route_order(lons, lats, start: Optional[int] = None, return_to_start: bool = False) -> Tuple[List[int], List[float]]:
+    """lon/lat массиваас шууд: (индексүүдийн дараалал, алхмын зай км)."""
+    tour, legs = solve_route(distance_matrix_km(lons, lats), start=start, return_to_start=return_to_start)
+    return tour.tolist(), legs.tolist()
@@ -0,0 +1,58 @@
+# inventory/geo/tiles.py
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+# Web Mercator (EPSG:3857) хязгаар
+MAX_LAT = 85.05112878
+TILE_SIZE = 256
+
+
+def lonlat_to_unit(lons, lats) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    lon/lat -> Web Mercator "unit" координат [0, 1) x [0, 1)
+    (x баруунаас зүүн тийш, y хойдоос урагш; tile z/x/y-тэй ижил чиглэл).
+    """
+    lon = np.asarray(lons, dtype="float64")
+    lat = np.clip(np.asarray(lats, dtype="float64"), -MAX_LAT, MAX_LAT)
+    x = (lon + 180.0) / 360.0
+    s = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1.0 + s) / (1.0 - s)) / (4.0 * math.pi)
+    return x, y
+
+
+def unit_to_lonlat(xs, ys) -> Tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(xs, dtype="float64")
+    y = np.asarray(ys, dtype="float64")
+    lon = x * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(math.pi * (1.0 - 2.0 * y))))
+    return lon, lat
+
+
+def tile_bounds_unit(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Tile (z, x, y) -> unit bbox (x0, y0, x1, y1)."""
+    n = float(2 ** z)
+    return x / n, y / n, (x + 1) / n, (y + 1) / n
+
+
+def tile_bounds_lonlat(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Tile (z, x, y) -> (min_lon, min_lat, max_lon, max_lat)."""
+    x0, y0, x1, y1 = tile_bounds_unit(z, x, y)
+    lons, lats = unit_to_lonlat([x0, x1], [y1, y0])
+    return float(lons[0]), float(lats[0]), float(lons[1]), float(lats[1])
+
+
+def parse_bbox(raw: str | None) -> Tuple[float, float, float, float] | None:
+    """'min_lon,min_lat,max_lon,max_lat' -> tuple; буруу бол ValueError."""
+    if not raw:
+        return None
+    parts = [float(p) for p in raw.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox min must be <= max")
+    return min_lon, min_lat, max_lon, max_lat
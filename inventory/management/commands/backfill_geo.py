@@ -0,0 +1,77 @@
+# inventory/management/commands/backfill_geo.py
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from inventory.geo.admin_units import fix_location_admin_units, load_admin_units_index
+from inventory.geo.district_lookup import load_ub_district_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Location-уудын district_name / sum_ref-ийг координатаар бөөнөөр нь тооцоолж "
+        "зөвхөн өөрчлөгдсөн мөрүүдийг bulk_update хийнэ (хилийн давхарга шинэчлэгдсэний дараа ажиллуулна)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="DB-д бичихгүй, зөвхөн diff хэвлэнэ.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Нэг удаад унших/бичих мөр (default 5000).")
+        parser.add_argument("--fix-aimag", action="store_true", help="aimag_ref буруу бол мөн засна.")
+        parser.add_argument("--show", type=int, default=20, help="Хэвлэх өөрчлөлтийн жишээ мөрийн тоо.")
+
+    def handle(self, *args, **opts):
+        dry_run = bool(opts["dry_run"])
+        chunk_size = max(1, int(opts["chunk_size"]))
+        fix_aimag = bool(opts["fix_aimag"])
+        show = max(0, int(opts["show"]))
+        base_dir = settings.BASE_DIR
+        t0 = time.monotonic()
+
+        # --- Layers (аль нэг нь байхгүй бол тэр хэсгийг алгасна) ---
+        try:
+            ub_index = load_ub_district_index(base_dir)
+        except FileNotFoundError:
+            ub_index = None
+            self.stdout.write(self.style.WARNING("UB дүүргийн давхарга олдсонгүй: district_name алгасна."))
+
+        try:
+            load_admin_units_index(base_dir)
+            has_admin_layer = True
+        except FileNotFoundError:
+            has_admin_layer = False
+            self.stdout.write(self.style.WARNING("Улсын хилийн давхарга олдсонгүй: sum_ref алгасна."))
+
+        if ub_index is None and not has_admin_layer:
+            return
+
+        res = fix_location_admin_units(
+            base_dir=base_dir,
+            chunk_size=chunk_size,
+            dry_run=dry_run,
+            fix_aimag=fix_aimag,
+            admin_units=has_admin_layer,
+            districts=ub_index is not None,
+        )
+
+        for loc_id, oa, na, os_, ns, od, nd in res.changes[:show]:
+            changed = []
+            if na != oa:
+                changed.append(f"aimag {oa}→{na}")
+            if ns != os_:
+                changed.append(f"sum {os_}→{ns}")
+            if nd != od:
+                changed.append(f"district '{od}'→'{nd}'")
+            self.stdout.write(f"  #{loc_id}: " + ", ".join(changed))
+
+        elapsed = time.monotonic() - t0
+        prefix = "[DRY-RUN] " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Шалгасан: {res.scanned}, district өөрчлөлт: {res.district_changed}, "
+                f"sum өөрчлөлт: {res.sum_changed}, aimag өөрчлөлт: {res.aimag_changed}, "
+                f"бичсэн: {res.updated} ({elapsed:.2f}s)"
+            )
+        )
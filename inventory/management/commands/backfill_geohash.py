@@ -0,0 +1,44 @@
+# inventory/management/commands/backfill_geohash.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.geo.admin_units import iter_chunks
+from inventory.geo.geohash import encode_many
+from inventory.map_data import bump_map_cache_version
+from inventory.models import Location
+
+
+class Command(BaseCommand):
+    help = "Location.geohash баганыг координатаас бөөнөөр нь (vectorized) дахин тооцоолж бөглөнө."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="DB-д бичихгүй.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Нэг удаад унших/бичих мөр (default 5000).")
+
+    def handle(self, *args, **opts):
+        dry_run = bool(opts["dry_run"])
+        chunk_size = max(1, int(opts["chunk_size"]))
+
+        qs = Location.objects.order_by("pk").values_list("id", "longitude", "latitude", "geohash")
+        scanned = changed = 0
+
+        for chunk in iter_chunks(qs.iterator(chunk_size=chunk_size), chunk_size):
+            ids, lons, lats, old = zip(*chunk)
+            lons = [float("nan") if v is None else v for v in lons]
+            lats = [float("nan") if v is None else v for v in lats]
+            new = encode_many(lons, lats)
+
+            to_update = [Location(id=i, geohash=h) for i, h, o in zip(ids, new, old) if h != (o or "")]
+            scanned += len(chunk)
+            changed += len(to_update)
+            if to_update and not dry_run:
+                with transaction.atomic():
+                    Location.objects.bulk_update(to_update, ["geohash"], batch_size=chunk_size)
+
+        if changed and not dry_run:
+            bump_map_cache_version()
+
+        prefix = "[DRY-RUN] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Шалгасан: {scanned}, geohash өөрчлөгдсөн: {changed}"))
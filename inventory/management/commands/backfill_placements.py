@@ -0,0 +1,28 @@
+# inventory/management/commands/backfill_placements.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from inventory.placements import PLACEMENT_CHUNK, rebuild_placements
+
+
+class Command(BaseCommand):
+    help = (
+        "DevicePlacementInterval-ийг DeviceMovement түүхээс дахин үүсгэнэ "
+        "(багаж бүрийн хуучин интервалыг устгаад replay хийнэ)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--device", type=int, action="append", default=None, help="Device id (давтаж болно).")
+        parser.add_argument("--chunk-size", type=int, default=PLACEMENT_CHUNK, help=f"Нэг удаад боловсруулах багаж (default {PLACEMENT_CHUNK}).")
+
+    def handle(self, *args, **opts):
+        res = rebuild_placements(opts["device"], chunk_size=max(1, int(opts["chunk_size"])))
+        self.stdout.write(self.style.SUCCESS(f"Багаж: {res.devices}, интервал: {res.intervals}"))
+        if res.corrected:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Түүхийн сүүлийн байршил Device.location-той таараагүй: {res.corrected} багаж "
+                    "(одоогийн байршлыг энэ мөчөөс нээлттэй интервал болгов)."
+                )
+            )
@@ -0,0 +1,42 @@
+# inventory/management/commands/build_geo_layers.py
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.geo.layers import GEO_LAYERS, LAYER_PRECISIONS, brotli, build_layer_variant, layer_cache_root
+
+
+class Command(BaseCommand):
+    help = (
+        "Хилийн GeoJSON давхаргуудын quantize хийсэн, gzip/brotli-оор урьдчилан шахсан "
+        "хувилбаруудыг бүтээнэ (deploy-ийн үеэр ажиллуулна)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--layer", action="append", choices=sorted(GEO_LAYERS), help="Зөвхөн эдгээр давхарга.")
+
+    def handle(self, *args, **opts):
+        base_dir = Path(settings.BASE_DIR)
+        names = opts.get("layer") or list(GEO_LAYERS)
+        if brotli is None:
+            self.stderr.write(self.style.WARNING("brotli суугаагүй: зөвхөн gzip хувилбар бүтээнэ."))
+
+        built = 0
+        for name in names:
+            for precision in LAYER_PRECISIONS:
+                try:
+                    v = build_layer_variant(base_dir, name, precision)
+                except FileNotFoundError as e:
+                    self.stderr.write(self.style.WARNING(f"{name}: эх файл олдсонгүй ({e.filename})"))
+                    break
+                sizes = ", ".join(f"{enc}={v.size(enc) / 1024:.0f}KB" for enc in v.encoded)
+                tag = "full" if precision is None else f"p{precision}"
+                self.stdout.write(f"{name:<14} {tag:<5} {v.size() / 1024:8.0f}KB  ({sizes})  etag={v.etag[:12]}")
+                built += 1
+
+        if not built:
+            raise CommandError("Давхарга бүтээгдсэнгүй.")
+        self.stdout.write(self.style.SUCCESS(f"{built} хувилбар -> {layer_cache_root()}"))
@@ -63,12 +63,12 @@ class Command(BaseCommand):
         # We'll materialize: for each aimag and global total row (aimag=None)
         aimag_ids = list(
             set(
-                ms.values_list("device__location__aimag_ref_id", flat=True)
-                .exclude(device__location__aimag_ref_id__isnull=True)
+                ms.values_list("device__aimag_ref_id", flat=True)
+                .exclude(device__aimag_ref_id__isnull=True)
             )
             | set(
-                ca.values_list("device__location__aimag_ref_id", flat=True)
-                .exclude(device__location__aimag_ref_id__isnull=True)
+                ca.values_list("device__aimag_ref_id", flat=True)
+                .exclude(device__aimag_ref_id__isnull=True)
             )
         )
 
@@ -78,8 +78,8 @@ class Command(BaseCommand):
             ms_q = ms
             ca_q = ca
             if aid is not None:
-                ms_q = ms_q.filter(device__location__aimag_ref_id=aid)
-                ca_q = ca_q.filter(device__location__aimag_ref_id=aid)
+                ms_q = ms_q.filter(device__aimag_ref_id=aid)
+                ca_q = ca_q.filter(device__aimag_ref_id=aid)
 
             # counts
             def c(q, st): return q.filter(workflow_status=st).count()
@@ -0,0 +1,44 @@
+# inventory/management/commands/print_qr_labels.py
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.models import Device
+from inventory.qr_labels import LabelLayout, label_queryset, write_qr_labels
+
+
+class Command(BaseCommand):
+    help = "Багажуудын QR шошгыг A4 хуудсанд N-up байрлуулж нэг PDF болгоно (вектор QR)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--out", required=True, help="Гаралтын PDF файл.")
+        parser.add_argument("--aimag", type=int, help="Aimag.id-аар шүүх.")
+        parser.add_argument("--location", type=int, help="Location.id-аар шүүх.")
+        parser.add_argument("--kind", help="Device.kind-аар шүүх (WEATHER, HYDRO ...).")
+        parser.add_argument("--status", help="Device.status-аар шүүх.")
+        parser.add_argument("--cols", type=int, default=LabelLayout.cols, help=f"Баганын тоо (default {LabelLayout.cols}).")
+        parser.add_argument("--rows", type=int, default=LabelLayout.rows, help=f"Мөрийн тоо (default {LabelLayout.rows}).")
+        parser.add_argument("--no-border", action="store_true", help="Шошгын хүрээ зурахгүй.")
+
+    def handle(self, *args, **opts):
+        if opts["cols"] < 1 or opts["rows"] < 1:
+            raise CommandError("--cols/--rows >= 1 байх ёстой.")
+        qs = Device.objects.all()
+        if opts.get("aimag"):
+            qs = qs.filter(aimag_ref_id=opts["aimag"])
+        if opts.get("location"):
+            qs = qs.filter(location_id=opts["location"])
+        if opts.get("kind"):
+            qs = qs.filter(kind=opts["kind"].strip().upper())
+        if opts.get("status"):
+            qs = qs.filter(status=opts["status"].strip())
+
+        layout = LabelLayout(cols=opts["cols"], rows=opts["rows"], show_border=not opts["no_border"])
+        t0 = time.monotonic()
+        devices = label_queryset(qs).iterator(chunk_size=1000)
+        with open(opts["out"], "wb") as f:
+            n = write_qr_labels(devices, f, layout)
+        pages = max(1, -(-n // layout.per_page))
+        self.stderr.write(self.style.SUCCESS(f"{n} шошго, {pages} хуудас — {time.monotonic() - t0:.2f}s"))
@@ -0,0 +1,57 @@
+# inventory/management/commands/process_qr_jobs.py
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from inventory.qr_render import QR_JOB_BATCH_SIZE, enqueue_qr_render, find_missing_or_stale_qr, process_qr_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "QR зурах дарааллыг (QrRenderJob) batch-аар боловсруулна. "
+        "--scan: qr_image байхгүй/файл алга/stale багажуудыг эхлээд дараалалд нэмнэ. "
+        "--loop: cron/systemd-ээр байнга ажиллах worker горим."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=QR_JOB_BATCH_SIZE, help=f"Нэг batch (default {QR_JOB_BATCH_SIZE}).")
+        parser.add_argument("--max-batches", type=int, default=0, help="Нэг ажиллагаанд хамгийн ихдээ хэдэн batch (0 = хязгааргүй).")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="PNG зурах процессын тоо (default: CPU тоо, 1 = pool-гүй).",
+        )
+        parser.add_argument("--scan", action="store_true", help="Дутуу/хуучирсан QR-уудыг эхлээд enqueue хийнэ.")
+        parser.add_argument("--loop", action="store_true", help="Дараалал хоосон бол --sleep секунд хүлээгээд үргэлжилнэ.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="--loop горимын хүлээлт, секунд (default 5).")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, int(opts["batch_size"]))
+        max_batches = max(0, int(opts["max_batches"]))
+
+        if opts["scan"]:
+            n = enqueue_qr_render(find_missing_or_stale_qr(), reset=True)
+            self.stdout.write(f"Дараалалд нэмсэн: {n}")
+
+        workers = max(1, int(opts["workers"]))
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+            while True:
+                t0 = time.monotonic()
+                res = process_qr_jobs(
+                    batch_size=batch_size, max_batches=max_batches, executor=executor, workers=workers
+                )
+                if res.claimed:
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f"QR: авсан {res.claimed}, зурсан {res.done}, дахин оролдох {res.retried}, "
+                            f"амжилтгүй {res.failed}, дахин дараалалд орсон {res.superseded} — {time.monotonic() - t0:.2f}s"
+                        )
+                    )
+                if not opts["loop"]:
+                    break
+                if not res.claimed:
+                    time.sleep(float(opts["sleep"]))
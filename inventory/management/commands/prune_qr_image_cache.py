@@ -0,0 +1,35 @@
+# inventory/management/commands/prune_qr_image_cache.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from inventory.qr_images import QR_IMG_CACHE_MAX_AGE_DAYS, QR_IMG_CACHE_MAX_BYTES, prune_qr_image_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "QR зургийн дискэн кэшийг (MEDIA_ROOT/qr/cache) цэвэрлэнэ: --max-age-days-ээс хуучин, "
+        "дараа нь --max-mb-ээс хэтэрсэн хэсгийг хамгийн хуучнаас нь устгана (cron-оор өдөр бүр)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age-days", type=float, default=QR_IMG_CACHE_MAX_AGE_DAYS,
+            help=f"Үүнээс хуучин файлыг устгана (default {QR_IMG_CACHE_MAX_AGE_DAYS}).",
+        )
+        parser.add_argument(
+            "--max-mb", type=float, default=QR_IMG_CACHE_MAX_BYTES / (1024 * 1024),
+            help=f"Кэшийн дээд хэмжээ, MB (default {QR_IMG_CACHE_MAX_BYTES // (1024 * 1024)}).",
+        )
+
+    def handle(self, *args, **opts):
+        res = prune_qr_image_cache(
+            max_age_days=max(0.0, float(opts["max_age_days"])),
+            max_bytes=int(max(0.0, float(opts["max_mb"])) * 1024 * 1024),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Шалгасан: {res.scanned}, устгасан: {res.removed}, "
+                f"хэмжээ: {res.bytes_before / 1048576:.1f} MB → {res.bytes_after / 1048576:.1f} MB"
+            )
+        )
@@ -0,0 +1,54 @@
+# inventory/management/commands/qa_coordinates.py
+from __future__ import annotations
+
+import csv
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from inventory.geo.coord_qa import DEFAULT_DUPLICATE_RADIUS_M, QA_FLAGS, run_coordinate_qa
+
+CSV_HEADER = ["location_id", "flag", "detail", "other_id", "distance_m", "detected_aimag_id"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Location координатыг бүгдийг нь шалгана: (0,0), хилийн гадна, lat/lon солигдсон, "
+        "өөр аймагт байгаа, ойрхон давхардсан станцууд. CSV тайлан гаргана."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--radius", type=float, default=DEFAULT_DUPLICATE_RADIUS_M,
+            help=f"Давхардлын радиус, метр (default {DEFAULT_DUPLICATE_RADIUS_M:g}).",
+        )
+        parser.add_argument("--csv", dest="csv_path", default="", help="CSV файлд бичих ('-' бол stdout).")
+        parser.add_argument("--flag", action="append", choices=QA_FLAGS, help="Зөвхөн эдгээр flag (олон удаа өгч болно).")
+
+    def handle(self, *args, **opts):
+        t0 = time.monotonic()
+        res = run_coordinate_qa(base_dir=Path(settings.BASE_DIR), radius_m=float(opts["radius"]))
+        issues = res.issues
+        if opts.get("flag"):
+            issues = [it for it in issues if it.flag in set(opts["flag"])]
+
+        csv_path = opts.get("csv_path") or ""
+        if csv_path:
+            f = sys.stdout if csv_path == "-" else open(csv_path, "w", encoding="utf-8", newline="")
+            try:
+                w = csv.writer(f)
+                w.writerow(CSV_HEADER)
+                for it in issues:
+                    w.writerow([it.location_id, it.flag, it.detail, it.other_id or "", it.distance_m or "", it.detected_aimag_id or ""])
+            finally:
+                if f is not sys.stdout:
+                    f.close()
+
+        counts = res.counts()
+        summary = ", ".join(f"{k}={v}" for k, v in counts.items())
+        self.stderr.write(
+            self.style.SUCCESS(f"Шалгасан: {res.scanned}, асуудал: {len(issues)} ({summary}) — {time.monotonic() - t0:.2f}s")
+        )
@@ -0,0 +1,27 @@
+# inventory/management/commands/recompute_verification_dates.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from inventory.verification import RECOMPUTE_CHUNK, recompute_next_verification
+
+
+class Command(BaseCommand):
+    help = (
+        "Device.next_verification_date-ийг каталогийн verification_cycle_months-оор бөөнөөр "
+        "(NumPy chunk + bulk UPDATE) дахин тооцоолж, хугацааны bucket хоорондын шилжилтийг тайлагнана."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--catalog", type=int, action="append", default=None, help="InstrumentCatalog id (давтаж болно).")
+        parser.add_argument("--dry-run", action="store_true", help="DB-д бичихгүй, зөвхөн тайлан.")
+        parser.add_argument("--chunk-size", type=int, default=RECOMPUTE_CHUNK, help=f"Нэг удаад тооцох мөр (default {RECOMPUTE_CHUNK}).")
+
+    def handle(self, *args, **opts):
+        dry_run = bool(opts["dry_run"])
+        res = recompute_next_verification(opts["catalog"], chunk_size=max(1, int(opts["chunk_size"])), dry_run=dry_run)
+
+        prefix = "[DRY-RUN] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Шалгасан: {res.scanned}, огноо өөрчлөгдсөн: {res.updated}"))
+        for (old, new), n in sorted(res.moves.items()):
+            self.stdout.write(f"  {old:>8} → {new:<8} {n}")
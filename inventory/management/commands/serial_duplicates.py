@@ -0,0 +1,55 @@
+# inventory/management/commands/serial_duplicates.py
+from __future__ import annotations
+
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory.models import Device
+from inventory.serials import find_serial_duplicates
+
+CSV_HEADER = ["serial_key", "manufacturer", "device_id", "serial_number", "status", "location"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Бүх паркаар серийн дугаарын давхардлыг (том жижиг үсэг, зай/тэмдэгт үл хамааран) "
+        "үйлдвэрлэгчээр бүлэглэж олно. CSV тайлан гаргана."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", dest="csv_path", default="", help="CSV файлд бичих ('-' бол stdout).")
+        parser.add_argument("--aimag", type=int, default=None, help="Зөвхөн энэ аймгийн (id) багажууд.")
+
+    def handle(self, *args, **opts):
+        t0 = time.monotonic()
+        qs = Device.objects.all()
+        if opts.get("aimag"):
+            qs = qs.filter(aimag_ref_id=opts["aimag"])
+        res = find_serial_duplicates(qs)
+
+        csv_path = opts.get("csv_path") or ""
+        if csv_path:
+            f = sys.stdout if csv_path == "-" else open(csv_path, "w", encoding="utf-8", newline="")
+            try:
+                w = csv.writer(f)
+                w.writerow(CSV_HEADER)
+                for g in res.groups:
+                    for dev_id, serial, status, loc_name in g.devices:
+                        w.writerow([g.key, g.manufacturer, dev_id, serial, status, loc_name])
+            finally:
+                if f is not sys.stdout:
+                    f.close()
+        else:
+            for g in res.groups:
+                serials = ", ".join(f"{serial} (#{dev_id})" for dev_id, serial, _s, _l in g.devices)
+                self.stdout.write(f"{g.key} [{g.manufacturer or '-'}]: {serials}")
+
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Шалгасан: {res.scanned}, давхардсан бүлэг: {len(res.groups)}, "
+                f"багаж: {res.duplicate_devices} — {time.monotonic() - t0:.2f}s"
+            )
+        )
@@ -0,0 +1,334 @@
+# inventory/map_data.py
+"""
+Газрын зургийн API-уудын (cluster / bbox / nearest / tiles) нийтлэг өгөгдлийн давхарга.
+
+Scope + шүүлтүүр бүрээр станцуудын координат, төлөвийг NumPy массив болгон
+Django cache-д хадгална. Location/Device өөрчлөгдөхөд signals.py
+`bump_map_cache_version()`-ийг дуудаж бүх кэшийг нэг дор хүчингүй болгоно.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q
+from django.http import HttpRequest
+from django.utils import timezone
+
+from .geo.clustering import STATUS_BROKEN, STATUS_EMPTY, STATUS_KEYS, STATUS_OK
+from .geo.geohash import cover_bbox, merge_prefixes
+from .geo.nearest import NearestIndex
+from .models import ControlAdjustment, Device, MaintenanceService
+
+MAP_CACHE_VERSION_KEY = "inventory:map:version"
+MAP_CACHE_TTL = 60 * 60
+
+# GET параметр -> Location queryset шүүлтүүр
+MAP_FILTER_PARAMS = ("aimag", "sum", "location_type")
+
+# Процесс доторх NearestIndex-үүд (map_cache_key-ээр; version солигдоход шинээр бүтээгдэнэ)
+NEAREST_MEMO_SIZE = 32
+_nearest_memo: "OrderedDict[str, Tuple[StationPoints, NearestIndex]]" = OrderedDict()
+_nearest_lock = threading.Lock()
+
+
+def map_cache_version() -> int:
+    v = cache.get(MAP_CACHE_VERSION_KEY)
+    if v is None:
+        v = 1
+        cache.add(MAP_CACHE_VERSION_KEY, v, None)
+    return int(v)
+
+
+def bump_map_cache_version(clear_tiles: bool = True, *, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Бүх газрын зургийн кэшийг хүчингүй болгоно. clear_tiles=True бол диск дээрх
+    station tile-уудыг ч устгана (signals.py tile-уудыг цэг цэгээр нь устгадаг тул False).
+
+    Transaction дотор дуудвал commit-ийн дараа (on_commit) хийнэ: өмнө нь хийвэл зэрэг
+    хүсэлт commit-гүй (хуучин) өгөгдлийг шинэ version-оор MAP_CACHE_TTL хүртэл кэшилнэ.
+    """
+    transaction.on_commit(lambda: _bump_map_cache_version(clear_tiles), using=using)
+
+
+def _bump_map_cache_version(clear_tiles: bool) -> None:
+    try:
+        cache.incr(MAP_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(MAP_CACHE_VERSION_KEY, 2, None)
+    if clear_tiles:
+        from .station_tiles import clear_station_tiles
+
+        clear_station_tiles()
+
+
+def map_scope(request: HttpRequest) -> Dict[str, Any]:
+    """admin._get_scope-ийн wrapper ({all, aimag_id, sum_id})."""
+    from .admin import _get_scope
+
+    return _get_scope(request)
+
+
+def map_cache_key(request: HttpRequest, kind: str, *parts: Any) -> str:
+    """Version + хэрэглэгчийн scope + шүүлтүүр + нэмэлт хэсгүүдээс кэш түлхүүр."""
+    scope = map_scope(request)
+    scope_part = "all" if scope["all"] else f"a{scope['aimag_id']}s{scope['sum_id'] or ''}"
+    flt = ",".join(f"{k}={(request.GET.get(k) or '').strip()}" for k in MAP_FILTER_PARAMS)
+    tail = ":".join(str(p) for p in parts)
+    return f"inventory:map:v{map_cache_version()}:{kind}:{scope_part}:{flt}:{tail}"
+
+
+@dataclass
+class StationPoints:
+    ids: np.ndarray
+    lons: np.ndarray
+    lats: np.ndarray
+    status: np.ndarray
+    device_count: np.ndarray
+    pending_total: np.ndarray
+    location_type: np.ndarray
+    names: List[str]
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def subset(self, mask: np.ndarray) -> "StationPoints":
+        idx = np.flatnonzero(mask)
+        return StationPoints(
+            ids=self.ids[idx],
+            lons=self.lons[idx],
+            lats=self.lats[idx],
+            status=self.status[idx],
+            device_count=self.device_count[idx],
+            pending_total=self.pending_total[idx],
+            location_type=self.location_type[idx],
+            names=[self.names[i] for i in idx.tolist()],
+        )
+
+    def item(self, i: int) -> Dict[str, Any]:
+        """i-р станцын JSON dict (bbox / nearest API-уудад)."""
+        return {
+            "id": int(self.ids[i]),
+            "name": self.names[i],
+            "type": self.location_type[i],
+            "lat": float(self.lats[i]),
+            "lon": float(self.lons[i]),
+            "status": STATUS_KEYS[int(self.status[i])],
+            "device_count": int(self.device_count[i]),
+            "pending_total": int(self.pending_total[i]),
+        }
+
+    def bbox_mask(self, bbox) -> np.ndarray:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        return (self.lons >= min_lon) & (self.lons <= max_lon) & (self.lats >= min_lat) & (self.lats <= max_lat)
+
+
+def scoped_map_locations(request: HttpRequest, require_coords: bool = True):
+    """Хэрэглэгчийн scope + GET шүүлтүүртэй Location queryset (default: координаттай нь)."""
+    from .admin import _scope_location_qs
+
+    qs = _scope_location_qs(request)
+    if require_coords:
+        qs = qs.filter(latitude__isnull=False, longitude__isnull=False)
+    g = request.GET
+    aimag = (g.get("aimag") or "").strip()
+    sum_id = (g.get("sum") or "").strip()
+    location_type = (g.get("location_type") or "").strip()
+    if aimag.isdigit():
+        qs = qs.filter(aimag_ref_id=int(aimag))
+    if sum_id.isdigit():
+        qs = qs.filter(sum_ref_id=int(sum_id))
+    if location_type:
+        qs = qs.filter(location_type__iexact=location_type)
+    return qs
+
+
+def scoped_map_devices(request: HttpRequest):
+    """scoped_map_locations-ийн Device хувилбар: denormalized aimag_ref / sum_ref-ээр (Location join-гүй)."""
+    from .admin import _scope_qs
+
+    qs = _scope_qs(request, Device.objects.all(), aimag_field="aimag_ref")
+    g = request.GET
+    aimag = (g.get("aimag") or "").strip()
+    sum_id = (g.get("sum") or "").strip()
+    location_type = (g.get("location_type") or "").strip()
+    if aimag.isdigit():
+        qs = qs.filter(aimag_ref_id=int(aimag))
+    if sum_id.isdigit():
+        qs = qs.filter(sum_ref_id=int(sum_id))
+    if location_type:
+        qs = qs.filter(location__location_type__iexact=location_type)
+    return qs
+
+
+def filter_locations_bbox(qs, bbox):
+    """
+    Location queryset-ийг bbox-оор шүүнэ: эхлээд geohash индекс дээрх
+    range scan-ууд, дараа нь нарийн lat/lon шалгалт.
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    cond = Q()
+    for lo, hi in merge_prefixes(cover_bbox(min_lon, min_lat, max_lon, max_lat)):
+        cond |= Q(geohash__gte=lo, geohash__lt=hi)
+    return qs.filter(cond).filter(
+        longitude__gte=min_lon,
+        longitude__lte=max_lon,
+        latitude__gte=min_lat,
+        latitude__lte=max_lat,
+    )
+
+
+def load_station_points(loc_qs) -> StationPoints:
+    rows = list(
+        loc_qs.annotate(
+            _device_count=Count("devices", distinct=True),
+            _any_broken=Count("devices", distinct=True, filter=Q(devices__status__in=["Broken", "Repair"])),
+            _pending_ms=Count(
+                "devices__maintenance_services",
+                distinct=True,
+                filter=Q(devices__maintenance_services__workflow_status="SUBMITTED"),
+            ),
+            _pending_ca=Count(
+                "devices__control_adjustments",
+                distinct=True,
+                filter=Q(devices__control_adjustments__workflow_status="SUBMITTED"),
+            ),
+        )
+        .order_by("pk")
+        .values_list(
+            "id", "longitude", "latitude", "location_type", "name",
+            "_device_count", "_any_broken", "_pending_ms", "_pending_ca",
+        )
+    )
+    n = len(rows)
+    if n == 0:
+        z = np.zeros(0, dtype=np.int64)
+        return StationPoints(z, np.zeros(0), np.zeros(0), z, z, z, np.zeros(0, dtype=object), [])
+
+    ids, lons, lats, ltypes, names, dev, broken, pms, pca = zip(*rows)
+    dev_a = np.asarray(dev, dtype=np.int64)
+    status = np.where(dev_a <= 0, STATUS_EMPTY, np.where(np.asarray(broken) > 0, STATUS_BROKEN, STATUS_OK))
+    return StationPoints(
+        ids=np.asarray(ids, dtype=np.int64),
+        lons=np.asarray(lons, dtype="float64"),
+        lats=np.asarray(lats, dtype="float64"),
+        status=status.astype(np.int64),
+        device_count=dev_a,
+        pending_total=np.asarray(pms, dtype=np.int64) + np.asarray(pca, dtype=np.int64),
+        location_type=np.asarray([(t or "OTHER") for t in ltypes], dtype=object),
+        names=list(names),
+    )
+
+
+def station_points_for_request(request: HttpRequest) -> StationPoints:
+    key = map_cache_key(request, "points")
+    pts: Optional[StationPoints] = cache.get(key)
+    if pts is None:
+        pts = load_station_points(scoped_map_locations(request))
+        cache.set(key, pts, MAP_CACHE_TTL)
+    return pts
+
+
+def nearest_index_for_request(request: HttpRequest) -> Tuple[StationPoints, NearestIndex]:
+    """
+    Scope + шүүлтүүрт тохирох (StationPoints, NearestIndex).
+    Индексийг процесс дотор хадгалдаг тул хайлт бүр cache-аас pickle тайлахгүй;
+    Location/Device өөрчлөгдөхөд version солигдож дахин бүтээгдэнэ.
+    """
+    key = map_cache_key(request, "nearest")
+    with _nearest_lock:
+        hit = _nearest_memo.get(key)
+        if hit is not None:
+            _nearest_memo.move_to_end(key)
+            return hit
+
+    pts = station_points_for_request(request)
+    hit = (pts, NearestIndex(pts.lons, pts.lats))
+    with _nearest_lock:
+        _nearest_memo[key] = hit
+        while len(_nearest_memo) > NEAREST_MEMO_SIZE:
+            _nearest_memo.popitem(last=False)
+    return hit
+
+
+def nearest_stations(
+    request: HttpRequest,
+    lon: float,
+    lat: float,
+    k: Optional[int] = 10,
+    radius_km: Optional[float] = None,
+    exclude_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    (lon, lat)-аас хамгийн ойр k станц / radius_km доторх станцууд.
+    API болон admin view-үүдээс шууд дуудаж болно.
+    """
+    pts, index = nearest_index_for_request(request)
+    mask = (pts.ids != int(exclude_id)) if exclude_id is not None else None
+    idx, dist = index.query(lon, lat, k=k, radius_km=radius_km, mask=mask)
+    items = []
+    for i, d in zip(idx.tolist(), dist.tolist()):
+        it = pts.item(i)
+        it["distance_km"] = round(float(d), 3)
+        items.append(it)
+    return items
+
+
+# ============================================================
+# Choropleth: аймаг / сум бүрийн үзүүлэлт
+# ============================================================
+CHOROPLETH_METRICS = ("device_count", "broken_count", "expired_count", "pending_total")
+
+
+def choropleth_metrics(request: HttpRequest, level: str) -> Dict[int, Dict[str, Any]]:
+    """
+    level="aimag" -> {aimag_id: {...}}, level="sum" -> {sum_id: {...}}.
+    Үзүүлэлт: device_count, broken_count, broken_share, expired_count
+    (next_verification_date < өнөөдөр), pending_total (SUBMITTED засвар + тохируулга).
+    """
+    ref = "aimag_ref_id" if level == "aimag" else "sum_ref_id"
+    devices = scoped_map_devices(request)
+    today = timezone.localdate()
+
+    out: Dict[int, Dict[str, Any]] = {}
+
+    def row(unit_id: int) -> Dict[str, Any]:
+        return out.setdefault(unit_id, {k: 0 for k in CHOROPLETH_METRICS})
+
+    for r in (
+        devices.values(ref)
+        .annotate(
+            n=Count("id"),
+            broken=Count("id", filter=Q(status__in=["Broken", "Repair"])),
+            expired=Count("id", filter=Q(next_verification_date__lt=today)),
+        )
+        .order_by()
+    ):
+        unit_id = r[ref]
+        if unit_id is None:
+            continue
+        m = row(unit_id)
+        m["device_count"] = r["n"]
+        m["broken_count"] = r["broken"]
+        m["expired_count"] = r["expired"]
+
+    # Pending-ийг тусад нь тоолно (Device-тэй join хийвэл мөр үржигдэнэ)
+    for model in (MaintenanceService, ControlAdjustment):
+        for r in (
+            model.objects.filter(workflow_status="SUBMITTED", device__in=devices)
+            .values(f"device__{ref}")
+            .annotate(n=Count("id"))
+            .order_by()
+        ):
+            unit_id = r[f"device__{ref}"]
+            if unit_id is not None:
+                row(unit_id)["pending_total"] += r["n"]
+
+    for m in out.values():
+        m["broken_share"] = round(m["broken_count"] / m["device_count"], 4) if m["device_count"] else 0.0
+    return out
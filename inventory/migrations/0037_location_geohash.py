@@ -0,0 +1,57 @@
+# Generated by Django 4.2.8 on 2026-10-17 00:40
+
+import math
+
+from django.db import migrations, models
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _geohash(lon, lat, precision=9):
+    # inventory.geo.geohash.encode_many-ийн скаляр хуулбар (migration нь app кодоос хамаарахгүй)
+    bits = 5 * precision
+    lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+    xi = min(math.floor((min(max(lon, -180.0), 180.0) + 180.0) / 360.0 * (1 << lon_bits)), (1 << lon_bits) - 1)
+    yi = min(math.floor((min(max(lat, -90.0), 90.0) + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    code, xb, yb = 0, lon_bits - 1, lat_bits - 1
+    for i in range(bits):
+        if i % 2 == 0:
+            code, xb = (code << 1) | ((xi >> xb) & 1), xb - 1
+        else:
+            code, yb = (code << 1) | ((yi >> yb) & 1), yb - 1
+    return "".join(BASE32[(code >> (5 * (precision - 1 - j))) & 31] for j in range(precision))
+
+
+def fill_geohash(apps, schema_editor):
+    # bbox API geohash prefix-ээр шүүдэг тул хоосон үлдвэл байршлууд газрын зургаас алга болно
+    Location = apps.get_model("inventory", "Location")
+    rows = list(
+        Location.objects.filter(latitude__isnull=False, longitude__isnull=False)
+        .order_by("pk")
+        .values_list("pk", "longitude", "latitude")
+    )
+    Location.objects.bulk_update(
+        [
+            Location(pk=pk, geohash=_geohash(float(lon), float(lat)))
+            for pk, lon, lat in rows
+            if math.isfinite(float(lon)) and math.isfinite(float(lat))
+        ],
+        ["geohash"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0036_device_commissioned_date_device_inventory_code_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.8 on 2026-10-17 00:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0037_location_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QrRenderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Хүлээгдэж буй'), ('RUNNING', 'Зурж байна'), ('DONE', 'Дууссан'), ('FAILED', 'Амжилтгүй')], default='PENDING', max_length=10, verbose_name='Төлөв')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Оролдлого')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дараагийн оролдлого')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Сүүлийн алдаа')),
+                ('rendered_payload', models.CharField(blank=True, default='', max_length=500, verbose_name='QR агуулга')),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Хүсэлт')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Эхэлсэн')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Дууссан')),
+                ('device', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='qr_job', to='inventory.device', verbose_name='Багаж')),
+            ],
+            options={
+                'verbose_name': 'QR зурах ажил',
+                'verbose_name_plural': 'QR зурах ажлууд',
+                'ordering': ['-requested_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='inventory_q_status_bde898_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-17 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0038_qrrenderjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='qrrenderjob',
+            name='batch',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=32, verbose_name='Batch'),
+        ),
+    ]
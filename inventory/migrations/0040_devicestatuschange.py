@@ -0,0 +1,62 @@
+# Generated by Django 4.2.8 on 2026-10-17 01:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def seed_status_baseline(apps, schema_editor):
+    """
+    Түүхгүй багажуудын анхны мөрүүд. Одоогийн төлөв хэзээ тогтсон нь тодорхойгүй тул
+    түүнийг migration хийсэн мөчөөр бичнэ; суурилуулсан огноо байвал тэр өдрөөс
+    "Active" гэж үзнэ (төлөв нь Active бол ганц мөр). Суурилуулсан огноогүй бол
+    түүнээс өмнөх as-of асуулгад багаж "бүртгэлгүй" (None) гарна.
+    """
+    from datetime import datetime, time
+
+    Device = apps.get_model("inventory", "Device")
+    DeviceStatusChange = apps.get_model("inventory", "DeviceStatusChange")
+    now = django.utils.timezone.now()
+    batch = []
+    for pk, status, installed in Device.objects.order_by("pk").values_list("pk", "status", "installation_date").iterator():
+        installed_at = django.utils.timezone.make_aware(datetime.combine(installed, time.min)) if installed else None
+        if installed_at and installed_at < now:
+            batch.append(DeviceStatusChange(device_id=pk, from_status="", to_status="Active", changed_at=installed_at))
+            if status != "Active":
+                batch.append(DeviceStatusChange(device_id=pk, from_status="Active", to_status=status, changed_at=now))
+        else:
+            batch.append(DeviceStatusChange(device_id=pk, from_status="", to_status=status, changed_at=now))
+        if len(batch) >= 2000:
+            DeviceStatusChange.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DeviceStatusChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0039_qrrenderjob_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, default='', max_length=15, verbose_name='Хуучин төлөв')),
+                ('to_status', models.CharField(choices=[('Active', 'Ашиглагдаж буй'), ('Broken', 'Эвдрэлтэй'), ('Repair', 'Засварт'), ('Spare', 'Нөөц'), ('Retired', 'Хасагдсан')], max_length=15, verbose_name='Шинэ төлөв')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Огноо/цаг')),
+                ('reason', models.CharField(blank=True, default='', max_length=255, verbose_name='Шалтгаан')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='device_status_changes', to='inventory.userprofile', verbose_name='Өөрчилсөн (UserProfile)')),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='inventory.device', verbose_name='Багаж')),
+            ],
+            options={
+                'verbose_name': 'Багажийн төлөв (түүх)',
+                'verbose_name_plural': 'Багажийн төлвийн түүх',
+                'ordering': ['-changed_at', '-id'],
+                'indexes': [models.Index(fields=['device', 'changed_at'], name='inventory_d_device__38e2b5_idx'), models.Index(fields=['changed_at'], name='inventory_d_changed_121137_idx')],
+            },
+        ),
+        migrations.RunPython(seed_status_baseline, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.8 on 2026-10-17 01:15
+
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def build_placements(apps, schema_editor):
+    # Хүснэгт хоосон байвал өнгөрсөн огнооны as-of асуулга юу ч буцаахгүй тул DeviceMovement
+    # түүхээс шууд үүсгэнэ. inventory.placements._replay-ийн хуулбар (migration нь app кодоос
+    # хамаарахгүй); эхлэл тодорхойгүй бол 1970-01-01.
+    Device = apps.get_model("inventory", "Device")
+    DeviceMovement = apps.get_model("inventory", "DeviceMovement")
+    DevicePlacementInterval = apps.get_model("inventory", "DevicePlacementInterval")
+    unknown_start = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    now = timezone.now()
+
+    devices = list(Device.objects.order_by("pk").values_list("pk", "location_id", "installation_date"))
+    for start in range(0, len(devices), 5000):
+        chunk = devices[start:start + 5000]
+        moves = {}
+        for dev_id, moved_at, from_id, to_id in (
+            DeviceMovement.objects.filter(device_id__in=[d[0] for d in chunk])
+            .order_by("device_id", "moved_at", "id")
+            .values_list("device_id", "moved_at", "from_location_id", "to_location_id")
+        ):
+            moves.setdefault(dev_id, []).append((moved_at, from_id, to_id))
+
+        rows = []
+        for dev_id, current_id, installation_date in chunk:
+            dev_moves = moves.get(dev_id, [])
+            installed = timezone.make_aware(datetime.combine(installation_date, time.min)) if installation_date else None
+            first_at = dev_moves[0][0] if dev_moves else None
+            # Эхний шилжилтийн from_location-оос (шилжилтгүй бол одоогийн байршлаас) эхэлнэ
+            loc = dev_moves[0][1] if dev_moves else current_id
+            begin = installed if installed and (first_at is None or installed <= first_at) else unknown_start
+            for moved_at, _from, to_id in dev_moves:
+                if loc:
+                    rows.append(DevicePlacementInterval(device_id=dev_id, location_id=loc, valid_from=begin, valid_to=moved_at))
+                loc, begin = to_id, moved_at
+            # Түүхийн сүүлийн байршил Device.location-той таараагүй бол одоогоор засна
+            if loc != current_id:
+                if loc:
+                    rows.append(DevicePlacementInterval(device_id=dev_id, location_id=loc, valid_from=begin, valid_to=now))
+                loc, begin = current_id, now
+            if loc:
+                rows.append(DevicePlacementInterval(device_id=dev_id, location_id=loc, valid_from=begin, valid_to=None))
+        DevicePlacementInterval.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0040_devicestatuschange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DevicePlacementInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valid_from', models.DateTimeField(verbose_name='Эхэлсэн')),
+                ('valid_to', models.DateTimeField(blank=True, null=True, verbose_name='Дууссан')),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='placements', to='inventory.device', verbose_name='Багаж')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='placements', to='inventory.location', verbose_name='Байршил')),
+            ],
+            options={
+                'verbose_name': 'Багажийн байрлал (интервал)',
+                'verbose_name_plural': 'Багажийн байрлалын интервал',
+                'ordering': ['-valid_from', '-id'],
+                'indexes': [models.Index(fields=['location', 'valid_from'], name='inventory_d_locatio_9b1d48_idx'), models.Index(fields=['device', 'valid_from'], name='inventory_d_device__dc8c65_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='deviceplacementinterval',
+            constraint=models.UniqueConstraint(condition=models.Q(('valid_to__isnull', True)), fields=('device',), name='uniq_open_placement_per_device'),
+        ),
+        migrations.RunPython(build_placements, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.8 on 2026-10-17 01:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_location_admin_units(apps, schema_editor):
+    Device = apps.get_model("inventory", "Device")
+    Location = apps.get_model("inventory", "Location")
+    loc = Location.objects.filter(pk=models.OuterRef("location_id"))
+    Device.objects.update(
+        aimag_ref_id=models.Subquery(loc.values("aimag_ref_id")[:1]),
+        sum_ref_id=models.Subquery(loc.values("sum_ref_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0041_deviceplacementinterval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='aimag_ref',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='devices', to='inventory.aimag', verbose_name='Аймаг'),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='sum_ref',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='devices', to='inventory.sumduureg', verbose_name='Сум/Дүүрэг'),
+        ),
+        migrations.RunPython(copy_location_admin_units, migrations.RunPython.noop),
+    ]
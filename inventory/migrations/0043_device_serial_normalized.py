@@ -0,0 +1,41 @@
+# Generated by Django 4.2.8 on 2026-10-17 01:21
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def fill_serial_normalized(apps, schema_editor):
+    # inventory.serials.normalize_serial-ийн хуулбар (migration нь app кодоос хамаарахгүй)
+    non_alnum = re.compile(r"[\W_]+")
+    Device = apps.get_model("inventory", "Device")
+    rows = list(Device.objects.order_by("pk").values_list("pk", "serial_number"))
+    Device.objects.bulk_update(
+        [
+            Device(pk=pk, serial_normalized=non_alnum.sub("", unicodedata.normalize("NFKC", serial or "")).upper())
+            for pk, serial in rows
+        ],
+        ["serial_normalized"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0042_device_admin_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='serial_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='Серийн дугаар (нормчилсон)'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['serial_normalized', 'manufacturer'], name='device_serial_norm_mfr_idx'),
+        ),
+        migrations.RunPython(fill_serial_normalized, migrations.RunPython.noop),
+    ]
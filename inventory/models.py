@@ -1,5 +1,5 @@
 # inventory/models.py
-from django.db import models
+from django.db import models, router, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.conf import settings
@@ -8,10 +8,9 @@ from datetime import timedelta
 from django.contrib.auth.models import User   # ✅ ЗААВАЛ
 
 import uuid
-from io import BytesIO
-from django.core.files.base import ContentFile
 
-from inventory.geo.district_lookup import lookup_ub_district
+from inventory.geo.location_sync import schedule_location_geo_sync
+from inventory.geo.geohash import encode as geohash_encode
 
 
 # ============================================================
@@ -157,6 +156,9 @@ class Location(models.Model):
 
     district_name = models.CharField(max_length=100, blank=True, default="", verbose_name="УБ дүүрэг")
 
+    # bbox хайлтад зориулсан geohash (save болон backfill_geohash командаар бөглөгдөнө)
+    geohash = models.CharField(max_length=12, blank=True, default="", db_index=True, editable=False, verbose_name="Geohash")
+
     owner_org = models.ForeignKey(
         Organization,
         on_delete=models.SET_NULL,
@@ -165,21 +167,57 @@ class Location(models.Model):
         verbose_name="Хариуцагч",
     )
 
+    # save()-ийн geo дамжлагыг өдөөх талбарууд (DB-ээс ачаалсан утгатай харьцуулна)
+    GEO_TRACKED_FIELDS = ("latitude", "longitude", "aimag_ref_id")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._loaded_geo = obj._geo_state()
+        obj._loaded_units = obj._units_state()
+        return obj
+
+    def _units_state(self):
+        return (self.__dict__.get("aimag_ref_id"), self.__dict__.get("sum_ref_id"))
+
+    def _geo_state(self):
+        # Deferred талбарыг ачаалахгүйн тулд __dict__-ээс уншина
+        return tuple(self.__dict__.get(f) for f in self.GEO_TRACKED_FIELDS)
+
+    def geo_changed(self) -> bool:
+        """Координат эсвэл аймаг DB-д байгаагаас өөр бол True (шинэ объект бол үргэлж True)."""
+        loaded = getattr(self, "_loaded_geo", None)
+        return loaded is None or loaded != self._geo_state()
+
     def save(self, *args, **kwargs):
-        try:
-            if (
-                self.latitude is not None
-                and self.longitude is not None
-                and self.aimag_ref
-                and self.aimag_ref.name.strip() == "Улаанбаатар"
-            ):
-                props = lookup_ub_district(float(self.longitude), float(self.latitude), base_dir=settings.BASE_DIR)
-                if props and props.get("name_mn"):
-                    self.district_name = props["name_mn"]
-        except Exception:
-            pass
+        # Координатаар аймаг/сум, УБ дүүргийг тодорхойлох polygon дамжлага нь зөвхөн
+        # координат/аймаг өөрчлөгдсөн үед, transaction commit-ийн дараа нэг batch-аар
+        # ажиллана (geo/location_sync.py). Нэр гэх мэт бусад засвар polygon-д хүрэхгүй.
+        update_fields = kwargs.get("update_fields")
+        geo_dirty = self.geo_changed() and (
+            update_fields is None or bool({"latitude", "longitude", "aimag_ref", "aimag_ref_id"} & set(update_fields))
+        )
+
+        if geo_dirty or not self.geohash:
+            if self.latitude is not None and self.longitude is not None:
+                self.geohash = geohash_encode(float(self.longitude), float(self.latitude))
+            else:
+                self.geohash = ""
+        if update_fields is not None and ("latitude" in update_fields or "longitude" in update_fields):
+            kwargs["update_fields"] = set(update_fields) | {"geohash"}
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        if geo_dirty and self.latitude is not None and self.longitude is not None:
+            schedule_location_geo_sync(self.pk, using=kwargs.get("using") or self._state.db)
+        # Аймаг/сум солигдвол энэ байршлын багажуудын denormalized aimag_ref/sum_ref
+        if not adding and getattr(self, "_loaded_units", None) != self._units_state():
+            from inventory.device_moves import sync_device_admin_units
+
+            sync_device_admin_units([self.pk], using=kwargs.get("using") or self._state.db)
+        self._loaded_geo = self._geo_state()
+        self._loaded_units = self._units_state()
+
     def __str__(self):
         return f"{self.name} ({self.aimag_ref})"
 
@@ -214,6 +252,8 @@ class Device(models.Model):
     ]
 
     serial_number = models.CharField(max_length=100, unique=True, verbose_name="Серийн дугаар")
+    # normalize_serial(serial_number): том үсэг, зай/тэмдэгтгүй — QR/гар хайлтын exact-match, давхардлын тайлан
+    serial_normalized = models.CharField(max_length=100, blank=True, default="", editable=False, verbose_name="Серийн дугаар (нормчилсон)")
     inventory_code = models.CharField(max_length=100, blank=True, null=True, verbose_name="Бараа материалын код")
     manufacturer = models.CharField(max_length=100, blank=True, null=True, verbose_name="Үйлдвэрлэгч")
     commissioned_date = models.DateField(blank=True, null=True, verbose_name="Ашиглалтад орсон огноо")
@@ -243,40 +283,6 @@ class Device(models.Model):
         verbose_name="Төрөл",
     )
 
-    
-    def save(self, *args, **kwargs):
-        # 1. Хэрэв QR зураг байхгүй бол шинээр үүсгэнэ
-        if not self.qr_image:
-            # QR кодын тохиргоо
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            
-            # QR дотор хадгалах өгөгдөл (Public URL)
-            # Жишээ нь: https://meteo.gov.mn/qr/public/TOKEN/
-            # Одоогоор зөвхөн token-оо хийж турших эсвэл домайнаа хатуу бичиж болно
-            qr_data = f"/qr/public/{self.qr_token}/" 
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-
-            # Зураг болгох
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            # Санах ой руу хадгалах (Buffer)
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            
-            # Файлын нэр өгөх (qr_сериал.png)
-            filename = f"qr_{self.serial_number}.png"
-            
-            # ImageField-д хадгалах (save=False нь дахин loop-д орохоос сэргийлнэ)
-            self.qr_image.save(filename, ContentFile(buffer.getvalue()), save=False)
-
-        # 2. Үндсэн хадгалах үйлдлийг дуудах
-        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} ({self.serial_number})"
@@ -300,6 +306,26 @@ class Device(models.Model):
         related_name="devices",
         verbose_name="Байршил",
     )
+    # Байршлын аймаг/сум (denormalized): scope шүүлтүүр location JOIN-гүй шууд Device дээр.
+    # Device.save / bulk_relocate / Location-ийн аймаг/сум өөрчлөгдөхөд sync_device_admin_units.
+    aimag_ref = models.ForeignKey(
+        Aimag,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="devices",
+        verbose_name="Аймаг",
+    )
+    sum_ref = models.ForeignKey(
+        SumDuureg,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="devices",
+        verbose_name="Сум/Дүүрэг",
+    )
 
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default="Active", verbose_name="Төлөв")
     installation_date = models.DateField(null=True, blank=True, verbose_name="Суурилуулсан")
@@ -375,13 +401,60 @@ class Device(models.Model):
         name = self.catalog_item.name_mn if self.catalog_item else (self.other_name or "-")
         return f"{self.serial_number} - {name}"
 
+    # DB-ээс ачаалсан утгыг from_db дээр хадгалж, save() нэмэлт SELECT хийлгүйгээр
+    # өөрчлөлтийг (шилжилт г.м.) мэдэнэ
+    TRACKED_FIELDS = ("location_id", "status")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._loaded_values = {f: obj.__dict__.get(f) for f in cls.TRACKED_FIELDS if f in obj.__dict__}
+        return obj
+
+    def loaded_value(self, attname):
+        """DB-ээс ачаалсан үеийн утга (snapshot байхгүй бол нэг query-гээр)."""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is not None and attname in loaded:
+            return loaded[attname]
+        if self._state.adding or not self.pk:
+            return None
+        # Snapshot-гүй бол бүх TRACKED_FIELDS-ийг нэг query-гээр ачаална
+        row = Device.objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first()
+        if row is None:
+            return None
+        self._loaded_values = {**row, **(loaded or {})}
+        return self._loaded_values[attname]
+
+    def _copy_location_admin_units(self):
+        """aimag_ref/sum_ref-ийг location-оос (кэшлэгдсэн бол query-гүй) хуулна."""
+        if not self.location_id:
+            self.aimag_ref_id = self.sum_ref_id = None
+            return
+        loc = self._meta.get_field("location").get_cached_value(self, default=None)
+        if loc is not None and loc.pk == self.location_id:
+            self.aimag_ref_id, self.sum_ref_id = loc.aimag_ref_id, loc.sum_ref_id
+            return
+        row = Location.objects.filter(pk=self.location_id).values_list("aimag_ref_id", "sum_ref_id").first()
+        self.aimag_ref_id, self.sum_ref_id = row or (None, None)
+
+    def set_movement_info(self, reason: str = "", moved_by_id=None):
+        """Дараагийн save()-ийн шилжилт/төлвийн түүхэнд шалтгаан/хэн гэдгийг онооно (admin, bulk)."""
+        self._movement_reason = (reason or "").strip()
+        self._movement_by_id = moved_by_id
+
     def save(self, *args, **kwargs):
         """
-        Save + (1) auto QR generation,
-               (2) movement history when location changes,
-               (3) auto next verification date.
+        Save + (1) QR render job enqueue (qr_image байхгүй бол),
+               (2) movement / status history when location / status changes (from_db snapshot, нэмэлт SELECT-гүй),
+               (3) auto next verification date, (4) serial_normalized.
         """
-        old_location_id = None
+        # Нормчилсон серийн дугаар (serial_number-тэй хамт хадгална)
+        from inventory.serials import normalize_serial
+
+        self.serial_normalized = normalize_serial(self.serial_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "serial_number" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"serial_normalized"}
 
         # 0) Auto-calc next verification date
         try:
@@ -395,64 +468,69 @@ class Device(models.Model):
         if not self.qr_expires_at:
             self.qr_expires_at = timezone.now() + timedelta(days=365)
 
-        # 2) Track old location (for movement history)
-        if self.pk:
-            try:
-                old_location_id = (
-                    Device.objects.filter(pk=self.pk)
-                    .values_list("location_id", flat=True)
-                    .first()
-                )
-            except Exception:
-                old_location_id = None
-
-        super().save(*args, **kwargs)
-
-        # 3) Write movement history if location changed
-        try:
-            new_location_id = self.location_id
-            if self.pk and old_location_id != new_location_id:
-                DeviceMovement.objects.create(
+        # 2) Шилжилт / төлөв: ачаалсан утгатай харьцуулна
+        update_fields = kwargs.get("update_fields")
+        old_location_id = self.loaded_value("location_id")
+        moved = old_location_id != self.location_id and (
+            update_fields is None or {"location", "location_id"} & set(update_fields)
+        )
+        old_status = self.loaded_value("status")
+        status_changed = old_status != self.status and (update_fields is None or "status" in update_fields)
+        if moved or (self._state.adding and self.location_id):
+            self._copy_location_admin_units()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"aimag_ref", "sum_ref"}
+
+        using = kwargs.get("using") or router.db_for_write(Device, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+            # 3) Write movement history (+ placement interval) if location changed
+            if moved:
+                from inventory.placements import record_placements
+
+                now = timezone.now()
+                DeviceMovement.objects.using(using).create(
                     device=self,
                     from_location_id=old_location_id,
-                    to_location_id=new_location_id,
-                    moved_at=timezone.now(),
-                    reason="",
-                    moved_by=None,
+                    to_location_id=self.location_id,
+                    moved_at=now,
+                    reason=getattr(self, "_movement_reason", ""),
+                    moved_by_id=getattr(self, "_movement_by_id", None),
                 )
-        except Exception:
-            pass
-
-        # 4) Generate QR if missing
+                record_placements([(self.pk, self.location_id)], now, using=using)
+            if status_changed:
+                DeviceStatusChange.objects.using(using).create(
+                    device=self,
+                    from_status=old_status or "",
+                    to_status=self.status,
+                    changed_at=timezone.now(),
+                    reason=getattr(self, "_movement_reason", ""),
+                    changed_by_id=getattr(self, "_movement_by_id", None),
+                )
+        saved = self.TRACKED_FIELDS
+        if update_fields is not None:
+            names = set(update_fields)
+            saved = [f for f in saved if f in names or f.removesuffix("_id") in names]
+            self._loaded_values = dict(getattr(self, "_loaded_values", None) or {})
+        else:
+            self._loaded_values = {}
+        self._loaded_values.update({f: self.__dict__.get(f) for f in saved})
+        self._movement_reason, self._movement_by_id = "", None
+
+        # 4) QR зураг байхгүй бол зөвхөн дараалалд нэмнэ (process_qr_jobs worker зурна)
         if not self.qr_image:
-            try:
-                import os
-                import qrcode
-                from io import BytesIO
-                from django.core.files.base import ContentFile
-
-                target_dir = os.path.join(str(settings.MEDIA_ROOT), "qr", "devices")
-                os.makedirs(target_dir, exist_ok=True)
-
-                serial = (self.serial_number or "").strip()
-                base = (getattr(settings, "SITE_BASE_URL", "") or "").rstrip("/")
-                path = f"/qr/public/{self.qr_token}/"
-                qr_data = (base + path) if base else path
-
-                img = qrcode.make(qr_data)
-                buf = BytesIO()
-                img.save(buf, format="PNG")
-
-                serial_part = (serial or "no_serial").strip() or "no_serial"
-                fname = f"device_{self.pk}_{serial_part}.png".replace(" ", "_")
-                self.qr_image.save(fname, ContentFile(buf.getvalue()), save=False)
-                super().save(update_fields=["qr_image"])
-            except Exception as e:
-                print("❌ QR generation failed:", repr(e))
+            from inventory.qr_render import enqueue_qr_render
+
+            enqueue_qr_render([self.pk])
 
     class Meta:
         verbose_name = "Хэмжих хэрэгсэл"
         verbose_name_plural = "Хэмжих хэрэгсэл"
+        indexes = [
+            # exact-match хайлт (эхний багана) + давхардлын GROUP BY
+            models.Index(fields=["serial_normalized", "manufacturer"], name="device_serial_norm_mfr_idx"),
+        ]
 
 
 # ============================================================
@@ -509,6 +587,145 @@ class DeviceMovement(models.Model):
     def __str__(self):
         return f"{self.device_id} {self.from_location_id}->{self.to_location_id} @ {self.moved_at:%Y-%m-%d %H:%M}"
 
+
+# ============================================================
+# ✅ Device Status History (as-of асуулгад)
+# ============================================================
+class DeviceStatusChange(models.Model):
+    """Багажийн төлөв (Active/Broken/...) өөрчлөгдсөн түүх.
+
+    Device.save() болон device_moves.bulk_set_status() бичнэ; шинэ багажид
+    from_status="" бүхий анхны мөр үүснэ. (device, changed_at) индексээр
+    "T үеийн төлөв"-ийг нэг index seek-ээр олно.
+    """
+
+    device = models.ForeignKey(
+        "inventory.Device",
+        on_delete=models.CASCADE,
+        related_name="status_changes",
+        verbose_name="Багаж",
+    )
+    from_status = models.CharField(max_length=15, blank=True, default="", verbose_name="Хуучин төлөв")
+    to_status = models.CharField(max_length=15, choices=Device.STATUS_CHOICES, verbose_name="Шинэ төлөв")
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name="Огноо/цаг")
+    reason = models.CharField(max_length=255, blank=True, default="", verbose_name="Шалтгаан")
+    changed_by = models.ForeignKey(
+        "inventory.UserProfile",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="device_status_changes",
+        verbose_name="Өөрчилсөн (UserProfile)",
+    )
+
+    class Meta:
+        verbose_name = "Багажийн төлөв (түүх)"
+        verbose_name_plural = "Багажийн төлвийн түүх"
+        ordering = ["-changed_at", "-id"]
+        indexes = [
+            models.Index(fields=["device", "changed_at"]),
+            models.Index(fields=["changed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.device_id} {self.from_status or '-'}->{self.to_status} @ {self.changed_at:%Y-%m-%d %H:%M}"
+
+
+# ============================================================
+# ✅ Device Placement Intervals ("D өдөр X станцад юу байсан")
+# ============================================================
+class DevicePlacementInterval(models.Model):
+    """Багаж нэг байршилд байсан хугацаа [valid_from, valid_to).
+
+    DeviceMovement бичигдэх бүрт placements.record_placements() хуучин интервалыг
+    хааж, шинийг нээнэ; valid_to=NULL бол одоо ч тэнд байгаа. Migration 0041 түүхээс
+    анх бөглөнө; дараа нь `manage.py backfill_placements`-аар дахин үүсгэж болно.
+    """
+
+    device = models.ForeignKey(
+        "inventory.Device",
+        on_delete=models.CASCADE,
+        related_name="placements",
+        verbose_name="Багаж",
+    )
+    # Байршил устгагдсан ч түүх үлдэнэ (DeviceMovement-тэй адил SET_NULL)
+    location = models.ForeignKey(
+        "inventory.Location",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="placements",
+        verbose_name="Байршил",
+    )
+    valid_from = models.DateTimeField(verbose_name="Эхэлсэн")
+    valid_to = models.DateTimeField(null=True, blank=True, verbose_name="Дууссан")
+
+    class Meta:
+        verbose_name = "Багажийн байрлал (интервал)"
+        verbose_name_plural = "Багажийн байрлалын интервал"
+        ordering = ["-valid_from", "-id"]
+        indexes = [
+            models.Index(fields=["location", "valid_from"]),
+            models.Index(fields=["device", "valid_from"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["device"],
+                condition=models.Q(valid_to__isnull=True),
+                name="uniq_open_placement_per_device",
+            ),
+        ]
+
+    def __str__(self):
+        end = f"{self.valid_to:%Y-%m-%d}" if self.valid_to else "…"
+        return f"{self.device_id} @ {self.location_id} [{self.valid_from:%Y-%m-%d} – {end})"
+
+# ============================================================
+# ✅ QR зураг зурах дараалал (process_qr_jobs worker)
+# ============================================================
+class QrRenderJob(models.Model):
+    """Device-ийн QR PNG-г request-ээс гадуур зурах ажил.
+
+    Device бүрт нэг мөр: дахин enqueue хийхэд PENDING болж шинэчлэгдэнэ.
+    Амжилтгүй бол backoff-тойгоор QR_JOB_MAX_ATTEMPTS хүртэл дахин оролдоно.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Хүлээгдэж буй"
+        RUNNING = "RUNNING", "Зурж байна"
+        DONE = "DONE", "Дууссан"
+        FAILED = "FAILED", "Амжилтгүй"
+
+    device = models.OneToOneField(
+        "inventory.Device",
+        on_delete=models.CASCADE,
+        related_name="qr_job",
+        verbose_name="Багаж",
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, verbose_name="Төлөв")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Оролдлого")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Дараагийн оролдлого")
+    last_error = models.TextField(blank=True, default="", verbose_name="Сүүлийн алдаа")
+    # Зурсан QR-ийн агуулга (SITE_BASE_URL/token өөрчлөгдвөл stale гэж үзнэ)
+    rendered_payload = models.CharField(max_length=500, blank=True, default="", verbose_name="QR агуулга")
+    # Admin-ийн бөөн generate_qr action-ийн явцыг хянах id
+    batch = models.CharField(max_length=32, blank=True, default="", db_index=True, verbose_name="Batch")
+    requested_at = models.DateTimeField(default=timezone.now, verbose_name="Хүсэлт")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Эхэлсэн")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Дууссан")
+
+    class Meta:
+        verbose_name = "QR зурах ажил"
+        verbose_name_plural = "QR зурах ажлууд"
+        ordering = ["-requested_at", "-id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"QR job device#{self.device_id} {self.status} ({self.attempts})"
+
+
 # ============================================================
 # ✅ WorkflowStatus helper (shared)
 # ============================================================
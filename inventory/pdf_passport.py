@@ -193,11 +193,12 @@ def generate_device_passport_pdf_bytes(device) -> bytes:
     
     # --- 1. QR ба Үндсэн мэдээлэл (Зэрэгцээ байрлал) ---
     
-    # QR Код бэлтгэх
-    base_url = getattr(settings, "SITE_BASE_URL", "") or "http://127.0.0.1:8000"
-    token = getattr(device, 'qr_token', '')
-    qr_data = f"{base_url}/qr/public/{token}/"
-    qr_img = Image(generate_qr_buffer(qr_data), width=35*mm, height=35*mm)
+    # QR Код: qr_payload() — SITE_BASE_URL-тэй бүтэн public URL (тохируулаагүй бол ImproperlyConfigured);
+    # зургийг /qr/img/ endpoint-той ижил кэшээс (qr_images)
+    from inventory.qr_images import qr_image
+
+    qr_png, _etag = qr_image(device.qr_token, "png", 512)
+    qr_img = Image(io.BytesIO(qr_png), width=35*mm, height=35*mm)
     
     # Текстэн мэдээлэл
     info_text = [
@@ -0,0 +1,150 @@
+# inventory/placements.py
+"""
+DevicePlacementInterval: "D өдөр X станцад ямар багаж байсан" гэдгийг
+DeviceMovement-ийг replay хийлгүйгээр нэг индексжсэн range query-гээр хариулна.
+
+- record_placements(): шилжилт бичигдэх бүрт (Device.save, bulk_relocate) нээлттэй
+  интервалыг хааж (нэг UPDATE), шинийг нээнэ (нэг bulk_create).
+- placements_at() / devices_at() / location_at(): as-of асуулга
+  (valid_from <= T < valid_to, valid_to=NULL бол нээлттэй).
+- rebuild_placements(): DeviceMovement түүхээс дахин үүсгэнэ (backfill_placements команд).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, time, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .device_status import AsOf, as_of_datetime
+from .models import Device, DeviceMovement, DevicePlacementInterval, Location
+
+PLACEMENT_CHUNK = 5000
+# Эхлэл нь тодорхойгүй (суурилуулсан огноогүй, шилжилтээс өмнөх) байрлалын valid_from
+PLACEMENT_UNKNOWN_START = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def record_placements(
+    moves: Iterable[Tuple[int, Optional[int]]],
+    at: datetime,
+    *,
+    using: str = DEFAULT_DB_ALIAS,
+) -> None:
+    """moves = [(device_id, шинэ location_id|None)] -> at мөчөөс шинэ интервал."""
+    moves = list(moves)
+    manager = DevicePlacementInterval.objects.using(using)
+    for start in range(0, len(moves), PLACEMENT_CHUNK):
+        chunk = moves[start:start + PLACEMENT_CHUNK]
+        manager.filter(device_id__in=[d for d, _loc in chunk], valid_to__isnull=True).update(valid_to=at)
+        manager.bulk_create(
+            [DevicePlacementInterval(device_id=d, location_id=loc, valid_from=at) for d, loc in chunk if loc]
+        )
+
+
+def placements_at(
+    when: Optional[AsOf] = None,
+    *,
+    location: Optional[Union[Location, int]] = None,
+    devices=None,
+) -> QuerySet:
+    """T мөчид хүчинтэй интервалууд (location / devices-ээр шүүж болно)."""
+    t = as_of_datetime(when)
+    qs = DevicePlacementInterval.objects.filter(valid_from__lte=t).filter(Q(valid_to__gt=t) | Q(valid_to__isnull=True))
+    if location is not None:
+        qs = qs.filter(location=location)
+    if devices is not None:
+        qs = qs.filter(device__in=devices)
+    return qs
+
+
+def devices_at(location: Union[Location, int], when: Optional[AsOf] = None) -> QuerySet:
+    """T мөчид location-д байсан багажууд (Device queryset)."""
+    return Device.objects.filter(pk__in=placements_at(when, location=location).values("device_id"))
+
+
+def location_at(device: Union[Device, int], when: Optional[AsOf] = None) -> Optional[int]:
+    """T мөчид багаж байсан location_id (тэр үед байршилгүй бол None)."""
+    device_id = device.pk if isinstance(device, Device) else device
+    return placements_at(when, devices=[device_id]).values_list("location_id", flat=True).first()
+
+
+# ------------------------------------------------------------
+# Backfill: DeviceMovement түүхээс дахин үүсгэх
+# ------------------------------------------------------------
+@dataclass
+class PlacementRebuildResult:
+    devices: int = 0
+    intervals: int = 0
+    # Түүхийн сүүлийн байршил Device.location-той таараагүй (update()-ээр солигдсон г.м.)
+    corrected: int = 0
+
+
+def _replay(
+    installed: Optional[datetime],
+    current_location_id: Optional[int],
+    moves: Sequence[Tuple[datetime, Optional[int], Optional[int]]],
+    now: datetime,
+) -> Tuple[List[Tuple[int, datetime, Optional[datetime]]], bool]:
+    """Нэг багажийн шилжилтүүд -> [(location_id, valid_from, valid_to)], corrected."""
+    out: List[Tuple[int, datetime, Optional[datetime]]] = []
+    first_at = moves[0][0] if moves else None
+    loc = moves[0][1] if moves else current_location_id
+    start = installed if installed and (first_at is None or installed <= first_at) else PLACEMENT_UNKNOWN_START
+    for moved_at, _from, to in moves:
+        if loc:
+            out.append((loc, start, moved_at))
+        loc, start = to, moved_at
+
+    corrected = loc != current_location_id
+    if corrected:
+        if loc:
+            out.append((loc, start, now))
+        loc, start = current_location_id, now
+    if loc:
+        out.append((loc, start, None))
+    return out, corrected
+
+
+def rebuild_placements(
+    device_ids: Optional[Iterable[int]] = None,
+    *,
+    chunk_size: int = PLACEMENT_CHUNK,
+) -> PlacementRebuildResult:
+    """Багаж бүрийн интервалуудыг устгаад DeviceMovement-ээс (moved_at, id дарааллаар) дахин бичнэ."""
+    qs = Device.objects.order_by("pk")
+    if device_ids is not None:
+        qs = qs.filter(pk__in=list(device_ids))
+    devices = list(qs.values_list("pk", "location_id", "installation_date"))
+    now = timezone.now()
+    result = PlacementRebuildResult()
+
+    for start in range(0, len(devices), chunk_size):
+        chunk = devices[start:start + chunk_size]
+        ids = [d[0] for d in chunk]
+        moves: Dict[int, List[Tuple[datetime, Optional[int], Optional[int]]]] = {}
+        for dev_id, moved_at, from_id, to_id in (
+            DeviceMovement.objects.filter(device_id__in=ids)
+            .order_by("device_id", "moved_at", "id")
+            .values_list("device_id", "moved_at", "from_location_id", "to_location_id")
+        ):
+            moves.setdefault(dev_id, []).append((moved_at, from_id, to_id))
+
+        rows = []
+        for dev_id, location_id, installation_date in chunk:
+            installed = timezone.make_aware(datetime.combine(installation_date, time.min)) if installation_date else None
+            intervals, corrected = _replay(installed, location_id, moves.get(dev_id, []), now)
+            result.corrected += int(corrected)
+            rows.extend(
+                DevicePlacementInterval(device_id=dev_id, location_id=loc, valid_from=vf, valid_to=vt)
+                for loc, vf, vt in intervals
+            )
+
+        with transaction.atomic():
+            DevicePlacementInterval.objects.filter(device_id__in=ids).delete()
+            DevicePlacementInterval.objects.bulk_create(rows, batch_size=2000)
+        result.devices += len(chunk)
+        result.intervals += len(rows)
+    return result
@@ -0,0 +1,253 @@
+# inventory/qr_images.py
+"""
+QR зургийг qr_token-оос шууд (on-demand) зурна: /qr/img/<token>.png|.svg?size=
+
+Түлхүүр = sha256(хувилбар | формат | хэмжээ | QR агуулга) — агуулгаар хаяглагдсан тул
+ETag нь DB/дискэд хандалгүйгээр тооцогдоно (If-None-Match -> шууд 304).
+Дараалал: process доторх LRU -> MEDIA_ROOT/qr/cache/<xx>/<key>.<fmt> -> зурах.
+
+Дискэн кэш: token хүчингүй болох / багаж устахад evict_qr_images() тэр token-ий бүх
+хувилбарыг устгана; бусдыг `manage.py prune_qr_image_cache` (cron) нас/хэмжээгээр цэвэрлэнэ.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .qr_render import qr_payload, site_base_url
+
+logger = logging.getLogger(__name__)
+
+QR_IMG_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+QR_IMG_DEFAULT_SIZE = 256
+QR_IMG_MIN_SIZE = 64
+QR_IMG_MAX_SIZE = 2048
+# Кэшийн хувилбарын тоог хязгаарлах: хэмжээг 32px-ийн алхамд буулгана
+QR_IMG_SIZE_STEP = 32
+# Зургийн хэлбэр өөрчлөгдвөл нэмэгдүүлнэ (бүх ETag/кэш шинэчлэгдэнэ)
+QR_IMG_VERSION = 1
+QR_IMG_LRU_SIZE = 1024
+QR_IMG_BORDER = 2
+# Дискэн кэшийн хязгаар (prune_qr_image_cache): үүнээс хуучин / том бол хуучнаас нь устгана
+QR_IMG_CACHE_MAX_AGE_DAYS = 30
+QR_IMG_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+_lru: "OrderedDict[str, bytes]" = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def qr_image_cache_root() -> Path:
+    return Path(getattr(settings, "QR_IMAGE_CACHE_DIR", None) or Path(settings.MEDIA_ROOT) / "qr" / "cache")
+
+
+def normalize_size(raw) -> int:
+    try:
+        size = int(raw)
+    except (TypeError, ValueError):
+        size = QR_IMG_DEFAULT_SIZE
+    size = int(round(size / QR_IMG_SIZE_STEP)) * QR_IMG_SIZE_STEP
+    return max(QR_IMG_MIN_SIZE, min(QR_IMG_MAX_SIZE, size))
+
+
+def qr_image_key(token, fmt: str, size: int) -> str:
+    raw = f"v{QR_IMG_VERSION}|{fmt}|{size}|{qr_payload(token)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def qr_matrix(data: str) -> List[List[bool]]:
+    import qrcode
+    from qrcode.constants import ERROR_CORRECT_M
+
+    qr = qrcode.QRCode(version=None, error_correction=ERROR_CORRECT_M, border=QR_IMG_BORDER)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def render_png(matrix: List[List[bool]], size: int) -> bytes:
+    """Модуль бүрийг бүхэл пикселээр (тод ирмэгтэй) зурж, size хүртэл цагаанаар дүүргэнэ."""
+    from PIL import Image
+
+    n = len(matrix)
+    img = Image.new("1", (n, n), 1)
+    img.putdata([0 if cell else 1 for row in matrix for cell in row])
+    box = max(1, size // n)
+    img = img.resize((n * box, n * box), Image.NEAREST)
+    if n * box != size:
+        canvas = Image.new("1", (size, size), 1)
+        off = (size - n * box) // 2
+        canvas.paste(img, (off, off))
+        img = canvas
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def render_svg(matrix: List[List[bool]], size: int) -> bytes:
+    """Нэг <path>: мөр бүрийн дараалсан хар модулиудыг нэг тэгш өнцөгт болгоно."""
+    n = len(matrix)
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < n:
+            if row[x]:
+                start = x
+                while x < n and row[x]:
+                    x += 1
+                parts.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {n} {n}" '
+        f'shape-rendering="crispEdges"><rect width="{n}" height="{n}" fill="#fff"/>'
+        f'<path d="{"".join(parts)}" fill="#000"/></svg>'
+    )
+    return svg.encode("utf-8")
+
+
+def _lru_get(key: str):
+    with _lru_lock:
+        data = _lru.get(key)
+        if data is not None:
+            _lru.move_to_end(key)
+        return data
+
+
+def _lru_put(key: str, data: bytes) -> None:
+    with _lru_lock:
+        _lru[key] = data
+        _lru.move_to_end(key)
+        while len(_lru) > QR_IMG_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _write_atomic(fp: Path, data: bytes) -> None:
+    try:
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=fp.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, fp)
+    except OSError as e:
+        logger.warning("Could not write QR cache %s: %s", fp, e)
+
+
+def cached_qr_image(key: str, fmt: str):
+    """LRU эсвэл дискэн кэшээс (байвал) bytes; байхгүй бол None."""
+    data = _lru_get(key)
+    if data is not None:
+        return data
+    try:
+        data = (qr_image_cache_root() / key[:2] / f"{key}.{fmt}").read_bytes()
+    except OSError:
+        return None
+    _lru_put(key, data)
+    return data
+
+
+def qr_image(token, fmt: str = "png", size: int = QR_IMG_DEFAULT_SIZE) -> Tuple[bytes, str]:
+    """(bytes, etag). Кэшгүй бол зурж LRU + диск рүү бичнэ."""
+    if fmt not in QR_IMG_FORMATS:
+        raise ValueError(f"Unsupported QR format: {fmt}")
+    size = normalize_size(size)
+    key = qr_image_key(token, fmt, size)
+    data = cached_qr_image(key, fmt)
+    if data is None:
+        matrix = qr_matrix(qr_payload(token))
+        data = render_png(matrix, size) if fmt == "png" else render_svg(matrix, size)
+        _write_atomic(qr_image_cache_root() / key[:2] / f"{key}.{fmt}", data)
+        _lru_put(key, data)
+    return data, key
+
+
+# ------------------------------------------------------------
+# Кэш цэвэрлэгээ
+# ------------------------------------------------------------
+def _cache_file(key: str, fmt: str) -> Path:
+    return qr_image_cache_root() / key[:2] / f"{key}.{fmt}"
+
+
+def evict_qr_images(tokens: Iterable) -> int:
+    """Token-уудын бүх формат/хэмжээний кэшийг (LRU + диск) устгана. Устгасан файлын тоо."""
+    sizes = range(QR_IMG_MIN_SIZE, QR_IMG_MAX_SIZE + 1, QR_IMG_SIZE_STEP)
+    try:
+        site_base_url()
+    except ImproperlyConfigured:
+        return 0  # payload-гүй бол кэш ч үүсээгүй
+    removed = 0
+    for token in tokens:
+        if not token:
+            continue
+        for fmt in QR_IMG_FORMATS:
+            for size in sizes:
+                key = qr_image_key(token, fmt, size)
+                with _lru_lock:
+                    _lru.pop(key, None)
+                try:
+                    _cache_file(key, fmt).unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning("Could not remove QR cache for %s: %s", key, e)
+    return removed
+
+
+@dataclass
+class QrCachePruneResult:
+    scanned: int = 0
+    removed: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+def prune_qr_image_cache(
+    max_age_days: float = QR_IMG_CACHE_MAX_AGE_DAYS,
+    max_bytes: int = QR_IMG_CACHE_MAX_BYTES,
+    *,
+    now: float | None = None,
+) -> QrCachePruneResult:
+    """
+    max_age_days-ээс хуучин файлуудыг, дараа нь нийт хэмжээ max_bytes-ээс хэтэрвэл
+    хамгийн хуучнаас нь (mtime) устгана. Устсан зургийг дараагийн хүсэлт дахин зурна.
+    """
+    now = time.time() if now is None else now
+    cutoff = now - max_age_days * 86400
+    res = QrCachePruneResult()
+    entries = []
+    for fp in qr_image_cache_root().glob("*/*.*"):
+        try:
+            st = fp.stat()
+        except OSError:
+            continue
+        if fp.suffix == ".tmp" and st.st_mtime >= cutoff:
+            continue  # бичигдэж буй файл
+        res.scanned += 1
+        res.bytes_before += st.st_size
+        entries.append((st.st_mtime, st.st_size, fp))
+
+    entries.sort()
+    total = res.bytes_before
+    for mtime, size, fp in entries:
+        if mtime >= cutoff and total <= max_bytes:
+            break
+        try:
+            fp.unlink()
+        except OSError:
+            continue
+        res.removed += 1
+        total -= size
+    res.bytes_after = total
+    return res
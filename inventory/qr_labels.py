@@ -0,0 +1,167 @@
+# inventory/qr_labels.py
+"""
+QR шошгыг A4 хуудсанд N-up (default 3×8) байрлуулсан нэг олон хуудастай PDF.
+
+- QR-ийг вектор хэлбэрээр зурна (PNG растер хийхгүй): модулийн мөр бүрийн
+  дараалсан хар хэсгийг нэг тэгш өнцөгт болгож, шошго бүрт нэг canvas path.
+  (QrCodeWidget нь кодыг хоёр удаа тооцоолж, модуль бүрт Rect shape үүсгэдэг тул
+  мянган шошгонд хэт удаан — ижил вектор гаралтыг шууд canvas-аар гаргана.)
+- Device-уудыг queryset.iterator()-аар урсгалаар уншина. ReportLab-ийн Canvas нь бүх
+  хуудсыг save() хүртэл санах ойд хадгалдаг тул санах ой ба хугацаа шошгын тоотой
+  шугаман өснө; admin action-ыг QR_LABELS_ADMIN_MAX-аар хязгаарлаж, их хэмжээг
+  print_qr_labels командаар (request-ээс гадуур) файлд бичнэ. SpooledTemporaryFile нь
+  зөвхөн бэлэн PDF-ийн bytes-ийг том бол диск дээр барина.
+"""
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Iterable, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+
+from .pdf_passport import MAIN_FONT, MAIN_FONT_BOLD
+from .qr_images import qr_matrix
+from .qr_render import qr_payload
+
+# Tempfile санах ойд байх дээд хэмжээ, үүнээс том бол диск рүү шилжинэ
+LABEL_SPOOL_MAX = 8 * 1024 * 1024
+# Admin action-аас нэг хүсэлтэд хэвлэх дээд тоо (~13ms/шошго, PDF бүтнээрээ санах ойд);
+# үүнээс их бол print_qr_labels команд
+QR_LABELS_ADMIN_MAX = 300
+
+
+@dataclass(frozen=True)
+class LabelLayout:
+    cols: int = 3
+    rows: int = 8
+    margin_x: float = 6 * mm
+    margin_y: float = 8 * mm
+    gap: float = 2 * mm
+    padding: float = 2 * mm
+    show_border: bool = True
+
+    @property
+    def per_page(self) -> int:
+        return self.cols * self.rows
+
+    def cell_size(self) -> Tuple[float, float]:
+        w, h = A4
+        cw = (w - 2 * self.margin_x - (self.cols - 1) * self.gap) / self.cols
+        ch = (h - 2 * self.margin_y - (self.rows - 1) * self.gap) / self.rows
+        return cw, ch
+
+    def cell_origin(self, slot: int) -> Tuple[float, float]:
+        """Хуудсан дээрх slot (0..per_page-1) -> шошгын зүүн доод булан."""
+        cw, ch = self.cell_size()
+        col, row = slot % self.cols, slot // self.cols
+        x = self.margin_x + col * (cw + self.gap)
+        y = A4[1] - self.margin_y - (row + 1) * ch - row * self.gap
+        return x, y
+
+
+def _fit(text: str, font: str, size: float, width: float) -> str:
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + "…", font, size) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def label_lines(device) -> Tuple[str, str]:
+    catalog = getattr(device, "catalog_item", None)
+    name = (catalog.name_mn if catalog else "") or (device.other_name or "") or device.get_kind_display()
+    return (device.serial_number or "-").strip(), name.strip()
+
+
+def draw_qr_vector(c: Canvas, matrix, x: float, y: float, size: float) -> None:
+    """QR matrix -> (x, y) зүүн доод буландаа size×size вектор дүрс."""
+    n = len(matrix)
+    m = size / n
+    path = c.beginPath()
+    for r, row in enumerate(matrix):
+        top = y + size - (r + 1) * m
+        col = 0
+        while col < n:
+            if row[col]:
+                start = col
+                while col < n and row[col]:
+                    col += 1
+                path.rect(x + start * m, top, (col - start) * m, m)
+            else:
+                col += 1
+    c.setFillColor(colors.black)
+    c.drawPath(path, stroke=0, fill=1)
+
+
+def draw_label(c: Canvas, device, x: float, y: float, cw: float, ch: float, layout: LabelLayout) -> None:
+    pad = layout.padding
+    if layout.show_border:
+        c.setStrokeColor(colors.lightgrey)
+        c.setLineWidth(0.3)
+        c.rect(x, y, cw, ch)
+
+    # QR: шошгын зүүн талд, өндрөөр нь дүүргэсэн дөрвөлжин (quiet zone-той)
+    payload = qr_payload(device.qr_token)
+    qr_size = min(ch - 2 * pad, cw * 0.5)
+    draw_qr_vector(c, qr_matrix(payload), x + pad, y + (ch - qr_size) / 2, qr_size)
+
+    # Текст: сериал (тод), каталогийн нэр, QR URL (жижиг)
+    tx = x + 2 * pad + qr_size
+    tw = cw - (tx - x) - pad
+    serial, name = label_lines(device)
+    c.setFillColor(colors.black)
+    c.setFont(MAIN_FONT_BOLD, 9)
+    c.drawString(tx, y + ch - pad - 9, _fit(serial, MAIN_FONT_BOLD, 9, tw))
+    c.setFont(MAIN_FONT, 7)
+    c.drawString(tx, y + ch - pad - 19, _fit(name, MAIN_FONT, 7, tw))
+    c.setFont(MAIN_FONT, 5)
+    c.setFillColor(colors.dimgrey)
+    c.drawString(tx, y + pad + 1, _fit(payload, MAIN_FONT, 5, tw))
+
+
+def write_qr_labels(devices: Iterable, out: IO[bytes], layout: Optional[LabelLayout] = None) -> int:
+    """devices -> out (binary file) PDF. Бичсэн шошгын тоог буцаана."""
+    layout = layout or LabelLayout()
+    cw, ch = layout.cell_size()
+    c = Canvas(out, pagesize=A4, pageCompression=1)
+    c.setTitle("QR labels")
+    n = 0
+    for device in devices:
+        slot = n % layout.per_page
+        if n and slot == 0:
+            c.showPage()
+        x, y = layout.cell_origin(slot)
+        draw_label(c, device, x, y, cw, ch, layout)
+        n += 1
+    if n == 0:
+        c.setFont(MAIN_FONT, 10)
+        c.drawString(20 * mm, A4[1] - 20 * mm, "Багаж сонгогдоогүй.")
+    c.showPage()
+    c.save()
+    return n
+
+
+def label_queryset(queryset):
+    # admin-ийн select_related (location__aimag_ref г.м.) only()-той зөрчилдөхгүйн тулд цэвэрлэнэ
+    return (
+        queryset.select_related(None)
+        .select_related("catalog_item", "location")
+        .only("id", "serial_number", "qr_token", "kind", "other_name", "catalog_item__name_mn", "location__name")
+        .order_by("location__name", "serial_number", "id")
+    )
+
+
+def build_qr_labels_file(queryset, layout: Optional[LabelLayout] = None) -> Tuple[IO[bytes], int]:
+    """
+    Queryset -> эхэнд нь буцаасан (seek(0)) түр файл, шошгын тоо.
+    PDF-ийг бүтнээр нь үүсгэсний дараа буцаана (урсгал биш) — дуудагч тоог хязгаарлана.
+    """
+    f = tempfile.SpooledTemporaryFile(max_size=LABEL_SPOOL_MAX)
+    n = write_qr_labels(label_queryset(queryset).iterator(chunk_size=1000), f, layout)
+    f.seek(0)
+    return f, n
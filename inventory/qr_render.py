@@ -0,0 +1,383 @@
+# inventory/qr_render.py
+"""
+Device QR PNG-г DB дээрх дараалал (QrRenderJob)-аар зурна.
+
+- Device.save() / импорт -> enqueue_qr_render(ids): UPDATE + INSERT (ignore_conflicts), attempts-ийг тэглэхгүй.
+- `manage.py process_qr_jobs` -> process_qr_jobs(): PENDING ажлуудыг batch-аар
+  авч (select_for_update skip_locked), зурж, qr_image-ийг bulk_update хийнэ.
+- Алдаа гарвал 2**attempts минутын backoff-оор дахин оролдоно; QR_JOB_MAX_ATTEMPTS
+  хүрвэл FAILED (admin дээр харагдана, "дахин оролдох" action-оор сэргээнэ).
+- PNG-г process pool-д зурж, файлуудыг thread pool-оор зэрэг бичнэ (render_devices_qr);
+  admin-ийн generate_qr action жижиг сонголтыг шууд, томыг batch=<id>-тай дараалалд өгнө.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, F
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Device, QrRenderJob
+
+logger = logging.getLogger(__name__)
+
+QR_JOB_BATCH_SIZE = 100
+QR_JOB_MAX_ATTEMPTS = 5
+# Worker унасан бол RUNNING-д гацсан ажлыг энэ хугацааны дараа буцааж PENDING болгоно
+QR_JOB_STALE_AFTER = timedelta(minutes=15)
+# Файл бичих зэрэгцээ thread-ийн тоо (storage I/O)
+QR_IO_THREADS = 8
+# QR хүчинтэй хугацаа (generate_qr action)
+QR_VALIDITY = timedelta(days=365)
+
+
+def site_base_url() -> str:
+    """settings.SITE_BASE_URL ("https://host", төгсгөлийн /-гүй); хоосон бол ImproperlyConfigured."""
+    base = (getattr(settings, "SITE_BASE_URL", "") or "").strip().rstrip("/")
+    if not base:
+        raise ImproperlyConfigured(
+            "SITE_BASE_URL is not set: QR codes and labels need an absolute URL (e.g. https://meteo.example.mn)."
+        )
+    return base
+
+
+def qr_payload(token) -> str:
+    """QR дотор кодлох public хуудасны (qr_device_public) бүтэн URL — утсаар уншуулахад нээгдэнэ."""
+    return site_base_url() + reverse("inventory:qr_device_public", args=[token])
+
+
+def render_qr_png(data: str) -> bytes:
+    import qrcode
+    from qrcode.constants import ERROR_CORRECT_M
+
+    qr = qrcode.QRCode(version=None, error_correction=ERROR_CORRECT_M, box_size=10, border=2)
+    qr.add_data(data)
+    qr.make(fit=True)
+    buf = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _render_or_error(data: str):
+    # Process pool-д дамжих тул module түвшний функц; алдааг буцаана (pool-ыг зогсоохгүй)
+    try:
+        return render_qr_png(data)
+    except Exception as e:
+        return e
+
+
+def qr_filename(device: Device) -> str:
+    serial = slugify((device.serial_number or "").strip())[:40] or "no_serial"
+    return f"device_{device.pk}_{serial}.png"
+
+
+def render_devices_qr(
+    devices: List[Device], executor: Optional[Executor] = None, workers: int = 1
+) -> Tuple[List[Tuple[Device, str]], Dict[int, Exception], Dict[int, str]]:
+    """
+    Device-уудын QR PNG-г зурж (executor өгвөл workers процесстой pool-д), файлыг зэрэг бичнэ.
+    DB-д бичихгүй: device.qr_image-д шинэ нэр онооно, дуудагч bulk_update хийнэ.
+    Буцаах: ([(device, payload)], {device_id: exception}, {device_id: хуучин файлын нэр}).
+
+    Хуучин файлыг энд устгахгүй: дуудагч DB-д бичсэн мөрүүдийнхийг _commit_qr_files()-ээр
+    commit-ийн дараа, бичээгүй мөрүүдийн шинэ файлыг _discard_qr_files()-ээр устгана.
+    """
+    payloads = [qr_payload(d.qr_token) for d in devices]
+    if executor is not None and len(devices) > 1:
+        chunk = max(1, len(payloads) // (max(1, workers) * 4))
+        pngs = list(executor.map(_render_or_error, payloads, chunksize=chunk))
+    else:
+        pngs = [_render_or_error(p) for p in payloads]
+
+    replaced = {d.pk: (d.qr_image.name if d.qr_image else "") for d in devices}
+
+    def _store(device: Device, png) -> Optional[Exception]:
+        if isinstance(png, Exception):
+            return png
+        try:
+            device.qr_image.save(qr_filename(device), ContentFile(png), save=False)
+        except Exception as e:
+            return e
+        return None
+
+    with ThreadPoolExecutor(max_workers=QR_IO_THREADS) as io_pool:
+        results = list(io_pool.map(_store, devices, pngs))
+
+    done, errors = [], {}
+    for device, payload, err in zip(devices, payloads, results):
+        if err is None:
+            done.append((device, payload))
+        else:
+            errors[device.pk] = err
+    return done, errors, replaced
+
+
+def _delete_qr_files(names: List[str]) -> None:
+    storage = Device._meta.get_field("qr_image").storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.warning("QR file not deleted: %s", name, exc_info=True)
+
+
+def _commit_qr_files(saved: List[Device], replaced: Dict[int, str]) -> None:
+    """DB-д бичсэн мөрүүдийн хуучин файлыг транзакц commit болсны дараа устгана (rollback бол хэвээр)."""
+    old = [replaced[d.pk] for d in saved if replaced.get(d.pk) and replaced[d.pk] != d.qr_image.name]
+    if old:
+        transaction.on_commit(lambda: _delete_qr_files(old))
+
+
+def _discard_qr_files(skipped: List[Device], replaced: Dict[int, str]) -> None:
+    """DB-д бичигдээгүй (superseded / транзакц унасан) мөрүүдийн шинэ файлыг устгана."""
+    _delete_qr_files([d.qr_image.name for d in skipped if d.qr_image and d.qr_image.name != replaced.get(d.pk)])
+
+
+def enqueue_qr_render(device_ids: Iterable[int], batch: str = "", *, reset: bool = False) -> int:
+    """
+    Device бүрт QrRenderJob-ийг PENDING болгоно (1000 мөр тутамд нэг UPDATE + нэг INSERT).
+
+    Байгаа ажлын attempts-ийг хөндөхгүй (Device.save бүрт тэглэвэл байнга унадаг багаж
+    QR_JOB_MAX_ATTEMPTS-д хүрэхгүй); reset=True (admin-ийн "дахин оролдох", бөөн
+    regenerate, --scan) үед л тэглэнэ. batch өгөөгүй бол байгаа batch-ийг хадгална.
+    """
+    ids = sorted({int(i) for i in device_ids if i})
+    if not ids:
+        return 0
+    now = timezone.now()
+    values = {"status": QrRenderJob.Status.PENDING, "next_attempt_at": now, "requested_at": now}
+    if reset:
+        values.update(attempts=0, last_error="")
+    if batch:
+        values["batch"] = batch
+    for start in range(0, len(ids), 1000):
+        chunk = ids[start:start + 1000]
+        QrRenderJob.objects.filter(device_id__in=chunk).update(**values)
+        QrRenderJob.objects.bulk_create(
+            [QrRenderJob(device_id=i, status=QrRenderJob.Status.PENDING, requested_at=now, next_attempt_at=now, batch=batch) for i in chunk],
+            ignore_conflicts=True,
+        )
+    return len(ids)
+
+
+def _mark_jobs_done(done: List[Tuple[Device, str]]) -> None:
+    now = timezone.now()
+    QrRenderJob.objects.bulk_create(
+        [
+            QrRenderJob(
+                device_id=d.pk, status=QrRenderJob.Status.DONE, rendered_payload=payload,
+                requested_at=now, started_at=now, finished_at=now,
+            )
+            for d, payload in done
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["device"],
+        update_fields=["status", "rendered_payload", "last_error", "finished_at"],
+    )
+
+
+def regenerate_qr(
+    queryset, *, chunk_size: int = 500, executor: Optional[Executor] = None
+) -> Tuple[int, Dict[int, Exception]]:
+    """
+    generate_qr action-ийн цөм: хүчингүй болголтыг арилгаж, хугацааг сунгаж,
+    QR-ийг дахин зурна. chunk бүрт нэг bulk_update (Device.save дуудагдахгүй).
+    """
+    expires = timezone.now() + QR_VALIDITY
+    fields = ["qr_token", "qr_image", "qr_revoked_at", "qr_expires_at"]
+    ids = list(queryset.order_by("pk").values_list("pk", flat=True))
+    total, errors = 0, {}
+    for start in range(0, len(ids), chunk_size):
+        devices = list(Device.objects.filter(pk__in=ids[start:start + chunk_size]).only("pk", "serial_number", *fields))
+        for d in devices:
+            if not d.qr_token:
+                d.qr_token = uuid.uuid4()
+            d.qr_revoked_at = None
+            d.qr_expires_at = expires
+        done, errs, replaced = render_devices_qr(devices, executor=executor)
+        errors.update(errs)
+        saved = [d for d, _p in done]
+        try:
+            with transaction.atomic():
+                Device.objects.bulk_update(saved, fields)
+                # Амжилтгүй нь ч хугацаа/хүчингүйг шинэчилнэ, QR-ийг worker дахин оролдоно
+                failed = [d for d in devices if d.pk in errs]
+                if failed:
+                    Device.objects.bulk_update(failed, ["qr_token", "qr_revoked_at", "qr_expires_at"])
+                if done:
+                    _mark_jobs_done(done)
+                _commit_qr_files(saved, replaced)
+        except Exception:
+            _discard_qr_files(saved, replaced)
+            raise
+        if errs:
+            enqueue_qr_render(errs.keys())
+        total += len(done)
+    return total, errors
+
+
+def queue_qr_regeneration(queryset) -> Tuple[str, int]:
+    """
+    Том сонголт: хугацаа/хүчингүйг нэг UPDATE-ээр шинэчилж, зурах ажлыг
+    batch id-тай дараалалд өгнө. (batch_id, тоо) буцаана; явцыг qr_batch_progress-оор.
+    """
+    batch = uuid.uuid4().hex
+    ids = list(queryset.values_list("pk", flat=True))
+    with transaction.atomic():
+        Device.objects.filter(pk__in=ids).update(qr_revoked_at=None, qr_expires_at=timezone.now() + QR_VALIDITY)
+        n = enqueue_qr_render(ids, batch=batch, reset=True)
+    return batch, n
+
+
+def qr_batch_progress(batch: str) -> Dict[str, int]:
+    counts = {s: 0 for s in QrRenderJob.Status.values}
+    for status, n in QrRenderJob.objects.filter(batch=batch).values_list("status").annotate(n=Count("id")):
+        counts[status] = n
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def find_missing_or_stale_qr() -> List[int]:
+    """qr_image байхгүй, файл нь алга, эсвэл өөр payload-оор зурагдсан Device-ийн id."""
+    out = []
+    rows = Device.objects.values_list("id", "qr_token", "qr_image", "qr_job__rendered_payload").order_by("id")
+    for dev_id, token, image, rendered in rows.iterator(chunk_size=2000):
+        if not image:
+            out.append(dev_id)
+        elif rendered and rendered != qr_payload(token):
+            out.append(dev_id)
+        elif not Device._meta.get_field("qr_image").storage.exists(image):
+            out.append(dev_id)
+    return out
+
+
+@dataclass
+class QrBatchResult:
+    claimed: int = 0
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+    # Зурж байх хооронд дахин enqueue хийгдсэн (үр дүнг нь бичээгүй) ажил
+    superseded: int = 0
+
+
+def requeue_stale_jobs() -> int:
+    cutoff = timezone.now() - QR_JOB_STALE_AFTER
+    return QrRenderJob.objects.filter(status=QrRenderJob.Status.RUNNING, started_at__lt=cutoff).update(
+        status=QrRenderJob.Status.PENDING, next_attempt_at=timezone.now()
+    )
+
+
+def _claim_batch(batch_size: int) -> List[int]:
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            QrRenderJob.objects.select_for_update(skip_locked=True)
+            .filter(status=QrRenderJob.Status.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if ids:
+            QrRenderJob.objects.filter(id__in=ids).update(
+                status=QrRenderJob.Status.RUNNING, started_at=now, attempts=F("attempts") + 1
+            )
+    return ids
+
+
+def process_qr_batch(
+    batch_size: int = QR_JOB_BATCH_SIZE, executor: Optional[Executor] = None, workers: int = 1
+) -> QrBatchResult:
+    """Нэг batch: claim -> зурах -> Device.qr_image + QrRenderJob-ийг bulk_update."""
+    # Тохиргоо дутуу бол claim хийхээс өмнө унана (ажлууд RUNNING-д гацаж attempts өсөхгүй)
+    site_base_url()
+    res = QrBatchResult()
+    job_ids = _claim_batch(batch_size)
+    res.claimed = len(job_ids)
+    if not job_ids:
+        return res
+
+    jobs = list(QrRenderJob.objects.filter(id__in=job_ids).select_related("device"))
+    done, errors, replaced = render_devices_qr([job.device for job in jobs], executor=executor, workers=workers)
+    payloads = {d.pk: p for d, p in done}
+    now = timezone.now()
+    for job in jobs:
+        err = errors.get(job.device_id)
+        if err is not None:
+            logger.warning("QR render failed for device_id=%s: %r", job.device_id, err)
+            job.last_error = repr(err)[:2000]
+            if job.attempts >= QR_JOB_MAX_ATTEMPTS:
+                job.status = QrRenderJob.Status.FAILED
+                job.finished_at = now
+                res.failed += 1
+            else:
+                job.status = QrRenderJob.Status.PENDING
+                job.next_attempt_at = now + timedelta(minutes=2 ** job.attempts)
+                res.retried += 1
+            continue
+        job.status = QrRenderJob.Status.DONE
+        job.rendered_payload = payloads[job.device_id]
+        job.last_error = ""
+        job.finished_at = now
+        res.done += 1
+
+    # bulk_update: Device.save() (дахин enqueue, signal) дуудагдахгүй.
+    # Зурж байх хооронд дахин enqueue хийгдсэн (PENDING болсон / өөр claim) ажлыг дарж
+    # бичихгүй: зөвхөн энэ claim-ийн (status=RUNNING, started_at) хэвээр мөрүүдийг шинэчилнэ.
+    claimed_at = jobs[0].started_at
+    rendered = [d for d, _p in done]
+    try:
+        with transaction.atomic():
+            current = set(
+                QrRenderJob.objects.select_for_update()
+                .filter(id__in=job_ids, status=QrRenderJob.Status.RUNNING, started_at=claimed_at)
+                .values_list("id", flat=True)
+            )
+            kept = [job for job in jobs if job.id in current]
+            kept_devices = {job.device_id for job in kept}
+            saved = [d for d in rendered if d.pk in kept_devices]
+            if saved:
+                Device.objects.bulk_update(saved, ["qr_image"])
+            if kept:
+                QrRenderJob.objects.bulk_update(
+                    kept, ["status", "rendered_payload", "last_error", "next_attempt_at", "finished_at"]
+                )
+            _commit_qr_files(saved, replaced)
+    except Exception:
+        _discard_qr_files(rendered, replaced)
+        raise
+    _discard_qr_files([d for d in rendered if d.pk not in kept_devices], replaced)
+    res.superseded = len(jobs) - len(kept)
+    return res
+
+
+def process_qr_jobs(
+    batch_size: int = QR_JOB_BATCH_SIZE, max_batches: int = 0, executor: Optional[Executor] = None, workers: int = 1
+) -> QrBatchResult:
+    """Дараалал хоосортол (эсвэл max_batches хүртэл) batch-уудыг ажиллуулна."""
+    total = QrBatchResult()
+    requeue_stale_jobs()
+    n = 0
+    while not max_batches or n < max_batches:
+        res = process_qr_batch(batch_size, executor=executor, workers=workers)
+        if not res.claimed:
+            break
+        n += 1
+        total.claimed += res.claimed
+        total.done += res.done
+        total.retried += res.retried
+        total.failed += res.failed
+        total.superseded += res.superseded
+    return total
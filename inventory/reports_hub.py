@@ -110,9 +110,9 @@ def _apply_universal_filters(request: HttpRequest, qs: QuerySet) -> QuerySet:
         if model == Location:
             qs = qs.filter(aimag_ref_id=flt["aimag"])
         elif hasattr(model, 'location'):
-            qs = qs.filter(location__aimag_ref_id=flt["aimag"])
+            qs = qs.filter(aimag_ref_id=flt["aimag"])
         elif hasattr(model, 'device'):
-            qs = qs.filter(device__location__aimag_ref_id=flt["aimag"])
+            qs = qs.filter(device__aimag_ref_id=flt["aimag"])
 
     return qs
 
@@ -193,7 +193,7 @@ def reports_hub_view(request: HttpRequest, admin_site: Optional[AdminSite] = Non
         context['available_apps'] = []
 
     flt = _current_filter(request)
-    dev_qs = _scope_qs(request, Device.objects.all(), "location__aimag_ref_id")
+    dev_qs = _scope_qs(request, Device.objects.all(), "aimag_ref_id")
     dev_qs = _apply_universal_filters(request, dev_qs)
 
     export_links = [
@@ -240,7 +240,7 @@ def reports_chart_json(request: HttpRequest) -> JsonResponse:
     dev_qs = _scope_qs(
         request,
         Device.objects.select_related("location", "location__aimag_ref"),
-        "location__aimag_ref_id",
+        "aimag_ref_id",
     )
     dev_qs = _apply_universal_filters(request, dev_qs)
 
@@ -264,13 +264,13 @@ def reports_chart_json(request: HttpRequest) -> JsonResponse:
     ms_qs = _scope_qs(
         request,
         MaintenanceService.objects.select_related("device", "device__location", "device__location__aimag_ref"),
-        "device__location__aimag_ref_id",
+        "device__aimag_ref_id",
     ).filter(workflow_status="SUBMITTED", date__gte=start, date__lte=today)
 
     ca_qs = _scope_qs(
         request,
         ControlAdjustment.objects.select_related("device", "device__location", "device__location__aimag_ref"),
-        "device__location__aimag_ref_id",
+        "device__aimag_ref_id",
     ).filter(workflow_status="SUBMITTED", date__gte=start, date__lte=today)
 
     ms_by_day = dict(ms_qs.annotate(d=TruncDate("date")).values("d").annotate(n=Count("id")).values_list("d", "n"))
@@ -289,22 +289,22 @@ def reports_chart_json(request: HttpRequest) -> JsonResponse:
 
   
 def reports_export_devices_xlsx(request: HttpRequest) -> HttpResponse:
-    qs = _scope_qs(request, Device.objects.select_related("location", "location__aimag_ref"), "location__aimag_ref_id")
+    qs = _scope_qs(request, Device.objects.select_related("location", "aimag_ref"), "aimag_ref_id")
     qs = _apply_universal_filters(request, qs)
     header = ["ID", "Сериал", "Төрөл", "Төлөв", "Байршил", "Аймаг"]
     rows = [[d.id, d.serial_number, d.kind, d.status, str(d.location), 
-             getattr(d.location.aimag_ref, 'name', '') if d.location else ''] for d in qs[:20000]]
+             getattr(d.aimag_ref, 'name', '')] for d in qs[:20000]]
     return _xlsx_response("devices_report.xlsx", header, rows)
 
 def reports_export_devices_csv(request: HttpRequest) -> HttpResponse:
-    qs = _scope_qs(request, Device.objects.all(), "location__aimag_ref_id")
+    qs = _scope_qs(request, Device.objects.all(), "aimag_ref_id")
     qs = _apply_universal_filters(request, qs)
     header = ["ID", "Serial", "Kind", "Status"]
     rows = [[d.id, d.serial_number, d.kind, d.status] for d in qs[:10000]]
     return _csv_response("devices.csv", header, rows)
 
 def reports_export_maintenance_xlsx(request: HttpRequest) -> HttpResponse:
-    qs = _scope_qs(request, MaintenanceService.objects.select_related('device', 'device__location'), 'device__location__aimag_ref_id')
+    qs = _scope_qs(request, MaintenanceService.objects.select_related('device', 'device__location'), 'device__aimag_ref_id')
     qs = _apply_universal_filters(request, qs)
     df, dt = _date_window(request)
     qs = qs.filter(date__range=[df, dt])
@@ -313,7 +313,7 @@ def reports_export_maintenance_xlsx(request: HttpRequest) -> HttpResponse:
     return _xlsx_response(f"maintenance_{df}_{dt}.xlsx", header, rows)
 
 def reports_export_maintenance_csv(request: HttpRequest) -> HttpResponse:
-    qs = _scope_qs(request, MaintenanceService.objects.select_related('device'), 'device__location__aimag_ref_id')
+    qs = _scope_qs(request, MaintenanceService.objects.select_related('device'), 'device__aimag_ref_id')
     qs = _apply_universal_filters(request, qs)
     df, dt = _date_window(request)
     qs = qs.filter(date__range=[df, dt])
@@ -399,13 +399,13 @@ def workflow_pending_dashboard(request):
         ca_qs = ca_qs.filter(created_at__gte=dt)
 
     if is_aimag_engineer and user_aimag:
-        ms_qs = ms_qs.filter(device__location__aimag_ref=user_aimag)
-        ca_qs = ca_qs.filter(device__location__aimag_ref=user_aimag)
+        ms_qs = ms_qs.filter(device__aimag_ref=user_aimag)
+        ca_qs = ca_qs.filter(device__aimag_ref=user_aimag)
     elif aimag_param:
         aimag_q = (
-            Q(device__location__aimag_ref__code__iexact=aimag_param) |
-            Q(device__location__aimag_ref__name__iexact=aimag_param) |
-            Q(device__location__aimag_ref__name__icontains=aimag_param)
+            Q(device__aimag_ref__code__iexact=aimag_param) |
+            Q(device__aimag_ref__name__iexact=aimag_param) |
+            Q(device__aimag_ref__name__icontains=aimag_param)
         )
         ms_qs = ms_qs.filter(aimag_q)
         ca_qs = ca_qs.filter(aimag_q)
@@ -493,8 +493,8 @@ def workflow_pending_counts(request):
     ms_qs = MaintenanceService.objects.filter(workflow_status__in=PENDING_SET)
     ca_qs = ControlAdjustment.objects.filter(workflow_status__in=PENDING_SET)
     if is_aimag_engineer and user_aimag:
-        ms_qs = ms_qs.filter(device__location__aimag_ref=user_aimag)
-        ca_qs = ca_qs.filter(device__location__aimag_ref=user_aimag)
+        ms_qs = ms_qs.filter(device__aimag_ref=user_aimag)
+        ca_qs = ca_qs.filter(device__aimag_ref=user_aimag)
     return JsonResponse({
         "ok": True, "pending_total": ms_qs.count() + ca_qs.count(),
         "pending_maint": ms_qs.count(), "pending_control": ca_qs.count(),
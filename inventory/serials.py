@@ -0,0 +1,97 @@
+# inventory/serials.py
+"""
+Серийн дугаарын нормчлол, хайлт, давхардлын тайлан.
+
+- normalize_serial(): NFKC + том үсэг + үсэг/тооноос бусад тэмдэгтийг хасна
+  ("A123 456", "a123-456" -> "A123456"). Device.save() serial_normalized-д хадгална.
+- find_devices_by_serial(): QR/гар хайлтын exact-match (serial_normalized индекс) —
+  icontains шиг хүснэгтийг бүтнээр нь уншихгүй.
+- find_serial_duplicates(): бүх паркаар (нормчилсон түлхүүр, үйлдвэрлэгч)-ээр нэг
+  GROUP BY, дараа нь зөвхөн давхардсан түлхүүрүүдийн багажийг индексээр уншина.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from django.db.models import Count, QuerySet, Value
+from django.db.models.functions import Coalesce, Trim, Upper
+
+from .models import Device
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def normalize_serial(value: Optional[str]) -> str:
+    """Харьцуулах түлхүүр: том үсэг, зай/зураас/цэг г.м. тэмдэгтгүй."""
+    if not value:
+        return ""
+    return _NON_ALNUM.sub("", unicodedata.normalize("NFKC", value)).upper()
+
+
+def find_devices_by_serial(raw: Optional[str], devices: Optional[QuerySet] = None) -> QuerySet:
+    """raw серийн дугаартай (нормчилсон утгаар яг таарсан) багажууд."""
+    qs = Device.objects.all() if devices is None else devices
+    key = normalize_serial(raw)
+    return qs.filter(serial_normalized=key) if key else qs.none()
+
+
+# ------------------------------------------------------------
+# Давхардлын тайлан
+# ------------------------------------------------------------
+@dataclass
+class SerialDuplicateGroup:
+    key: str
+    manufacturer: str
+    # [(device_id, serial_number, status, location_name)]
+    devices: List[Tuple[int, str, str, str]] = field(default_factory=list)
+
+
+@dataclass
+class SerialDuplicateResult:
+    scanned: int = 0
+    groups: List[SerialDuplicateGroup] = field(default_factory=list)
+
+    @property
+    def duplicate_devices(self) -> int:
+        return sum(len(g.devices) for g in self.groups)
+
+
+def _manufacturer_key():
+    return Upper(Trim(Coalesce("manufacturer", Value(""))))
+
+
+def find_serial_duplicates(devices: Optional[QuerySet] = None, *, chunk_size: int = 2000) -> SerialDuplicateResult:
+    """Нормчилсон серийн дугаар + үйлдвэрлэгч (том үсэг, trim) давхцсан бүлгүүд."""
+    qs = (Device.objects.all() if devices is None else devices).exclude(serial_normalized="")
+    result = SerialDuplicateResult(scanned=qs.count())
+
+    dupes = (
+        qs.order_by()
+        .annotate(mfr=_manufacturer_key())
+        .values("serial_normalized", "mfr")
+        .annotate(n=Count("pk"))
+        .filter(n__gt=1)
+        .values_list("serial_normalized", "mfr")
+    )
+    keys = sorted(dupes)
+    groups: Dict[Tuple[str, str], SerialDuplicateGroup] = {
+        k: SerialDuplicateGroup(key=k[0], manufacturer=k[1]) for k in keys
+    }
+    serials = sorted({k for k, _m in keys})
+    for start in range(0, len(serials), chunk_size):
+        rows = (
+            qs.filter(serial_normalized__in=serials[start:start + chunk_size])
+            .annotate(mfr=_manufacturer_key())
+            .order_by("serial_normalized", "id")
+            .values_list("id", "serial_number", "status", "location__name", "serial_normalized", "mfr")
+        )
+        for dev_id, serial, status, loc_name, key, mfr in rows:
+            group = groups.get((key, mfr))
+            if group is not None:
+                group.devices.append((dev_id, serial, status, loc_name or ""))
+
+    result.groups = list(groups.values())
+    return result
@@ -1,9 +1,13 @@
 # inventory/signals.py
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
-from .models import UserProfile
+from .models import UserProfile, Location, Device, InstrumentCatalog, MaintenanceService, ControlAdjustment
+from .map_data import bump_map_cache_version
+from .station_tiles import invalidate_station_tiles
+from .verification import recompute_next_verification
 
 User = get_user_model()
 
@@ -12,3 +16,114 @@ User = get_user_model()
 def ensure_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance, must_change_password=True)
+
+
+# ------------------------------------------------------------
+# Газрын зургийн кэш (cluster / bbox / tiles) хүчингүй болгох
+# (bump_map_cache_version нь commit-ийн дараа ажиллана)
+# ------------------------------------------------------------
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Device)
+@receiver(post_delete, sender=Device)
+@receiver(post_save, sender=MaintenanceService)
+@receiver(post_delete, sender=MaintenanceService)
+@receiver(post_save, sender=ControlAdjustment)
+@receiver(post_delete, sender=ControlAdjustment)
+def invalidate_map_cache(sender, **kwargs):
+    bump_map_cache_version(clear_tiles=False)
+
+
+# ------------------------------------------------------------
+# Station MVT tile: зөвхөн өөрчлөгдсөн цэгийн tile-уудыг commit-ийн дараа устгана
+# (өмнө нь устгавал зэрэг хүсэлт commit-гүй өгөгдлөөр дахин бичиж болно).
+# Хуучин утгыг model-ийн from_db snapshot-оос (Location._loaded_geo, Device._loaded_values)
+# уншина — save() тэдгээрийг post_save-ийн дараа л шинэчилнэ.
+# ------------------------------------------------------------
+def _location_lonlats(location_ids):
+    # lazy queryset: tile кэш хоосон бол query ажиллахгүй
+    ids = {i for i in location_ids if i}
+    return Location.objects.filter(id__in=ids).values_list("longitude", "latitude") if ids else []
+
+
+@receiver(post_delete, sender=Location)
+def clear_device_admin_units(sender, instance, **kwargs):
+    # Device.location SET_NULL болсон багажуудын denormalized aimag/sum
+    Device.objects.filter(location__isnull=True).exclude(aimag_ref=None, sum_ref=None).update(aimag_ref=None, sum_ref=None)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_tiles(sender, instance, **kwargs):
+    # Нэр/төрөл ч tile-д орно тул одоогийн цэгийг үргэлж; координат солигдсон бол хуучныг нь ч
+    points = [(instance.longitude, instance.latitude)]
+    loaded = dict(zip(Location.GEO_TRACKED_FIELDS, getattr(instance, "_loaded_geo", None) or ()))
+    if loaded and (loaded["longitude"], loaded["latitude"]) != points[0]:
+        points.append((loaded["longitude"], loaded["latitude"]))
+    transaction.on_commit(lambda: invalidate_station_tiles(points))
+
+
+@receiver(post_save, sender=Device)
+def invalidate_device_tiles(sender, instance, created, update_fields=None, **kwargs):
+    # Tile-д багажийн тоо (location) ба төлөв л орно: бусад засварт Location SELECT хийхгүй
+    if created:
+        location_ids = [instance.location_id]
+    else:
+        loaded = getattr(instance, "_loaded_values", None) or {}
+        names = None if update_fields is None else set(update_fields)
+        old_location_id = loaded.get("location_id", instance.location_id)
+        moved = old_location_id != instance.location_id and (names is None or bool({"location", "location_id"} & names))
+        status_changed = loaded.get("status", instance.status) != instance.status and (names is None or "status" in names)
+        if not (moved or status_changed):
+            return
+        location_ids = [old_location_id, instance.location_id] if moved else [instance.location_id]
+    if any(location_ids):
+        transaction.on_commit(lambda: invalidate_station_tiles(_location_lonlats(location_ids)))
+
+
+@receiver(post_delete, sender=Device)
+def evict_deleted_device_qr(sender, instance, **kwargs):
+    # Устсан багажийн token-оор зурагдсан QR зургийн кэш (LRU + диск)
+    from .qr_images import evict_qr_images
+
+    tokens = [instance.qr_token]
+    transaction.on_commit(lambda: evict_qr_images(tokens))
+
+
+@receiver(post_delete, sender=Device)
+def invalidate_deleted_device_tiles(sender, instance, **kwargs):
+    location_ids = [instance.location_id]
+    if instance.location_id:
+        transaction.on_commit(lambda: invalidate_station_tiles(_location_lonlats(location_ids)))
+
+
+@receiver(post_save, sender=MaintenanceService)
+@receiver(post_delete, sender=MaintenanceService)
+@receiver(post_save, sender=ControlAdjustment)
+@receiver(post_delete, sender=ControlAdjustment)
+def invalidate_workflow_tiles(sender, instance, **kwargs):
+    # pending_total өөрчлөгдөнө -> багажийн байршлын tile
+    device_id = instance.device_id
+    transaction.on_commit(
+        lambda: invalidate_station_tiles(
+            Location.objects.filter(devices__id=device_id).values_list("longitude", "latitude")
+        )
+    )
+
+
+# ------------------------------------------------------------
+# Каталогийн шалгалтын цикл өөрчлөгдвөл бүх багажийн next_verification_date
+# ------------------------------------------------------------
+@receiver(post_init, sender=InstrumentCatalog)
+def _snapshot_catalog_cycle(sender, instance, **kwargs):
+    instance._loaded_cycle_months = instance.__dict__.get("verification_cycle_months")
+
+
+@receiver(post_save, sender=InstrumentCatalog)
+def recompute_catalog_verification(sender, instance, created, **kwargs):
+    old = getattr(instance, "_loaded_cycle_months", None)
+    instance._loaded_cycle_months = instance.verification_cycle_months
+    if created or old == instance.verification_cycle_months:
+        return
+    # Нэг transaction дотор (admin-ийн atomic) — admin save_model тайланг мессежээр харуулна
+    instance._verification_recompute = recompute_next_verification([instance.pk])
@@ -0,0 +1,209 @@
+# inventory/station_tiles.py
+"""
+Станцын давхаргын vector tile (MVT): /tiles/stations/{z}/{x}/{y}.mvt
+
+Tile бүрийг scope + шүүлтүүр тус бүрт STATION_TILE_CACHE_DIR/g<generation>/<scope>/z/x/y.mvt
+болгон диск дээр кэшлэнэ. Кэш нь serve хийгддэг хавтаст (MEDIA_ROOT/STATIC_ROOT) байж
+болохгүй — scope-той tile-ууд staff_member_required-ийг тойрч уншигдана.
+
+- Location/Device өөрчлөгдөхөд (signals.py, commit-ийн дараа) зөвхөн тухайн цэгийг
+  агуулсан tile-уудыг бүх scope-оос устгана.
+- Бөөн засварын командууд (bump_map_cache_version) generation-ийг нэмэгдүүлж хуучин
+  хавтсыг устгана.
+- Commit-ээс өмнөх өгөгдлөөр зэрэг бүтээгдсэн tile үлдэж болох тул TILE_CACHE_TTL-ээс
+  хуучин файлыг дахин бүтээнэ (stale байх хугацаа хязгаартай).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest
+
+from .geo.clustering import STATUS_KEYS
+from .geo.mvt import DEFAULT_EXTENT, encode_point_layer, encode_tile
+from .geo.tiles import lonlat_to_unit
+from .map_data import MAP_FILTER_PARAMS, StationPoints, map_scope, station_points_for_request
+
+logger = logging.getLogger(__name__)
+
+STATION_LAYER = "stations"
+TILE_MAX_ZOOM = 22
+# Үүнээс дээш zoom-ын tile-ийг диск дээр хадгалахгүй (маш олон, жижиг)
+TILE_CACHE_MAX_ZOOM = 18
+# Tile-ийн ирмэг дээрх цэг хөрш tile-д ч харагдах буфер (extent нэгжээр)
+TILE_BUFFER = 64
+# Диск дээрх tile-ийн дээд нас (секунд); үүнээс хуучин бол дахин бүтээнэ
+TILE_CACHE_TTL = 15 * 60
+TILE_GENERATION_KEY = "inventory:map:tiles:generation"
+
+
+def _is_within(path: Path, parent) -> bool:
+    try:
+        path.relative_to(Path(parent).resolve())
+        return True
+    except ValueError:
+        return False
+
+
+def tile_cache_root() -> Path:
+    """STATION_TILE_CACHE_DIR (default BASE_DIR/var/tile_cache)/stations; serve хийгддэг хавтас бол алдаа."""
+    base = getattr(settings, "STATION_TILE_CACHE_DIR", None) or Path(settings.BASE_DIR) / "var" / "tile_cache"
+    root = (Path(base) / STATION_LAYER).resolve()
+    for served in (getattr(settings, "MEDIA_ROOT", None), getattr(settings, "STATIC_ROOT", None)):
+        if served and _is_within(root, served):
+            raise ImproperlyConfigured(f"STATION_TILE_CACHE_DIR must not be inside a served directory ({served}).")
+    return root
+
+
+def tile_generation() -> int:
+    g = cache.get(TILE_GENERATION_KEY)
+    if g is None:
+        g = 1
+        cache.add(TILE_GENERATION_KEY, g, None)
+    return int(g)
+
+
+def generation_dir(generation: Optional[int] = None) -> Path:
+    return tile_cache_root() / f"g{tile_generation() if generation is None else generation}"
+
+
+def scope_cache_dir(request: HttpRequest) -> Path:
+    """Scope + GET шүүлтүүр -> кэшийн хавтас (жишээ: g3/all-3f9a0c1b2d)."""
+    scope = map_scope(request)
+    scope_part = "all" if scope["all"] else f"a{scope['aimag_id']}s{scope['sum_id'] or ''}"
+    flt = "&".join(f"{k}={(request.GET.get(k) or '').strip()}" for k in MAP_FILTER_PARAMS)
+    return generation_dir() / f"{scope_part}-{hashlib.sha1(flt.encode('utf-8')).hexdigest()[:10]}"
+
+
+def build_station_tile(pts: StationPoints, z: int, x: int, y: int, extent: int = DEFAULT_EXTENT) -> bytes:
+    """StationPoints -> нэг tile-ийн MVT bytes (хоосон бол b"")."""
+    if len(pts) == 0:
+        return b""
+    n = float(2 ** z)
+    ux, uy = lonlat_to_unit(pts.lons, pts.lats)
+    px = np.floor((ux * n - x) * extent).astype(np.int64)
+    py = np.floor((uy * n - y) * extent).astype(np.int64)
+    sel = np.flatnonzero(
+        (px >= -TILE_BUFFER) & (px < extent + TILE_BUFFER) & (py >= -TILE_BUFFER) & (py < extent + TILE_BUFFER)
+    )
+    if sel.size == 0:
+        return b""
+
+    props = [
+        {
+            "id": int(pts.ids[i]),
+            "name": pts.names[i],
+            "type": pts.location_type[i],
+            "status": STATUS_KEYS[int(pts.status[i])],
+            "device_count": int(pts.device_count[i]),
+            "pending_total": int(pts.pending_total[i]),
+        }
+        for i in sel.tolist()
+    ]
+    layer = encode_point_layer(
+        STATION_LAYER,
+        list(zip(px[sel].tolist(), py[sel].tolist())),
+        props,
+        ids=pts.ids[sel].tolist(),
+        extent=extent,
+    )
+    return encode_tile([layer])
+
+
+def _write_atomic(fp: Path, data: bytes) -> None:
+    try:
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=fp.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, fp)
+    except OSError as e:
+        logger.warning("Could not write tile cache %s: %s", fp, e)
+
+
+def station_tile_for_request(request: HttpRequest, z: int, x: int, y: int) -> bytes:
+    """Диск кэшээс эсвэл шинээр бүтээж tile bytes буцаана."""
+    fp: Optional[Path] = None
+    if z <= TILE_CACHE_MAX_ZOOM:
+        fp = scope_cache_dir(request) / str(z) / str(x) / f"{y}.mvt"
+        try:
+            if time.time() - fp.stat().st_mtime < TILE_CACHE_TTL:
+                return fp.read_bytes()
+        except OSError:
+            pass
+
+    data = build_station_tile(station_points_for_request(request), z, x, y)
+    if fp is not None:
+        _write_atomic(fp, data)
+    return data
+
+
+# ============================================================
+# Invalidation
+# ============================================================
+def tiles_for_point(lon: float, lat: float, max_zoom: int = TILE_CACHE_MAX_ZOOM) -> Set[Tuple[int, int, int]]:
+    """Цэгийг (буфертэйгээр) агуулах бүх (z, x, y) tile."""
+    ux, uy = lonlat_to_unit([lon], [lat])
+    ux, uy = float(ux[0]), float(uy[0])
+    out: Set[Tuple[int, int, int]] = set()
+    for z in range(max_zoom + 1):
+        n = 2 ** z
+        pad = TILE_BUFFER / (DEFAULT_EXTENT * float(n))
+        for tx in {int((ux - pad) * n), int((ux + pad) * n)}:
+            for ty in {int((uy - pad) * n), int((uy + pad) * n)}:
+                if 0 <= tx < n and 0 <= ty < n:
+                    out.add((z, tx, ty))
+    return out
+
+
+def invalidate_station_tiles(lonlats: Iterable[Tuple[Optional[float], Optional[float]]]) -> int:
+    """Өгсөн цэгүүдийг агуулах tile-уудыг одоогийн generation-ийн бүх scope-оос устгана."""
+    root = generation_dir()
+    if not root.is_dir():
+        return 0
+    tiles: Set[Tuple[int, int, int]] = set()
+    for lon, lat in lonlats:
+        if lon is None or lat is None:
+            continue
+        tiles |= tiles_for_point(float(lon), float(lat))
+    if not tiles:
+        return 0
+
+    removed = 0
+    for scope_dir in root.iterdir():
+        for z, x, y in tiles:
+            try:
+                (scope_dir / str(z) / str(x) / f"{y}.mvt").unlink()
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def clear_station_tiles() -> None:
+    """
+    Бүх tile-ийг хүчингүй болгоно (бөөн засварын дараа): generation-ийг нэмэгдүүлж
+    (шинэ хүсэлтүүд шинэ хавтас руу), хуучин generation-уудын хавтсыг устгана.
+    """
+    try:
+        current = cache.incr(TILE_GENERATION_KEY)
+    except ValueError:
+        current = tile_generation() + 1
+        cache.set(TILE_GENERATION_KEY, current, None)
+    root = tile_cache_root()
+    if not root.is_dir():
+        return
+    for d in root.iterdir():
+        if d.name != f"g{current}":
+            shutil.rmtree(d, ignore_errors=True)
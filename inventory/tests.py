@@ -1,3 +1,678 @@
-from django.test import TestCase
+import struct
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from shapely.geometry import Point, box
+
+from .device_moves import bulk_relocate, bulk_set_status
+from .device_status import status_at, status_timeline
+from .geo import geohash
+from .geo.location_sync import _PendingBatch
+from .geo.mvt import DEFAULT_EXTENT, encode_point_layer, encode_tile
+from .geo.polygon_index import PolygonIndex
+from .models import Aimag, Device, DeviceMovement, DevicePlacementInterval, DeviceStatusChange, Location, SumDuureg
+from .placements import PLACEMENT_UNKNOWN_START, _replay, location_at, rebuild_placements
+from .serials import find_devices_by_serial, find_serial_duplicates, normalize_serial
+from .verification import add_months, verification_buckets
+
+try:
+    from dateutil.relativedelta import relativedelta
+except ImportError:  # pragma: no cover
+    relativedelta = None
+
+
+def _d64(values):
+    return np.array([v if v is not None else np.datetime64("NaT") for v in values], dtype="datetime64[D]")
+
+
+# ============================================================
+# verification: add_months / verification_buckets
+# ============================================================
+class AddMonthsTests(SimpleTestCase):
+    def test_month_end_clamping(self):
+        cases = [
+            (date(2023, 1, 31), 1, date(2023, 2, 28)),
+            (date(2024, 1, 31), 1, date(2024, 2, 29)),  # өндөр жил
+            (date(2024, 3, 31), 1, date(2024, 4, 30)),
+            (date(2024, 2, 29), 12, date(2025, 2, 28)),
+            (date(2024, 2, 29), 48, date(2028, 2, 29)),
+            (date(2100, 1, 31), 1, date(2100, 2, 28)),  # 100-д хуваагдах, өндөр биш
+            (date(2000, 1, 31), 1, date(2000, 2, 29)),  # 400-д хуваагдах, өндөр
+            (date(2023, 12, 31), 2, date(2024, 2, 29)),  # жил дамжих
+            (date(2024, 5, 15), 0, date(2024, 5, 15)),
+        ]
+        dates = _d64([c[0] for c in cases])
+        months = np.array([c[1] for c in cases])
+        got = add_months(dates, months).astype(object).tolist()
+        self.assertEqual(got, [c[2] for c in cases])
+
+    def test_matches_relativedelta(self):
+        if relativedelta is None:
+            self.skipTest("python-dateutil суугаагүй")
+        start = date(2023, 1, 1)
+        days = [start + timedelta(days=i) for i in range(0, 3 * 366)]
+        rng = np.random.default_rng(42)
+        months = rng.integers(0, 61, size=len(days))
+        got = add_months(_d64(days), months).astype(object).tolist()
+        expected = [d + relativedelta(months=int(m)) for d, m in zip(days, months)]
+        self.assertEqual(got, expected)
+
+
+class VerificationBucketsTests(SimpleTestCase):
+    def test_matches_device_verification_bucket(self):
+        today = date(2024, 2, 29)
+        values = [None] + [today + timedelta(days=n) for n in (-400, -1, 0, 1, 30, 31, 90, 91, 365)]
+        got = verification_buckets(_d64(values), today).tolist()
+        expected = [Device(next_verification_date=v).verification_bucket(today) for v in values]
+        self.assertEqual(got, expected)
+        self.assertEqual(got[:4], ["unknown", "expired", "expired", "due_30"])
+
+
+# ============================================================
+# geo.mvt: гар аргаар кодолсон Point давхарга
+# ============================================================
+def _read_varint(buf, pos):
+    shift = result = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_fields(buf):
+    """protobuf message -> [(field, value)] (varint -> int, 64bit -> bytes, len -> bytes)."""
+    out, pos = [], 0
+    while pos < len(buf):
+        key, pos = _read_varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = _read_varint(buf, pos)
+        elif wire == 1:
+            value, pos = buf[pos:pos + 8], pos + 8
+        elif wire == 2:
+            n, pos = _read_varint(buf, pos)
+            value, pos = buf[pos:pos + n], pos + n
+        else:
+            raise AssertionError(f"unexpected wire type {wire}")
+        out.append((field, value))
+    return out
+
+
+def _read_packed(buf):
+    out, pos = [], 0
+    while pos < len(buf):
+        v, pos = _read_varint(buf, pos)
+        out.append(v)
+    return out
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def _decode_value(buf):
+    (field, raw), = _read_fields(buf)
+    if field == 1:
+        return raw.decode("utf-8")
+    if field == 3:
+        return struct.unpack("<d", raw)[0]
+    if field == 6:
+        return _unzigzag(raw)
+    if field == 7:
+        return bool(raw)
+    raise AssertionError(f"unexpected value field {field}")
+
+
+def _decode_layer(buf):
+    layer = {"features": [], "keys": [], "values": []}
+    for field, value in _read_fields(buf):
+        if field == 15:
+            layer["version"] = value
+        elif field == 1:
+            layer["name"] = value.decode("utf-8")
+        elif field == 5:
+            layer["extent"] = value
+        elif field == 3:
+            layer["keys"].append(value.decode("utf-8"))
+        elif field == 4:
+            layer["values"].append(_decode_value(value))
+        elif field == 2:
+            feat = {"tags": []}
+            for f, v in _read_fields(value):
+                if f == 1:
+                    feat["id"] = v
+                elif f == 2:
+                    feat["tags"] = _read_packed(v)
+                elif f == 3:
+                    feat["type"] = v
+                elif f == 4:
+                    cmd, x, y = _read_packed(v)
+                    feat["cmd"], feat["point"] = cmd, (_unzigzag(x), _unzigzag(y))
+            layer["features"].append(feat)
+    # features нь keys/values-ээс өмнө бичигддэг тул props-ийг эцэст нь тайлна
+    for feat in layer["features"]:
+        t = feat["tags"]
+        feat["props"] = {layer["keys"][k]: layer["values"][v] for k, v in zip(t[::2], t[1::2])}
+    return layer
+
+
+class MvtEncoderTests(SimpleTestCase):
+    def test_point_layer_roundtrip(self):
+        buf = encode_point_layer(
+            "devices",
+            [(10, 20), (-5, DEFAULT_EXTENT + 4)],
+            [
+                {"status": "Ажиллаж байгаа", "n": 3, "ok": True},
+                {"status": "Ажиллаж байгаа", "x": None, "f": 1.5, "neg": -7},
+            ],
+            ids=[7, 300],
+        )
+        layer = _decode_layer(buf)
+        self.assertEqual(layer["version"], 2)
+        self.assertEqual(layer["name"], "devices")
+        self.assertEqual(layer["extent"], DEFAULT_EXTENT)
+        self.assertEqual(layer["keys"], ["status", "n", "ok", "f", "neg"])
+        # ижил утга нэг л удаа хадгалагдана
+        self.assertEqual(layer["values"].count("Ажиллаж байгаа"), 1)
+
+        f1, f2 = layer["features"]
+        self.assertEqual((f1["id"], f2["id"]), (7, 300))
+        self.assertEqual((f1["type"], f1["cmd"]), (1, 9))  # POINT, MoveTo x1
+        self.assertEqual(f1["point"], (10, 20))
+        self.assertEqual(f2["point"], (-5, DEFAULT_EXTENT + 4))
+        self.assertEqual(f1["props"], {"status": "Ажиллаж байгаа", "n": 3, "ok": True})
+        self.assertEqual(f2["props"], {"status": "Ажиллаж байгаа", "f": 1.5, "neg": -7})
+
+    def test_value_dedupe_keeps_types_apart(self):
+        layer = _decode_layer(encode_point_layer("l", [(0, 0)], [{"a": 1, "b": True, "c": 1.0}]))
+        self.assertEqual(len(layer["values"]), 3)
+        props = layer["features"][0]["props"]
+        self.assertIs(props["b"], True)
+        self.assertIsInstance(props["a"], int)
+        self.assertIsInstance(props["c"], float)
+
+    def test_no_ids_no_tags(self):
+        layer = _decode_layer(encode_point_layer("l", [(1, 2)], [{"x": None}]))
+        (feat,) = layer["features"]
+        self.assertNotIn("id", feat)
+        self.assertEqual(feat["tags"], [])
+
+    def test_encode_tile_wraps_layers(self):
+        a = encode_point_layer("a", [(1, 1)], [{}])
+        b = encode_point_layer("b", [(2, 2)], [{}], extent=512)
+        fields = _read_fields(encode_tile([a, b]))
+        self.assertEqual(fields, [(3, a), (3, b)])
+        self.assertEqual(_decode_layer(fields[1][1])["extent"], 512)
+        self.assertEqual(encode_tile([]), b"")
+
+
+# ============================================================
+# geo.geohash
+# ============================================================
+def _geohash_bbox(code):
+    """Лавлах (скаляр) decode: geohash -> (min_lon, min_lat, max_lon, max_lat)."""
+    lon, lat = [-180.0, 180.0], [-90.0, 90.0]
+    even = True
+    for ch in code:
+        bits = geohash.BASE32.index(ch)
+        for shift in range(4, -1, -1):
+            rng = lon if even else lat
+            mid = (rng[0] + rng[1]) / 2
+            if bits >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lon[0], lat[0], lon[1], lat[1]
+
+
+class GeohashTests(SimpleTestCase):
+    def test_known_vectors(self):
+        self.assertEqual(geohash.encode(-5.6, 42.6, 5), "ezs42")
+        self.assertEqual(geohash.encode(10.40744, 57.64911, 11), "u4pruydqqvj")
+        self.assertEqual(geohash.encode(106.9177, 47.9184, 1), "y")
+
+    def test_point_inside_decoded_cell(self):
+        rng = np.random.default_rng(7)
+        lons = rng.uniform(87.0, 120.0, 500)
+        lats = rng.uniform(41.0, 52.5, 500)
+        for precision in (1, 5, geohash.GEOHASH_PRECISION):
+            codes = geohash.encode_many(lons, lats, precision)
+            for lon, lat, code in zip(lons, lats, codes):
+                self.assertEqual(len(code), precision)
+                x0, y0, x1, y1 = _geohash_bbox(code)
+                self.assertTrue(x0 <= lon < x1 and y0 <= lat < y1, (lon, lat, code))
+
+    def test_encode_many_edges(self):
+        self.assertEqual(geohash.encode_many([float("nan"), 106.9], [47.9, float("inf")]), ["", ""])
+        # ±180 / ±90 хил дээр индекс хэтрэхгүй
+        self.assertEqual(geohash.encode(180.0, 90.0, 3), "zzz")
+        self.assertEqual(geohash.encode(-180.0, -90.0, 3), "000")
+
+    def test_cover_bbox_contains_every_point(self):
+        bbox = (106.70, 47.80, 107.10, 48.00)
+        prefixes = geohash.cover_bbox(*bbox)
+        self.assertLessEqual(len(prefixes), geohash.MAX_COVER_CELLS)
+        self.assertEqual(len({len(p) for p in prefixes}), 1)
+        rng = np.random.default_rng(3)
+        lons = rng.uniform(bbox[0], bbox[2], 1000)
+        lats = rng.uniform(bbox[1], bbox[3], 1000)
+        ranges = geohash.merge_prefixes(prefixes)
+        for code in geohash.encode_many(lons, lats):
+            self.assertTrue(any(code.startswith(p) for p in prefixes), code)
+            self.assertTrue(any(lo <= code < hi for lo, hi in ranges), code)
+
+    def test_cover_bbox_max_cells(self):
+        prefixes = geohash.cover_bbox(87.0, 41.0, 120.0, 52.5, max_cells=4)
+        self.assertLessEqual(len(prefixes), 4)
+        self.assertEqual(geohash.cover_bbox(-200, -100, 200, 100, max_cells=32), sorted(geohash.BASE32))
+
+    def test_merge_prefixes(self):
+        self.assertEqual(geohash.merge_prefixes([]), [])
+        self.assertEqual(geohash.merge_prefixes(["wx4g", "wx4"]), [("wx4", "wx4{")])
+        self.assertEqual(
+            geohash.merge_prefixes(["wx5", "wx4", "wx4b"]),
+            [("wx4", "wx4{"), ("wx5", "wx5{")],
+        )
+        # prefix-ийн range нь бүх урт geohash-ийг багтаана
+        lo, hi = geohash.merge_prefixes(["wx4"])[0]
+        self.assertTrue(lo <= "wx4zzzzzz" < hi)
+        self.assertFalse(lo <= "wx5" < hi)
+
+
+# ============================================================
+# Device.save: шилжилт / төлвийн түүх, байрлалын интервал
+# ============================================================
+def _location(name, aimag, sum_ref=None):
+    return Location.objects.create(name=name, aimag_ref=aimag, sum_ref=sum_ref)
+
+
+class DeviceSaveHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.aimag_a = Aimag.objects.create(name="Архангай")
+        cls.aimag_b = Aimag.objects.create(name="Баянхонгор")
+        cls.sum_b = SumDuureg.objects.create(name="Бөмбөгөр", aimag=cls.aimag_b)
+        cls.loc_a = _location("A", cls.aimag_a)
+        cls.loc_b = _location("B", cls.aimag_b, cls.sum_b)
+
+    def test_create_records_initial_rows(self):
+        dev = Device.objects.create(serial_number="S-1", location=self.loc_a)
+        self.assertEqual(
+            list(DeviceMovement.objects.filter(device=dev).values_list("from_location_id", "to_location_id")),
+            [(None, self.loc_a.pk)],
+        )
+        self.assertEqual(
+            list(DeviceStatusChange.objects.filter(device=dev).values_list("from_status", "to_status")),
+            [("", "Active")],
+        )
+        (interval,) = DevicePlacementInterval.objects.filter(device=dev)
+        self.assertEqual((interval.location_id, interval.valid_to), (self.loc_a.pk, None))
+        self.assertEqual((dev.aimag_ref_id, dev.sum_ref_id), (self.aimag_a.pk, None))
+
+    def test_move_closes_interval_and_copies_admin_units(self):
+        dev = Device.objects.create(serial_number="S-2", location=self.loc_a)
+        dev = Device.objects.get(pk=dev.pk)
+        dev.location = self.loc_b
+        dev.set_movement_info("засвар")
+        dev.save()
+
+        last = DeviceMovement.objects.filter(device=dev).first()
+        self.assertEqual((last.from_location_id, last.to_location_id, last.reason), (self.loc_a.pk, self.loc_b.pk, "засвар"))
+        intervals = list(
+            DevicePlacementInterval.objects.filter(device=dev).order_by("valid_from", "id").values_list("location_id", "valid_to")
+        )
+        self.assertEqual([loc for loc, _ in intervals], [self.loc_a.pk, self.loc_b.pk])
+        self.assertIsNotNone(intervals[0][1])
+        self.assertIsNone(intervals[1][1])
+        dev.refresh_from_db()
+        self.assertEqual((dev.aimag_ref_id, dev.sum_ref_id), (self.aimag_b.pk, self.sum_b.pk))
+
+    def test_status_change_and_update_fields(self):
+        dev = Device.objects.create(serial_number="S-3", location=self.loc_a)
+        dev.status = "Broken"
+        dev.location = self.loc_b
+        # location update_fields-д ороогүй тул шилжилт бичигдэхгүй
+        dev.save(update_fields=["status"])
+        self.assertEqual(DeviceMovement.objects.filter(device=dev).count(), 1)
+        self.assertEqual(
+            list(DeviceStatusChange.objects.filter(device=dev).order_by("id").values_list("from_status", "to_status")),
+            [("", "Active"), ("Active", "Broken")],
+        )
+        dev.refresh_from_db()
+        self.assertEqual(dev.location_id, self.loc_a.pk)
+
+    def test_unrelated_save_writes_no_history_and_no_extra_select(self):
+        dev = Device.objects.create(serial_number="S-4", location=self.loc_a)
+        dev = Device.objects.get(pk=dev.pk)
+        dev.other_name = "Шинэ нэр"
+        with CaptureQueriesContext(connection) as ctx:
+            dev.save()
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT") and 'FROM "inventory_device"' in q["sql"]]
+        self.assertEqual(selects, [])
+        self.assertEqual(DeviceMovement.objects.filter(device=dev).count(), 1)
+        self.assertEqual(DeviceStatusChange.objects.filter(device=dev).count(), 1)
+        self.assertEqual(DevicePlacementInterval.objects.filter(device=dev).count(), 1)
+
+
+# ============================================================
+# device_moves.bulk_relocate
+# ============================================================
+class BulkRelocateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.aimag_a = Aimag.objects.create(name="Архангай")
+        cls.aimag_b = Aimag.objects.create(name="Баянхонгор")
+        cls.sum_b = SumDuureg.objects.create(name="Бөмбөгөр", aimag=cls.aimag_b)
+        cls.loc_a = _location("A", cls.aimag_a)
+        cls.loc_b = _location("B", cls.aimag_b, cls.sum_b)
+
+    def test_moves_rows_and_writes_history(self):
+        d1 = Device.objects.create(serial_number="R-1", location=self.loc_a)
+        d2 = Device.objects.create(serial_number="R-2")
+        d3 = Device.objects.create(serial_number="R-3", location=self.loc_b)  # аль хэдийн тэнд
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            moved = bulk_relocate(Device.objects.all(), self.loc_b, reason="  шилжүүлэг  ")
+        self.assertEqual(moved, 2)
+        self.assertEqual(len(callbacks), 1)
+
+        rows = dict(Device.objects.values_list("pk", "location_id"))
+        self.assertEqual(rows, {d1.pk: self.loc_b.pk, d2.pk: self.loc_b.pk, d3.pk: self.loc_b.pk})
+        self.assertEqual(
+            sorted(Device.objects.values_list("aimag_ref_id", "sum_ref_id").distinct()),
+            [(self.aimag_b.pk, self.sum_b.pk)],
+        )
+        movements = DeviceMovement.objects.filter(reason="шилжүүлэг").order_by("device_id")
+        self.assertEqual(
+            list(movements.values_list("device_id", "from_location_id", "to_location_id")),
+            [(d1.pk, self.loc_a.pk, self.loc_b.pk), (d2.pk, None, self.loc_b.pk)],
+        )
+        self.assertEqual(DeviceMovement.objects.filter(device=d3).count(), 1)
+        open_rows = DevicePlacementInterval.objects.filter(valid_to__isnull=True)
+        self.assertEqual(sorted(open_rows.values_list("device_id", "location_id")), [(d.pk, self.loc_b.pk) for d in (d1, d2, d3)])
+        self.assertEqual(DevicePlacementInterval.objects.filter(device=d1, valid_to__isnull=False).count(), 1)
+
+    def test_unassign_and_noop(self):
+        dev = Device.objects.create(serial_number="R-4", location=self.loc_a)
+        self.assertEqual(bulk_relocate([dev.pk], None), 1)
+        dev.refresh_from_db()
+        self.assertEqual((dev.location_id, dev.aimag_ref_id, dev.sum_ref_id), (None, None, None))
+        self.assertFalse(DevicePlacementInterval.objects.filter(device=dev, valid_to__isnull=True).exists())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(bulk_relocate([dev], None), 0)
+        self.assertEqual(callbacks, [])
+
+
+# ============================================================
+# Төлвийн түүх: bulk_set_status / status_timeline
+# ============================================================
+def _at(y, m, d, hour=12):
+    return timezone.make_aware(datetime(y, m, d, hour))
+
+
+class BulkSetStatusTests(TestCase):
+    def test_changes_rows_and_writes_history(self):
+        aimag = Aimag.objects.create(name="Архангай")
+        loc = _location("A", aimag)
+        d1 = Device.objects.create(serial_number="T-1", location=loc)
+        d2 = Device.objects.create(serial_number="T-2", status="Repair")
+        d3 = Device.objects.create(serial_number="T-3", status="Broken")  # аль хэдийн Broken
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            changed = bulk_set_status([d1, d2.pk, d3], "Broken", reason="шалгалт")
+        self.assertEqual(changed, 2)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(set(Device.objects.values_list("status", flat=True)), {"Broken"})
+        self.assertEqual(
+            sorted(DeviceStatusChange.objects.filter(reason="шалгалт").values_list("device_id", "from_status", "to_status")),
+            [(d1.pk, "Active", "Broken"), (d2.pk, "Repair", "Broken")],
+        )
+        # bulk_set_status байршил, aimag/sum-д хүрэхгүй
+        d1.refresh_from_db()
+        self.assertEqual((d1.location_id, d1.aimag_ref_id), (loc.pk, aimag.pk))
+        self.assertEqual(bulk_set_status(Device.objects.all(), "Broken"), 0)
+
+    def test_unknown_status(self):
+        with self.assertRaises(ValueError):
+            bulk_set_status([], "Lost")
+
+
+class StatusTimelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.d1 = Device.objects.create(serial_number="TL-1")
+        cls.d2 = Device.objects.create(serial_number="TL-2")
+        cls.other = Device.objects.create(serial_number="TL-3")
+        DeviceStatusChange.objects.all().delete()
+        DeviceStatusChange.objects.bulk_create([
+            DeviceStatusChange(device=cls.d1, from_status="", to_status="Active", changed_at=_at(2024, 1, 1)),
+            DeviceStatusChange(device=cls.d1, from_status="Active", to_status="Broken", changed_at=_at(2024, 1, 3)),
+            DeviceStatusChange(device=cls.d2, from_status="", to_status="Active", changed_at=_at(2024, 1, 4)),
+            DeviceStatusChange(device=cls.d1, from_status="Broken", to_status="Repair", changed_at=_at(2024, 1, 5, 9)),
+            DeviceStatusChange(device=cls.other, from_status="", to_status="Spare", changed_at=_at(2024, 1, 2)),
+        ])
+
+    def test_daily_counts(self):
+        devices = Device.objects.filter(pk__in=[self.d1.pk, self.d2.pk])
+        got = status_timeline(devices, date(2024, 1, 2), date(2024, 1, 5))
+        self.assertEqual(got["axis"], ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"])
+        self.assertEqual(got["counts"]["Active"], [1, 0, 1, 1])
+        self.assertEqual(got["counts"]["Broken"], [0, 1, 1, 0])
+        self.assertEqual(got["counts"]["Repair"], [0, 0, 0, 1])
+        self.assertEqual(got["counts"]["Spare"], [0, 0, 0, 0])
+
+    def test_unscoped_and_as_of(self):
+        got = status_timeline(None, date(2024, 1, 1), date(2024, 1, 2))
+        self.assertEqual(got["counts"]["Spare"], [0, 1])
+        self.assertEqual(got["counts"]["Active"], [1, 1])
+        self.assertIsNone(status_at(self.d2, date(2024, 1, 3)))
+        self.assertEqual(status_at(self.d1, date(2024, 1, 4)), "Broken")
+        self.assertEqual(status_at(self.d1, _at(2024, 1, 5, 8)), "Broken")
+        self.assertEqual(status_at(self.d1, _at(2024, 1, 5, 9)), "Repair")
+
+
+# ============================================================
+# placements: _replay, нээлттэй интервалын constraint, rebuild
+# ============================================================
+class PlacementReplayTests(SimpleTestCase):
+    t0, t1, t2, now = _at(2024, 1, 1), _at(2024, 2, 1), _at(2024, 3, 1), _at(2024, 4, 1)
+
+    def test_no_moves(self):
+        self.assertEqual(_replay(self.t0, 5, [], self.now), ([(5, self.t0, None)], False))
+        self.assertEqual(_replay(None, 5, [], self.now), ([(5, PLACEMENT_UNKNOWN_START, None)], False))
+        self.assertEqual(_replay(self.t0, None, [], self.now), ([], False))
+
+    def test_moves_chain(self):
+        moves = [(self.t1, 1, 2), (self.t2, 2, 3)]
+        self.assertEqual(
+            _replay(self.t0, 3, moves, self.now),
+            ([(1, self.t0, self.t1), (2, self.t1, self.t2), (3, self.t2, None)], False),
+        )
+        # Суурилуулсан огноо эхний шилжилтээс хойш бол эхлэл тодорхойгүй
+        intervals, _ = _replay(self.t2, 3, moves, self.now)
+        self.assertEqual(intervals[0], (1, PLACEMENT_UNKNOWN_START, self.t1))
+
+    def test_gaps_and_correction(self):
+        moves = [(self.t1, None, 2), (self.t2, 2, None)]
+        self.assertEqual(_replay(self.t0, None, moves, self.now), ([(2, self.t1, self.t2)], False))
+        # Түүхийн сүүлийн байршил Device.location-оос өөр -> now-оор засна
+        self.assertEqual(
+            _replay(self.t0, 4, [(self.t1, 1, 2)], self.now),
+            ([(1, self.t0, self.t1), (2, self.t1, self.now), (4, self.now, None)], True),
+        )
+
+
+class PlacementIntervalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        aimag = Aimag.objects.create(name="Архангай")
+        cls.loc_a = _location("A", aimag)
+        cls.loc_b = _location("B", aimag)
+
+    def test_one_open_interval_per_device(self):
+        dev = Device.objects.create(serial_number="P-1", location=self.loc_a)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DevicePlacementInterval.objects.create(device=dev, location=self.loc_b, valid_from=timezone.now())
+        # Хаагдсан интервал олон байж болно
+        DevicePlacementInterval.objects.create(device=dev, location=self.loc_b, valid_from=_at(2020, 1, 1), valid_to=_at(2020, 2, 1))
+        DevicePlacementInterval.objects.create(device=dev, location=self.loc_b, valid_from=_at(2020, 3, 1), valid_to=_at(2020, 4, 1))
+        self.assertEqual(location_at(dev, date(2020, 1, 15)), self.loc_b.pk)
+        self.assertIsNone(location_at(dev, date(2020, 2, 15)))
+        self.assertEqual(location_at(dev), self.loc_a.pk)
+
+    def test_rebuild_matches_recorded(self):
+        dev = Device.objects.create(serial_number="P-2", location=self.loc_a)
+        for loc in (self.loc_b, None, self.loc_a):
+            dev.location = loc
+            dev.save()
+        fields = ("location_id", "valid_from", "valid_to")
+        recorded = list(DevicePlacementInterval.objects.filter(device=dev).order_by("valid_from", "id").values_list(*fields))
+        self.assertEqual(len(recorded), 3)
+
+        result = rebuild_placements([dev.pk])
+        self.assertEqual((result.devices, result.intervals, result.corrected), (1, 3, 0))
+        rebuilt = list(DevicePlacementInterval.objects.filter(device=dev).order_by("valid_from", "id").values_list(*fields))
+        self.assertEqual(rebuilt, recorded)
+
+
+# ============================================================
+# serials: normalize_serial / давхардлын тайлан
+# ============================================================
+class NormalizeSerialTests(SimpleTestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_serial("ab-12 3.4_x"), "AB1234X")
+        self.assertEqual(normalize_serial(" Ａ１２/34 "), "A1234")  # NFKC: бүтэн өргөний тэмдэгт
+        self.assertEqual(normalize_serial("хм-07"), "ХМ07")
+        self.assertEqual(normalize_serial(None), "")
+        self.assertEqual(normalize_serial("--"), "")
+
+
+class SerialDuplicateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def make(serial, mfr):
+            return Device.objects.create(serial_number=serial, manufacturer=mfr)
+
+        cls.a1 = make("HMP-155 01", "Vaisala")
+        cls.a2 = make("hmp15501", " vaisala ")
+        cls.a3 = make("HMP.155.01", "Campbell")  # өөр үйлдвэрлэгч
+        cls.b1 = make("X-1", None)
+        cls.b2 = make("x 1", "")
+        cls.c1 = make("Y-2", "Vaisala")
+
+    def test_saved_key_and_lookup(self):
+        self.assertEqual(Device.objects.get(pk=self.a2.pk).serial_normalized, "HMP15501")
+        self.assertEqual(set(find_devices_by_serial("hmp 155-01")), {self.a1, self.a2, self.a3})
+        self.assertFalse(find_devices_by_serial(" - ").exists())
+        dev = Device.objects.get(pk=self.c1.pk)
+        dev.serial_number = "Y-3"
+        dev.save(update_fields=["serial_number"])
+        self.assertEqual(Device.objects.get(pk=self.c1.pk).serial_normalized, "Y3")
+
+    def test_groups_by_key_and_manufacturer(self):
+        result = find_serial_duplicates(chunk_size=1)
+        self.assertEqual(result.scanned, 6)
+        self.assertEqual(
+            [(g.key, g.manufacturer, [d[0] for d in g.devices]) for g in result.groups],
+            [("HMP15501", "VAISALA", [self.a1.pk, self.a2.pk]), ("X1", "", [self.b1.pk, self.b2.pk])],
+        )
+        self.assertEqual(result.duplicate_devices, 4)
+        scoped = find_serial_duplicates(Device.objects.exclude(pk=self.b2.pk))
+        self.assertEqual([g.key for g in scoped.groups], ["HMP15501"])
+
+
+# ============================================================
+# geo.polygon_index: давхцсан polygon-д эхний feature ялна
+# ============================================================
+class PolygonIndexTests(SimpleTestCase):
+    def test_first_match_wins(self):
+        big, small = box(0, 0, 10, 10), box(4, 4, 6, 6)
+        lons, lats = [5, 1, 20, float("nan")], [5, 1, 20, 5]
+        self.assertEqual(PolygonIndex([(big, {"n": "big"}), (small, {"n": "small"})]).locate(lons, lats).tolist(), [0, 0, -1, -1])
+        index = PolygonIndex([(small, {"n": "small"}), (big, {"n": "big"})])
+        self.assertEqual(index.locate(lons, lats).tolist(), [0, 1, -1, -1])
+        self.assertEqual(index.lookup(5, 5), {"n": "small"})
+        self.assertEqual(index.lookup_many([1, 20], [1, 20]), [{"n": "big"}, None])
+
+    def test_matches_linear_scan(self):
+        rng = np.random.default_rng(11)
+        features = [(box(x, y, x + w, y + h), {"i": i}) for i, (x, y, w, h) in enumerate(rng.uniform(0, 5, (40, 4)))]
+        lons, lats = rng.uniform(-1, 11, 500), rng.uniform(-1, 11, 500)
+        expected = [
+            next((i for i, (geom, _p) in enumerate(features) if geom.contains(Point(x, y))), -1)
+            for x, y in zip(lons, lats)
+        ]
+        self.assertEqual(PolygonIndex(features).locate(lons, lats).tolist(), expected)
+
+    def test_edges(self):
+        self.assertEqual(PolygonIndex([]).locate([1], [1]).tolist(), [-1])
+        self.assertEqual(PolygonIndex([(box(0, 0, 1, 1), {})]).locate([], []).tolist(), [])
+        with self.assertRaises(ValueError):
+            PolygonIndex([(box(0, 0, 1, 1), {})]).locate([1, 2], [1])
+
+
+# ============================================================
+# geo.location_sync: commit-ийн дараах нэг batch
+# ============================================================
+def _geo_sync_batches(callbacks):
+    # Signal-ууд (кэш, tile) өөр on_commit callback нэмдэг тул зөвхөн batch flush-ийг тоолно
+    return [c for c in callbacks if getattr(c, "__func__", None) is _PendingBatch.flush]
+
+
+class LocationGeoSyncBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.aimag = Aimag.objects.create(name="Архангай")
+
+    def _create(self, name, lon=101.0, lat=47.0):
+        return Location.objects.create(name=name, aimag_ref=self.aimag, longitude=lon, latitude=lat)
+
+    @mock.patch("inventory.geo.location_sync.sync_location_geo")
+    def test_one_callback_per_transaction(self, sync):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                locs = [self._create(f"L{i}", 101.0 + i) for i in range(3)]
+                locs[0].latitude = 48.0
+                locs[0].save()
+                _location("Координатгүй", self.aimag)
+        self.assertEqual(len(_geo_sync_batches(callbacks)), 1)
+        sync.assert_called_once()
+        self.assertEqual(sync.call_args.args[0], {loc.pk for loc in locs})
+        self.assertEqual(locs[0].geohash, geohash.encode(101.0, 48.0))
+
+    @mock.patch("inventory.geo.location_sync.sync_location_geo")
+    def test_unrelated_edit_not_scheduled(self, sync):
+        loc = self._create("L")
+        loc = Location.objects.get(pk=loc.pk)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            loc.name = "Шинэ нэр"
+            loc.save()
+            loc.longitude = 102.0
+            loc.save(update_fields=["name"])
+        self.assertEqual(_geo_sync_batches(callbacks), [])
+        sync.assert_not_called()
+
+    @mock.patch("inventory.geo.location_sync.sync_location_geo")
+    def test_rolled_back_savepoint_registers_new_batch(self, sync):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        self._create("Буцаагдсан")
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                kept = self._create("Үлдсэн")
+        self.assertEqual(len(_geo_sync_batches(callbacks)), 1)
+        sync.assert_called_once()
+        self.assertEqual(sync.call_args.args[0], {kept.pk})
@@ -10,6 +10,8 @@ from .admin_dashboard import (
     dashboard_graph_view,
     chart_status_json,
     chart_workflow_json,
+    device_status_at_json,
+    location_devices_at_json,
 )
 
 # Other views
@@ -17,13 +19,24 @@ from .views import (
     location_map,
     station_map_view,
     admin_data_entry,
+    qr_device_image,
     qr_device_lookup,
+    device_serial_lookup,
     qr_device_public_view,
     qr_device_public_passport_pdf,
 )
 
-from .views_district_api import lookup_district_api
+from .views_district_api import lookup_district_api, lookup_district_batch_api
 from .views_auth import force_password_change
+from .views_map_api import (
+    map_choropleth_api,
+    map_clusters_api,
+    map_locations_bbox_api,
+    map_nearest_api,
+    station_tile_mvt,
+)
+from .views_geo_layers import geo_layer_view, geo_layers_index_api
+from .views_verification_route import verification_route_api, verification_route_print_view
 
 app_name = "inventory"
 
@@ -32,6 +45,15 @@ urlpatterns = [
     # 1) API
     # =====================================================
     path("api/geo/lookup-district/", lookup_district_api, name="lookup_district_api"),
+    path("api/geo/lookup-district/batch/", lookup_district_batch_api, name="lookup_district_batch_api"),
+    path("api/map/clusters/", map_clusters_api, name="map_clusters_api"),
+    path("api/map/locations/", map_locations_bbox_api, name="map_locations_bbox_api"),
+    path("api/map/nearest/", map_nearest_api, name="map_nearest_api"),
+    path("api/map/choropleth/", map_choropleth_api, name="map_choropleth_api"),
+    path("api/map/verification-route/", verification_route_api, name="verification_route_api"),
+    path("tiles/stations/<int:z>/<int:x>/<int:y>.mvt", station_tile_mvt, name="station_tile_mvt"),
+    path("api/geo/layers/", geo_layers_index_api, name="geo_layers_index_api"),
+    path("geo/layers/<slug:name>.geojson", geo_layer_view, name="geo_layer"),
     path("api/reports/sums/", rh.reports_sums_json, name="reports-sums-json"),
     path("api/reports/charts/", rh.reports_chart_json, name="reports-chart-json"),
 
@@ -56,6 +78,9 @@ urlpatterns = [
     path("admin/dashboard/graph/", dashboard_graph_view, name="dashboard_graph"),
     path("admin/dashboard/charts/status.json", chart_status_json, name="chart_status_json"),
     path("admin/dashboard/charts/workflow.json", chart_workflow_json, name="chart_workflow_json"),
+    path("admin/dashboard/device-status.json", device_status_at_json, name="device_status_at_json"),
+    path("admin/dashboard/location-devices.json", location_devices_at_json, name="location_devices_at_json"),
+    path("admin/verification-route/", verification_route_print_view, name="verification_route_print"),
 
     # =====================================================
     # 4) ADMIN DATA ENTRY & MAP
@@ -68,7 +93,9 @@ urlpatterns = [
     # 5) QR (public + device)
     # =====================================================
     path("qr/device/<uuid:token>/", qr_device_lookup, name="qr_device_lookup"),
+    path("qr/serial/", device_serial_lookup, name="device_serial_lookup"),
     path("qr/public/<uuid:token>/", qr_device_public_view, name="qr_device_public"),
+    path("qr/img/<uuid:token>.<str:fmt>", qr_device_image, name="qr_device_image"),
     path(
         "qr/public/<uuid:token>/passport.pdf",
         qr_device_public_passport_pdf,
@@ -6,7 +6,7 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import mm
 from django.conf import settings
-import os
+import io
 
 def build_device_passport_pdf(device, out_path):
     styles = getSampleStyleSheet()
@@ -15,9 +15,12 @@ def build_device_passport_pdf(device, out_path):
     story.append(Paragraph("<b>БАГАЖНЫ ТЕХНИК ПАСПОРТ</b>", styles["Title"]))
     story.append(Spacer(1, 8))
 
-    # QR
-    if device.qr_image and os.path.exists(device.qr_image.path):
-        story.append(Image(device.qr_image.path, 40*mm, 40*mm))
+    # QR (qr_token-оос, /qr/img/ endpoint-той ижил кэш)
+    if getattr(device, "qr_token", None):
+        from inventory.qr_images import qr_image
+
+        qr_png, _etag = qr_image(device.qr_token, "png", 512)
+        story.append(Image(io.BytesIO(qr_png), 40*mm, 40*mm))
         story.append(Spacer(1, 6))
 
     # Basic info
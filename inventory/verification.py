@@ -0,0 +1,131 @@
+# inventory/verification.py
+"""
+Каталогийн verification_cycle_months өөрчлөгдөхөд next_verification_date-ийг
+бүх холбогдох багажид нэг дор (set-based) дахин тооцоолно.
+
+- Сарын нэмэх үйлдлийг NumPy (datetime64[M]) дээр chunk-аар хийнэ; сарын сүүлийн
+  өдрийг relativedelta-тай адил хавчина (1/31 + 1 сар = 2/28|29).
+- Зөвхөн утга нь өөрчлөгдсөн мөрүүдийг шинэ огноогоор бүлэглэж, бүлэг бүрт нэг UPDATE.
+- Хугацааны bucket (expired / due_30 / due_90 / ok / unknown) хооронд хэдэн багаж
+  шилжсэнийг тайлагнана.
+
+Device.compute_next_verification_date()-тэй ижил дүрэм: last_verification_date
+байхгүй эсвэл цикл 0 бол гараар оруулсан утгыг хөндөхгүй.
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Device
+
+logger = logging.getLogger(__name__)
+
+RECOMPUTE_CHUNK = 5000
+
+
+@dataclass
+class VerificationRecomputeResult:
+    scanned: int = 0
+    updated: int = 0
+    # (хуучин bucket, шинэ bucket) -> багажийн тоо (зөвхөн bucket солигдсон)
+    moves: Counter = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        parts = [f"{old}→{new}: {n}" for (old, new), n in sorted(self.moves.items())]
+        return f"scanned={self.scanned} updated={self.updated}" + (f" ({', '.join(parts)})" if parts else "")
+
+
+def add_months(dates: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """datetime64[D] + сар (relativedelta-тай адил: өдрийг тухайн сарын сүүлд хавчина)."""
+    start_month = dates.astype("datetime64[M]")
+    day = (dates - start_month.astype("datetime64[D]")).astype(np.int64)
+    target = start_month + months.astype("timedelta64[M]")
+    month_len = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    return target.astype("datetime64[D]") + np.minimum(day, month_len - 1).astype("timedelta64[D]")
+
+
+def verification_buckets(dates: np.ndarray, today: date) -> np.ndarray:
+    """Device.verification_bucket()-ийн vectorized хувилбар (NaT -> unknown)."""
+    delta = (dates - np.datetime64(today, "D")).astype("timedelta64[D]").astype(np.int64)
+    nat = np.isnat(dates)
+    return np.select(
+        [nat, delta < 0, delta <= 30, delta <= 90],
+        ["unknown", "expired", "due_30", "due_90"],
+        default="ok",
+    )
+
+
+def _to_datetime64(values: Iterable[Optional[date]]) -> np.ndarray:
+    return np.array([v if v is not None else np.datetime64("NaT") for v in values], dtype="datetime64[D]")
+
+
+def recompute_next_verification(
+    catalog_ids: Optional[Iterable[int]] = None,
+    *,
+    today: Optional[date] = None,
+    chunk_size: int = RECOMPUTE_CHUNK,
+    dry_run: bool = False,
+) -> VerificationRecomputeResult:
+    """
+    catalog_ids (None бол бүх каталог)-ийн багажуудын next_verification_date-ийг
+    каталогийн одоогийн циклээр дахин тооцоолно.
+    """
+    today = today or timezone.localdate()
+    result = VerificationRecomputeResult()
+
+    qs = Device.objects.filter(
+        last_verification_date__isnull=False,
+        catalog_item__verification_cycle_months__gt=0,
+    )
+    if catalog_ids is not None:
+        qs = qs.filter(catalog_item_id__in=list(catalog_ids))
+    rows = qs.order_by("pk").values_list(
+        "pk", "last_verification_date", "next_verification_date", "catalog_item__verification_cycle_months"
+    )
+
+    # SQLite: нэг холболт дээр iterator нээлттэй байхад тухайн хүснэгтийг шинэчлэхгүйн тулд эхлээд уншина
+    rows = list(rows)
+    with transaction.atomic():
+        for start in range(0, len(rows), chunk_size):
+            _apply_chunk(rows[start:start + chunk_size], today, result, dry_run)
+        if dry_run:
+            transaction.set_rollback(True)
+    logger.info("next_verification_date recompute: %s", result.summary())
+    return result
+
+
+def _apply_chunk(chunk, today: date, result: VerificationRecomputeResult, dry_run: bool) -> None:
+    ids = np.fromiter((r[0] for r in chunk), dtype=np.int64, count=len(chunk))
+    last = _to_datetime64(r[1] for r in chunk)
+    old = _to_datetime64(r[2] for r in chunk)
+    months = np.fromiter((r[3] for r in chunk), dtype=np.int64, count=len(chunk))
+
+    new = add_months(last, months)
+    changed = np.isnat(old) | (old != new)
+    result.scanned += len(chunk)
+    if not changed.any():
+        return
+
+    old_b = verification_buckets(old[changed], today)
+    new_b = verification_buckets(new[changed], today)
+    moved = old_b != new_b
+    result.moves.update(zip(old_b[moved].tolist(), new_b[moved].tolist()))
+
+    # Ижил шинэ огноотой мөрүүд -> нэг UPDATE ... WHERE id IN (...) (CASE-гүй, SQLite-д хурдан)
+    ids, new = ids[changed], new[changed]
+    result.updated += len(ids)
+    if dry_run:
+        return
+    order = np.argsort(new, kind="stable")
+    ids, new = ids[order], new[order]
+    bounds = np.flatnonzero(new[1:] != new[:-1]) + 1
+    for grp_ids, grp_new in zip(np.split(ids, bounds), np.split(new, bounds)):
+        Device.objects.filter(pk__in=grp_ids.tolist()).update(next_verification_date=grp_new[0].astype(object))
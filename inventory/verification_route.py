@@ -0,0 +1,168 @@
+# inventory/verification_route.py
+"""
+Шалгалт/калибровкын хугацаа дууссан эсвэл ойрын хугацаанд дуусах багажуудтай
+станцуудыг тойрох маршрут (nearest-neighbour + 2-opt).
+
+API (views_verification_route.py):
+  - /api/map/verification-route/        -> JSON
+  - /admin/verification-route/          -> хэвлэх хуудас
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.http import HttpRequest
+from django.utils import timezone
+
+from .geo.routing import distance_matrix_km, solve_route
+from .map_data import scoped_map_locations
+from .models import Device, Location
+
+ROUTE_DEFAULT_DAYS = 30
+ROUTE_MAX_DAYS = 365
+ROUTE_MAX_STOPS = 1000
+
+
+def due_devices_qs(request: HttpRequest, days: int = ROUTE_DEFAULT_DAYS, include_expired: bool = True):
+    """Scope + шүүлтүүр доторх, next_verification_date <= өнөөдөр + days багажууд."""
+    today = timezone.localdate()
+    qs = Device.objects.filter(
+        location__in=scoped_map_locations(request, require_coords=False),
+        next_verification_date__isnull=False,
+        next_verification_date__lte=today + timedelta(days=days),
+    )
+    if not include_expired:
+        qs = qs.filter(next_verification_date__gte=today)
+    return qs
+
+
+def _collect_stops(request: HttpRequest, days: int, include_expired: bool) -> tuple[List[Dict[str, Any]], int]:
+    today = timezone.localdate()
+    rows = (
+        due_devices_qs(request, days, include_expired)
+        .order_by("location_id", "next_verification_date", "pk")
+        .values_list(
+            "id", "serial_number", "kind", "next_verification_date",
+            "location_id", "location__name", "location__latitude", "location__longitude",
+            "location__aimag_ref__name", "location__sum_ref__name",
+        )
+    )
+
+    stops: Dict[int, Dict[str, Any]] = {}
+    skipped = 0
+    for dev_id, serial, kind, due, loc_id, name, lat, lon, aimag, sum_name in rows:
+        if lat is None or lon is None:
+            skipped += 1
+            continue
+        s = stops.get(loc_id)
+        if s is None:
+            s = stops[loc_id] = {
+                "location_id": loc_id,
+                "name": name or "",
+                "lat": float(lat),
+                "lon": float(lon),
+                "aimag": aimag or "",
+                "sum": sum_name or "",
+                "device_count": 0,
+                "expired_count": 0,
+                "earliest_due": due,
+                "devices": [],
+            }
+        s["device_count"] += 1
+        if due < today:
+            s["expired_count"] += 1
+        s["earliest_due"] = min(s["earliest_due"], due)
+        s["devices"].append({"id": dev_id, "serial_number": serial or "", "kind": kind or "", "due": due})
+    return list(stops.values()), skipped
+
+
+def plan_verification_route(
+    request: HttpRequest,
+    *,
+    days: int = ROUTE_DEFAULT_DAYS,
+    include_expired: bool = True,
+    start_location_id: Optional[int] = None,
+    start_lonlat: Optional[tuple[float, float]] = None,
+    return_to_start: bool = False,
+) -> Dict[str, Any]:
+    """
+    Маршрут төлөвлөнө. Эхлэл (start_location_id эсвэл start_lonlat) өгвөл
+    тэндээс эхэлнэ; өгөөгүй бол хамгийн богино нээлттэй зам.
+    Буцаах dict: {ok, days, today, total_km, stops: [...], start, return_leg_km, ...}
+    """
+    from .admin import _scope_location_qs
+
+    days = max(0, min(int(days), ROUTE_MAX_DAYS))
+    stops, skipped = _collect_stops(request, days, include_expired)
+    truncated = len(stops) > ROUTE_MAX_STOPS
+    if truncated:
+        # Хамгийн түрүүнд дуусах станцуудыг үлдээнэ
+        stops = sorted(stops, key=lambda s: (s["earliest_due"], s["location_id"]))[:ROUTE_MAX_STOPS]
+
+    start: Optional[Dict[str, Any]] = None
+    if start_location_id:
+        loc = (
+            _scope_location_qs(request)
+            .filter(id=start_location_id, latitude__isnull=False, longitude__isnull=False)
+            .values("id", "name", "latitude", "longitude")
+            .first()
+        )
+        if loc is None:
+            raise Location.DoesNotExist("start location not found")
+        start = {"location_id": loc["id"], "name": loc["name"], "lat": float(loc["latitude"]), "lon": float(loc["longitude"])}
+    elif start_lonlat is not None:
+        start = {"location_id": None, "name": "", "lat": float(start_lonlat[1]), "lon": float(start_lonlat[0])}
+
+    # Эхлэл нь өөрөө зочлох станц бол давхардуулахгүй
+    if start and start["location_id"] is not None:
+        stops = sorted(stops, key=lambda s: s["location_id"] != start["location_id"])
+        has_start_stop = bool(stops) and stops[0]["location_id"] == start["location_id"]
+    else:
+        has_start_stop = False
+
+    points = ([] if (start is None or has_start_stop) else [start]) + stops
+    offset = len(points) - len(stops)
+
+    lons = np.asarray([p["lon"] for p in points], dtype="float64")
+    lats = np.asarray([p["lat"] for p in points], dtype="float64")
+    order, legs = solve_route(
+        distance_matrix_km(lons, lats),
+        start=0 if start is not None else None,
+        return_to_start=return_to_start,
+    )
+
+    ordered: List[Dict[str, Any]] = []
+    cum = 0.0
+    prev_leg = 0.0
+    for pos, idx in enumerate(order.tolist()):
+        if pos > 0:
+            prev_leg = float(legs[pos - 1])
+            cum += prev_leg
+        if idx < offset:
+            continue  # эхлэлийн цэг (станц биш)
+        s = dict(stops[idx - offset])
+        s["order"] = len(ordered) + 1
+        s["leg_km"] = round(prev_leg, 2)
+        s["cum_km"] = round(cum, 2)
+        s["earliest_due"] = s["earliest_due"].isoformat()
+        s["devices"] = [dict(d, due=d["due"].isoformat()) for d in s["devices"]]
+        ordered.append(s)
+
+    return_leg = float(legs[-1]) if (return_to_start and len(order) > 1) else 0.0
+    return {
+        "ok": True,
+        "today": timezone.localdate().isoformat(),
+        "days": days,
+        "include_expired": include_expired,
+        "return_to_start": return_to_start,
+        "start": start,
+        "stop_count": len(ordered),
+        "device_count": sum(s["device_count"] for s in ordered),
+        "skipped_no_coords": skipped,
+        "truncated": truncated,
+        "total_km": round(float(legs.sum()), 2),
+        "return_leg_km": round(return_leg, 2),
+        "stops": ordered,
+    }
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import JsonResponse, HttpRequest, HttpResponse
+from django.http import Http404, JsonResponse, HttpRequest, HttpResponse, HttpResponseNotModified
 from django.shortcuts import render, get_object_or_404, redirect
 from django.db.models import Count, Q, Max
 from django.core.serializers.json import DjangoJSONEncoder
@@ -190,6 +190,72 @@ def qr_device_lookup(request, token):
     url = reverse("admin:inventory_device_change", args=[device.pk])
     return redirect(url, permanent=False)
 
+
+@staff_member_required(login_url="/django-admin/login/")
+def device_serial_lookup(request):
+    """
+    Серийн дугаараар (сканнердсан/гараар, ?q=) багаж олно: serial_normalized индексээр
+    exact-match. Нэг бол change page, олон бол changelist (?serial_normalized=) руу.
+    """
+    from inventory.admin import _scope_qs
+    from inventory.serials import find_devices_by_serial, normalize_serial
+
+    q = (request.GET.get("q") or "").strip()
+    # Хэрэглэгчийн аймгаас гадуурх багаж байгаа эсэхийг ч илрүүлэхгүй (admin-тай ижил scope)
+    scoped = _scope_qs(request, Device.objects.all(), aimag_field="aimag_ref")
+    ids = list(find_devices_by_serial(q, scoped).values_list("pk", flat=True)[:2])
+    if not ids:
+        raise Http404("Device not found")
+    if len(ids) == 1:
+        return redirect(reverse("admin:inventory_device_change", args=[ids[0]]), permanent=False)
+    url = reverse("admin:inventory_device_changelist")
+    return redirect(f"{url}?serial_normalized={normalize_serial(q)}", permanent=False)
+
+QR_IMG_MAX_AGE = 24 * 3600
+
+
+def qr_device_image(request, token, fmt):
+    """
+    QR зураг: /qr/img/<token>.png|.svg?size=256 (qr_token-оос on-demand, LRU + дискэн кэш).
+    Хүсэлт бүрт token-ий хүчинтэй эсэхийг (qr_token индексээр нэг query) шалгана:
+    хүчингүй/хугацаа дууссан QR-д 304/кэшээс ч зураг өгөхгүй (410).
+    ETag нь агуулгын hash; max-age нь QR дуусах хугацаанаас хэтрэхгүй.
+    """
+    from inventory.qr_images import QR_IMG_FORMATS, cached_qr_image, normalize_size, qr_image, qr_image_key
+
+    if fmt not in QR_IMG_FORMATS:
+        raise Http404("Unknown format")
+    device = Device.objects.filter(qr_token=token).only("pk", "qr_revoked_at", "qr_expires_at").first()
+    if device is None:
+        raise Http404("Unknown token")
+    ok, msg = _qr_is_valid(device)
+    if not ok:
+        return HttpResponse(msg, status=410)
+
+    size = normalize_size(request.GET.get("size"))
+    key = qr_image_key(token, fmt, size)
+    etag = f'"{key}"'
+    max_age = QR_IMG_MAX_AGE
+    if device.qr_expires_at:
+        max_age = max(0, min(max_age, int((device.qr_expires_at - timezone.now()).total_seconds())))
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    inm = request.headers.get("If-None-Match") or ""
+    if etag in [t.strip() for t in inm.split(",")]:
+        resp = HttpResponseNotModified()
+        for k, v in headers.items():
+            resp[k] = v
+        return resp
+
+    data = cached_qr_image(key, fmt)
+    if data is None:
+        data, _key = qr_image(token, fmt, size)
+    resp = HttpResponse(data, content_type=QR_IMG_FORMATS[fmt])
+    for k, v in headers.items():
+        resp[k] = v
+    return resp
+
+
 def qr_device_public_view(request, token):
     """Public read-only view (HTML)."""
     device = _qr_get_device_or_404(token)
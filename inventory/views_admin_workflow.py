@@ -154,14 +154,14 @@ def _apply_universal_filters(request: HttpRequest, qs: QuerySet) -> QuerySet:
         elif hasattr(model, 'device'): qs = qs.filter(device__status=flt["status"])
     if flt["aimag"]:
         if model == Location: qs = qs.filter(aimag_ref_id=flt["aimag"])
-        elif hasattr(model, 'location'): qs = qs.filter(location__aimag_ref_id=flt["aimag"])
-        elif hasattr(model, 'device'): qs = qs.filter(device__location__aimag_ref_id=flt["aimag"])
+        elif hasattr(model, 'location'): qs = qs.filter(aimag_ref_id=flt["aimag"])
+        elif hasattr(model, 'device'): qs = qs.filter(device__aimag_ref_id=flt["aimag"])
     return qs
 
 def _apply_device_filters(request: HttpRequest, qs: QuerySet[Device]) -> QuerySet[Device]:
     flt = _current_filter(request)
-    if flt["aimag"]: qs = qs.filter(location__aimag_ref_id=flt["aimag"])
-    if flt["sum"]: qs = qs.filter(location__sum_ref_id=flt["sum"])
+    if flt["aimag"]: qs = qs.filter(aimag_ref_id=flt["aimag"])
+    if flt["sum"]: qs = qs.filter(sum_ref_id=flt["sum"])
     if flt["kind"]: qs = qs.filter(kind=flt["kind"])
     if flt["status"]: qs = qs.filter(status=flt["status"])
     if flt["location_type"]: qs = qs.filter(location__location_type=flt["location_type"])
@@ -254,7 +254,7 @@ def reports_hub_view(request: HttpRequest, admin_site: Optional[AdminSite] = Non
     status_choices = list(getattr(Device, "STATUS_CHOICES", []))
     loc_type_choices = list(getattr(Location, "LOCATION_TYPE_CHOICES", Location.LOCATION_TYPES))
 
-    devices_qs = _scope_qs(request, Device.objects.select_related("location"), "location__aimag_ref_id")
+    devices_qs = _scope_qs(request, Device.objects.select_related("location"), "aimag_ref_id")
     devices_qs = _apply_device_filters(request, devices_qs)
     loc_qs = _scope_qs(request, Location.objects.all(), "aimag_ref_id")
     loc_qs = _apply_location_filters(request, loc_qs)
@@ -263,13 +263,13 @@ def reports_hub_view(request: HttpRequest, admin_site: Optional[AdminSite] = Non
     start_dt = datetime.combine(date_from, datetime.min.time(), tzinfo=timezone.get_current_timezone())
     end_dt = datetime.combine(date_to + timedelta(days=1), datetime.min.time(), tzinfo=timezone.get_current_timezone())
 
-    ms_qs = _scope_qs(request, MaintenanceService.objects.all(), "device__location__aimag_ref_id")
-    ca_qs = _scope_qs(request, ControlAdjustment.objects.all(), "device__location__aimag_ref_id")
+    ms_qs = _scope_qs(request, MaintenanceService.objects.all(), "device__aimag_ref_id")
+    ca_qs = _scope_qs(request, ControlAdjustment.objects.all(), "device__aimag_ref_id")
     mv_qs = _scope_qs(request, DeviceMovement.objects.all(), f"{_MV_TO_FIELD}__aimag_ref_id")
     sp_qs = _scope_qs(request, SparePartOrder.objects.all(), "aimag_id")
 
     if flt["aimag"]:
-        ms_qs, ca_qs, sp_qs = ms_qs.filter(device__location__aimag_ref_id=flt["aimag"]), ca_qs.filter(device__location__aimag_ref_id=flt["aimag"]), sp_qs.filter(aimag_id=flt["aimag"])
+        ms_qs, ca_qs, sp_qs = ms_qs.filter(device__aimag_ref_id=flt["aimag"]), ca_qs.filter(device__aimag_ref_id=flt["aimag"]), sp_qs.filter(aimag_id=flt["aimag"])
         mv_qs = mv_qs.filter(**{f"{_MV_TO_FIELD}__aimag_ref_id": flt["aimag"]})
     if flt["kind"]:
         ms_qs, ca_qs, mv_qs = ms_qs.filter(device__kind=flt["kind"]), ca_qs.filter(device__kind=flt["kind"]), mv_qs.filter(device__kind=flt["kind"])
@@ -328,7 +328,7 @@ def reports_sums_json(request: HttpRequest) -> JsonResponse:
 def reports_chart_json(request: HttpRequest) -> JsonResponse:
     report = _get_param(request, "report")
     metric = _get_param(request, "metric")
-    dev_qs = _scope_qs(request, Device.objects.all(), "location__aimag_ref_id")
+    dev_qs = _scope_qs(request, Device.objects.all(), "aimag_ref_id")
     dev_qs = _apply_device_filters(request, dev_qs)
     
     rows_kv = []
@@ -339,21 +339,21 @@ def reports_chart_json(request: HttpRequest) -> JsonResponse:
     return JsonResponse({"counts": {"status": counts_series}, "workflow": {"axis": [], "ms": [], "ca": []}}, json_dumps_params={"ensure_ascii": False})
 
 def reports_export_devices_xlsx(request: HttpRequest) -> HttpResponse:
-    qs = _scope_qs(request, Device.objects.select_related("location", "location__aimag_ref"), "location__aimag_ref_id")
+    qs = _scope_qs(request, Device.objects.select_related("location", "aimag_ref"), "aimag_ref_id")
     qs = _apply_device_filters(request, qs)
     header = ["ID", "Сериал", "Төрөл", "Төлөв", "Байршил", "Аймаг"]
-    rows = [[d.id, d.serial_number, d.kind, d.status, str(d.location), getattr(d.location.aimag_ref, 'name', '') if d.location else ''] for d in qs[:20000]]
+    rows = [[d.id, d.serial_number, d.kind, d.status, str(d.location), getattr(d.aimag_ref, 'name', '')] for d in qs[:20000]]
     return _xlsx_response("devices_report.xlsx", header, rows)
 
 def reports_export_devices_csv(request: HttpRequest) -> HttpResponse:
-    qs = _scope_qs(request, Device.objects.all(), "location__aimag_ref_id")
+    qs = _scope_qs(request, Device.objects.all(), "aimag_ref_id")
     qs = _apply_device_filters(request, qs)
     header = ["id", "serial_number", "kind", "status", "location"]
     rows = [[d.id, d.serial_number, d.kind, d.status, str(d.location)] for d in qs[:50000]]
     return _csv_response("devices.csv", header, rows)
 
 def reports_export_maintenance_xlsx(request: HttpRequest) -> HttpResponse:
-    qs = _scope_qs(request, MaintenanceService.objects.select_related('device', 'device__location'), 'device__location__aimag_ref_id')
+    qs = _scope_qs(request, MaintenanceService.objects.select_related('device', 'device__location'), 'device__aimag_ref_id')
     qs = _apply_universal_filters(request, qs)
     df, dt = _date_window(request)
     qs = qs.filter(date__range=[df, dt])
@@ -406,9 +406,9 @@ def workflow_pending_dashboard(request):
         dt = timezone.now() - timezone.timedelta(days=int(days))
         ms_qs, ca_qs = ms_qs.filter(created_at__gte=dt), ca_qs.filter(created_at__gte=dt)
 
-    if is_aimag_engineer and user_aimag: ms_qs, ca_qs = ms_qs.filter(device__location__aimag_ref=user_aimag), ca_qs.filter(device__location__aimag_ref=user_aimag)
+    if is_aimag_engineer and user_aimag: ms_qs, ca_qs = ms_qs.filter(device__aimag_ref=user_aimag), ca_qs.filter(device__aimag_ref=user_aimag)
     elif aimag:
-        aimag_q = Q(device__location__aimag_ref__code__iexact=aimag) | Q(device__location__aimag_ref__name__iexact=aimag) | Q(device__location__aimag_ref__name__icontains=aimag)
+        aimag_q = Q(device__aimag_ref__code__iexact=aimag) | Q(device__aimag_ref__name__iexact=aimag) | Q(device__aimag_ref__name__icontains=aimag)
         ms_qs, ca_qs = ms_qs.filter(aimag_q), ca_qs.filter(aimag_q)
 
     if org:
@@ -442,7 +442,7 @@ def workflow_pending_counts(request):
     user_aimag = _get_user_aimag(request)
     is_aimag_engineer = request.user.groups.filter(name="AimagEngineer").exists()
     ms_qs, ca_qs = MaintenanceService.objects.filter(workflow_status__in=PENDING_SET), ControlAdjustment.objects.filter(workflow_status__in=PENDING_SET)
-    if is_aimag_engineer and user_aimag: ms_qs, ca_qs = ms_qs.filter(device__location__aimag_ref=user_aimag), ca_qs.filter(device__location__aimag_ref=user_aimag)
+    if is_aimag_engineer and user_aimag: ms_qs, ca_qs = ms_qs.filter(device__aimag_ref=user_aimag), ca_qs.filter(device__aimag_ref=user_aimag)
     return JsonResponse({"ok": True, "pending_total": ms_qs.count() + ca_qs.count(), "pending_maint": ms_qs.count(), "pending_control": ca_qs.count()})
 
 @staff_member_required
@@ -477,7 +477,7 @@ def workflow_audit_log(request):
     ms_qs, ca_qs = MaintenanceService.objects.select_related("device", "device__location"), ControlAdjustment.objects.select_related("device", "device__location")
     if is_aimag_engineer := request.user.groups.filter(name="AimagEngineer").exists():
         user_aimag = _get_user_aimag(request)
-        if user_aimag: ms_qs, ca_qs = ms_qs.filter(device__location__aimag_ref=user_aimag), ca_qs.filter(device__location__aimag_ref=user_aimag)
+        if user_aimag: ms_qs, ca_qs = ms_qs.filter(device__aimag_ref=user_aimag), ca_qs.filter(device__aimag_ref=user_aimag)
     
     rows = []
     if kind in ("", "MAINT"): rows.extend([_row("MAINT", o) for o in ms_qs.order_by("-created_at")[:1500]])
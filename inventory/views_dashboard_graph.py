@@ -43,7 +43,7 @@ def _scope_workflow_qs(user, qs):
         return qs
     aimag = _get_user_aimag(user)
     if aimag:
-        return qs.filter(device__location__aimag_ref=aimag)
+        return qs.filter(device__aimag_ref=aimag)
     return qs.none()
 
 
@@ -166,11 +166,11 @@ def _build_breakdowns(user, *, date_from: date | None, date_to: date | None,
 
     # Aimag breakdown
     aimag_counts = {}
-    for r in ms.values("device__location__aimag_ref__name").annotate(c=Count("id")):
-        k = r["device__location__aimag_ref__name"] or "-"
+    for r in ms.values("device__aimag_ref__name").annotate(c=Count("id")):
+        k = r["device__aimag_ref__name"] or "-"
         aimag_counts[k] = aimag_counts.get(k, 0) + r["c"]
-    for r in ca.values("device__location__aimag_ref__name").annotate(c=Count("id")):
-        k = r["device__location__aimag_ref__name"] or "-"
+    for r in ca.values("device__aimag_ref__name").annotate(c=Count("id")):
+        k = r["device__aimag_ref__name"] or "-"
         aimag_counts[k] = aimag_counts.get(k, 0) + r["c"]
 
     aimag_axis = sorted(aimag_counts.keys(), key=lambda x: (-aimag_counts[x], x))[:20]
@@ -1,11 +1,28 @@
 # inventory/views_district_api.py
 from __future__ import annotations
 
+import csv
+import io
+import json
+
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.http import JsonResponse
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import require_GET, require_POST
+
+from .geo.district_lookup import lookup_ub_district, lookup_ub_districts
+
+BATCH_MAX_POINTS = 10000
 
-from .geo.district_lookup import lookup_ub_district
+
+def _district_payload(props) -> dict:
+    return {
+        "district": props.get("name_mn"),
+        "name_mn": props.get("name_mn"),
+        "name_en": props.get("name_en"),
+        "aimag_code": props.get("aimag_code"),
+        "sum_code": props.get("sum_code"),
+    }
 
 
 @require_GET
@@ -31,14 +48,85 @@ def lookup_district_api(request):
     if not props:
         return JsonResponse({"ok": True, "found": False})
 
+    return JsonResponse({"ok": True, "found": True, **_district_payload(props)})
+
+
+def _parse_batch_points(request):
+    """
+    Body -> (lats, lons).
+      - JSON: [{"lat":..,"lon":..}, ...]  эсвэл  {"points": [...]}
+              (мөр бүр [lat, lon] жагсаалт байж болно)
+      - CSV : "lat,lon" толгойтой (latitude/longitude нэрийг ч зөвшөөрнө)
+    ValueError -> 400.
+    """
+    ctype = (request.content_type or "").lower()
+    try:
+        body = request.body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("body must be UTF-8 encoded")
+
+    if "csv" in ctype or "text/plain" in ctype:
+        reader = csv.DictReader(io.StringIO(body))
+        rows = [
+            {"lat": r.get("lat") or r.get("latitude"), "lon": r.get("lon") or r.get("longitude")}
+            for r in reader
+        ]
+    else:
+        try:
+            data = json.loads(body or "null")
+        except json.JSONDecodeError:
+            raise ValueError("invalid JSON body")
+        if isinstance(data, dict):
+            data = data.get("points")
+        if not isinstance(data, list):
+            raise ValueError("expected a JSON array of points")
+        rows = data
+
+    if len(rows) > BATCH_MAX_POINTS:
+        raise ValueError(f"too many points (max {BATCH_MAX_POINTS})")
+
+    lats, lons = [], []
+    for i, r in enumerate(rows):
+        try:
+            if isinstance(r, dict):
+                lat, lon = r.get("lat"), r.get("lon")
+            else:
+                lat, lon = r[0], r[1]
+            lats.append(float(lat))
+            lons.append(float(lon))
+        except (TypeError, ValueError, IndexError, KeyError):
+            raise ValueError(f"point #{i}: lat/lon must be numbers")
+    return lats, lons
+
+
+@staff_member_required(login_url="/django-admin/login/")
+@require_POST
+def lookup_district_batch_api(request):
+    """
+    POST /api/geo/lookup-district/batch/  (staff, CSRF token шаардлагатай)
+    Body: JSON array эсвэл CSV (дээд тал нь BATCH_MAX_POINTS цэг).
+    Response:
+      { ok: true, count: N, found: K,
+        results: [ {found: true, district: "Баянзүрх", ...} | {found: false}, ... ] }
+    results нь оролтын дарааллыг хадгална.
+    """
+    try:
+        lats, lons = _parse_batch_points(request)
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    matches = lookup_ub_districts(lons, lats, base_dir=settings.BASE_DIR)
+
+    results = []
+    found = 0
+    for props in matches:
+        if props:
+            found += 1
+            results.append({"found": True, **_district_payload(props)})
+        else:
+            results.append({"found": False})
+
     return JsonResponse(
-        {
-            "ok": True,
-            "found": True,
-            "district": props.get("name_mn"),
-            "name_mn": props.get("name_mn"),
-            "name_en": props.get("name_en"),
-            "aimag_code": props.get("aimag_code"),
-            "sum_code": props.get("sum_code"),
-        }
-    )
\ No newline at end of file
+        {"ok": True, "count": len(results), "found": found, "results": results},
+        json_dumps_params={"ensure_ascii": False},
+    )
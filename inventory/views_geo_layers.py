@@ -0,0 +1,134 @@
+# inventory/views_geo_layers.py
+"""
+Хилийн GeoJSON давхаргууд: /geo/layers/<name>.geojson?precision=4&v=<etag>
+
+- ETag = агуулгын hash + шахалтын дагавар ("<hash>", "<hash>-gzip", "<hash>-br"):
+  identity / gzip / br хувилбар өөр bytes тул strong ETag нь ялгаатай байна. If-None-Match таарвал 304.
+- v=<etag> бүхий (хувилбартай) URL -> 1 жилийн immutable кэш; v-гүй -> богино кэш + revalidate.
+- Accept-Encoding-ийн дагуу урьдчилан шахсан .br / .gz файлыг шууд өгнө.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.urls import reverse
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_GET
+
+from .geo.layers import GEO_LAYERS, LAYER_PRECISIONS, LayerVariant, get_layer_variant
+
+LAYER_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+LAYER_REVALIDATE_MAX_AGE = 300
+
+
+def _precision_param(request: HttpRequest) -> Optional[int]:
+    raw = (request.GET.get("precision") or "").strip().lower()
+    if raw in ("", "full"):
+        return None
+    try:
+        p = int(raw)
+    except ValueError:
+        raise Http404("Unknown precision")
+    if p not in LAYER_PRECISIONS:
+        raise Http404("Unknown precision")
+    return p
+
+
+def _accepted_encodings(request: HttpRequest) -> set:
+    out = set()
+    for part in (request.headers.get("Accept-Encoding") or "").split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if token:
+            out.add(token.strip().lower())
+    return out
+
+
+def _encoding_etag(etag: str, encoding: str) -> str:
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def _etag_matches(variant: LayerVariant, etags) -> bool:
+    """If-None-Match (weak comparison): хувилбарын аль нэг шахалтын ETag таарвал 304."""
+    ours = {_encoding_etag(variant.etag, enc) for enc in ("", *variant.encoded)}
+    return any(t.removeprefix("W/").strip('"') in ours for t in etags)
+
+
+def layer_url(variant: LayerVariant) -> str:
+    url = reverse("inventory:geo_layer", args=[variant.name])
+    prec = "full" if variant.precision is None else variant.precision
+    return f"{url}?precision={prec}&v={variant.etag}"
+
+
+def _variant_or_404(name: str, precision: Optional[int]) -> LayerVariant:
+    if name not in GEO_LAYERS:
+        raise Http404("Unknown layer")
+    try:
+        return get_layer_variant(Path(settings.BASE_DIR), name, precision)
+    except FileNotFoundError:
+        raise Http404("Layer source not found")
+
+
+@require_GET
+def geo_layer_view(request: HttpRequest, name: str) -> HttpResponse:
+    variant = _variant_or_404(name, _precision_param(request))
+    versioned = request.GET.get("v") == variant.etag
+    cache_control = (
+        f"public, max-age={LAYER_IMMUTABLE_MAX_AGE}, immutable"
+        if versioned
+        else f"public, max-age={LAYER_REVALIDATE_MAX_AGE}, must-revalidate"
+    )
+
+    accepted = _accepted_encodings(request)
+    encoding, fp = "", variant.path
+    for enc in ("br", "gzip"):
+        if enc in accepted and enc in variant.encoded and variant.encoded[enc].exists():
+            encoding, fp = enc, variant.encoded[enc]
+            break
+    etag = quote_etag(_encoding_etag(variant.etag, encoding))
+
+    inm = request.headers.get("If-None-Match")
+    if inm and (inm.strip() == "*" or _etag_matches(variant, parse_etags(inm))):
+        resp = HttpResponseNotModified()
+        resp["ETag"] = etag
+        resp["Cache-Control"] = cache_control
+        resp["Vary"] = "Accept-Encoding"
+        return resp
+
+    try:
+        f = fp.open("rb")
+    except FileNotFoundError:
+        raise Http404("Layer variant missing")
+    resp = FileResponse(f, content_type="application/geo+json; charset=utf-8")
+    if encoding:
+        resp["Content-Encoding"] = encoding
+    resp["ETag"] = etag
+    resp["Cache-Control"] = cache_control
+    resp["Vary"] = "Accept-Encoding"
+    return resp
+
+
+@require_GET
+def geo_layers_index_api(request: HttpRequest) -> JsonResponse:
+    """Давхарга бүрийн хувилбартай (immutable) URL болон хэмжээ (bytes)."""
+    layers = {}
+    for name in GEO_LAYERS:
+        variants = {}
+        for precision in LAYER_PRECISIONS:
+            try:
+                v = get_layer_variant(Path(settings.BASE_DIR), name, precision)
+            except FileNotFoundError:
+                break
+            variants["full" if precision is None else str(precision)] = {
+                "url": layer_url(v),
+                "etag": v.etag,
+                "bytes": {"identity": v.size(), **{enc: v.size(enc) for enc in v.encoded}},
+            }
+        if variants:
+            layers[name] = variants
+    return JsonResponse({"ok": True, "layers": layers}, json_dumps_params={"ensure_ascii": False})
@@ -0,0 +1,274 @@
+# inventory/views_map_api.py
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .geo.admin_units import AdminUnitMatcher
+from .geo.choropleth import CHOROPLETH_LEVELS, simplified_boundaries, zoom_tier
+from .geo.clustering import MAX_CLUSTER_ZOOM, cluster_points, clusters_to_json, grid_cell_size
+from .geo.tiles import parse_bbox
+from .station_tiles import TILE_MAX_ZOOM, station_tile_for_request
+from .map_data import (
+    MAP_CACHE_TTL,
+    choropleth_metrics,
+    filter_locations_bbox,
+    load_station_points,
+    map_cache_key,
+    map_scope,
+    nearest_stations,
+    scoped_map_locations,
+    station_points_for_request,
+)
+
+MAX_ZOOM = 22
+BBOX_MAX_ITEMS = 5000
+NEAREST_MAX_K = 500
+NEAREST_MAX_RADIUS_KM = 3000.0
+
+
+def _int_param(request: HttpRequest, key: str, default: int, lo: int, hi: int) -> int:
+    try:
+        v = int(request.GET.get(key, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be an integer")
+    return max(lo, min(hi, v))
+
+
+def _float_param(request: HttpRequest, key: str) -> float | None:
+    raw = (request.GET.get(key) or "").strip()
+    if not raw:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        raise ValueError(f"{key} must be a number")
+
+
+@require_GET
+@staff_member_required(login_url="/django-admin/login/")
+def map_clusters_api(request: HttpRequest):
+    """
+    GET /api/map/clusters/?z=6&bbox=min_lon,min_lat,max_lon,max_lat[&aimag=&sum=&location_type=]
+
+    Zoom бүрийн кластерыг (scope + шүүлтүүрээр) серверт grid-ээр тооцоолж кэшлэнэ;
+    bbox өгвөл зөвхөн харагдах хэсгийн кластеруудыг буцаана.
+    Response:
+      { ok, zoom, cell, total, clusters: [
+          {lat, lon, count, device_count, pending_total,
+           status: {ok, broken, empty}, id?, name?}, ... ] }
+    """
+    try:
+        zoom = _int_param(request, "z", 5, 0, MAX_ZOOM)
+        bbox = parse_bbox(request.GET.get("bbox"))
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    cz = min(zoom, MAX_CLUSTER_ZOOM)
+    key = map_cache_key(request, "clusters", cz)
+    items = cache.get(key)
+    if items is None:
+        pts = station_points_for_request(request)
+        clusters = cluster_points(pts.lons, pts.lats, pts.status, pts.device_count, pts.pending_total, cz)
+        items = clusters_to_json(clusters, pts.ids.tolist(), pts.names)
+        cache.set(key, items, MAP_CACHE_TTL)
+
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        visible = [c for c in items if min_lon <= c["lon"] <= max_lon and min_lat <= c["lat"] <= max_lat]
+    else:
+        visible = items
+
+    return JsonResponse(
+        {
+            "ok": True,
+            "zoom": zoom,
+            "cell": grid_cell_size(cz),
+            "total": sum(c["count"] for c in visible),
+            "clusters": visible,
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+@require_GET
+@staff_member_required(login_url="/django-admin/login/")
+def map_locations_bbox_api(request: HttpRequest):
+    """
+    GET /api/map/locations/?bbox=min_lon,min_lat,max_lon,max_lat[&aimag=&sum=&location_type=&limit=]
+
+    Зөвхөн харагдаж буй станцуудыг буцаана (Location.geohash индексээр шүүнэ),
+    ингэснээр газрын зураг pan хийх бүрт хэсэгчлэн ачаална.
+    Response:
+      { ok, count, truncated, items: [{id, name, type, lat, lon, status, device_count, pending_total}, ...] }
+    """
+    try:
+        bbox = parse_bbox(request.GET.get("bbox"))
+        limit = _int_param(request, "limit", BBOX_MAX_ITEMS, 1, BBOX_MAX_ITEMS)
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+    if not bbox:
+        return JsonResponse({"ok": False, "error": "bbox is required"}, status=400)
+
+    qs = filter_locations_bbox(scoped_map_locations(request), bbox)
+    ids = list(qs.order_by("pk").values_list("id", flat=True)[: limit + 1])
+    truncated = len(ids) > limit
+    pts = load_station_points(qs.model.objects.filter(id__in=ids[:limit]))
+
+    items = [pts.item(i) for i in range(len(pts))]
+    return JsonResponse(
+        {"ok": True, "count": len(items), "truncated": truncated, "items": items},
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+@require_GET
+@staff_member_required(login_url="/django-admin/login/")
+def map_nearest_api(request: HttpRequest):
+    """
+    GET /api/map/nearest/?lat=..&lon=..[&k=10][&radius_km=50][&aimag=&sum=&location_type=]
+    GET /api/map/nearest/?location_id=..[&k=..][&radius_km=..][&location_type=AWS]
+
+    Өгсөн цэг (эсвэл станц)-ээс хамгийн ойр k станц / радиус доторх станцууд.
+    location_id өгвөл тухайн станц өөрөө үр дүнд орохгүй.
+    Response:
+      { ok, origin: {lat, lon, location_id}, count,
+        items: [{id, name, type, lat, lon, distance_km, status, device_count, pending_total}, ...] }
+    """
+    from .admin import _scope_location_qs
+
+    try:
+        lat = _float_param(request, "lat")
+        lon = _float_param(request, "lon")
+        radius_km = _float_param(request, "radius_km")
+        # radius_km өгвөл k-г заагаагүй үед радиус доторх бүгдийг (NEAREST_MAX_K хүртэл) буцаана
+        k = _int_param(request, "k", 10 if radius_km is None else NEAREST_MAX_K, 1, NEAREST_MAX_K)
+        location_id = _int_param(request, "location_id", 0, 0, 2**63 - 1)
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    if location_id:
+        origin = (
+            _scope_location_qs(request)
+            .filter(id=location_id, latitude__isnull=False, longitude__isnull=False)
+            .values("latitude", "longitude")
+            .first()
+        )
+        if not origin:
+            return JsonResponse({"ok": False, "error": "location not found"}, status=404)
+        lat, lon = float(origin["latitude"]), float(origin["longitude"])
+    elif lat is None or lon is None:
+        return JsonResponse({"ok": False, "error": "lat/lon or location_id is required"}, status=400)
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return JsonResponse({"ok": False, "error": "lat/lon out of range"}, status=400)
+    if radius_km is not None:
+        radius_km = max(0.0, min(radius_km, NEAREST_MAX_RADIUS_KM))
+
+    items = nearest_stations(request, lon, lat, k=k, radius_km=radius_km, exclude_id=location_id or None)
+    return JsonResponse(
+        {
+            "ok": True,
+            "origin": {"lat": lat, "lon": lon, "location_id": location_id or None},
+            "count": len(items),
+            "items": items,
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+@require_GET
+@staff_member_required(login_url="/django-admin/login/")
+def map_choropleth_api(request: HttpRequest):
+    """
+    GET /api/map/choropleth/?level=aimag|sum&z=5[&aimag=]
+
+    Аймаг/сум бүрийн үзүүлэлтийг хилийн polygon-той нэгтгэсэн GeoJSON.
+    Polygon-ууд zoom tier бүрт нэг удаа хялбаршуулагдана (geo/choropleth.py),
+    бүтэн хариу нь scope + level + tier-ээр кэшлэгдэнэ.
+    Feature properties:
+      {id, name, aimag_id, device_count, broken_count, broken_share, expired_count, pending_total}
+    """
+    level = (request.GET.get("level") or "aimag").strip().lower()
+    if level not in CHOROPLETH_LEVELS:
+        return JsonResponse({"ok": False, "error": f"level must be one of {CHOROPLETH_LEVELS}"}, status=400)
+    try:
+        zoom = _int_param(request, "z", 5, 0, MAX_ZOOM)
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    tier = zoom_tier(zoom)
+    key = map_cache_key(request, "choropleth", level, tier)
+    payload = cache.get(key)
+    if payload is None:
+        try:
+            boundaries = simplified_boundaries(Path(settings.BASE_DIR), level, tier)
+        except FileNotFoundError:
+            return JsonResponse({"ok": False, "error": "boundary file not found"}, status=503)
+        payload = _build_choropleth(request, level, tier, boundaries)
+        cache.set(key, payload, MAP_CACHE_TTL)
+
+    return JsonResponse(payload, json_dumps_params={"ensure_ascii": False})
+
+
+def _build_choropleth(request: HttpRequest, level: str, tier: int, boundaries) -> dict:
+    from .models import Aimag, SumDuureg
+
+    metrics = choropleth_metrics(request, level)
+    matcher = AdminUnitMatcher.from_db()
+
+    # Scope / ?aimag= шүүлтүүрээр зөвхөн харагдах аймгуудыг үлдээнэ
+    scope = map_scope(request)
+    only_aimag = None if scope["all"] else scope["aimag_id"]
+    aimag_param = (request.GET.get("aimag") or "").strip()
+    if aimag_param.isdigit():
+        if only_aimag and int(aimag_param) != only_aimag:
+            return {"ok": True, "type": "FeatureCollection", "level": level, "tier": tier, "features": []}
+        only_aimag = int(aimag_param)
+
+    names = dict(
+        Aimag.objects.values_list("id", "name") if level == "aimag" else SumDuureg.objects.values_list("id", "name")
+    )
+    empty = {"device_count": 0, "broken_count": 0, "broken_share": 0.0, "expired_count": 0, "pending_total": 0}
+
+    features = []
+    for props, geometry in boundaries:
+        aimag_id, sum_id = matcher.match(props)
+        if (only_aimag or not scope["all"]) and aimag_id != only_aimag:
+            continue
+        unit_id = aimag_id if level == "aimag" else sum_id
+        fallback_name = props.get("aimag_name") if level == "aimag" else (props.get("sum_name") or props.get("name_mn"))
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": geometry,
+                "properties": {
+                    "id": unit_id,
+                    "name": names.get(unit_id) or fallback_name or "",
+                    "aimag_id": aimag_id,
+                    **metrics.get(unit_id, empty),
+                },
+            }
+        )
+    return {"ok": True, "type": "FeatureCollection", "level": level, "tier": tier, "features": features}
+
+
+@require_GET
+@staff_member_required(login_url="/django-admin/login/")
+def station_tile_mvt(request: HttpRequest, z: int, x: int, y: int):
+    """
+    GET /tiles/stations/{z}/{x}/{y}.mvt[?aimag=&sum=&location_type=]
+
+    Scope-той станцын давхарга (layer "stations") Mapbox Vector Tile хэлбэрээр.
+    Feature properties: id, name, type, status (ok/broken/empty), device_count, pending_total.
+    """
+    if z > TILE_MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise Http404("tile out of range")
+    data = station_tile_for_request(request, z, x, y)
+    resp = HttpResponse(data, content_type="application/vnd.mapbox-vector-tile")
+    resp["Cache-Control"] = "private, max-age=60"
+    return resp
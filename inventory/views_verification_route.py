@@ -0,0 +1,83 @@
+# inventory/views_verification_route.py
+from __future__ import annotations
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpRequest, JsonResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from .models import Location
+from .verification_route import ROUTE_DEFAULT_DAYS, plan_verification_route
+
+
+def _route_params(request: HttpRequest) -> dict:
+    """GET -> plan_verification_route kwargs; буруу утгад ValueError."""
+    g = request.GET
+
+    def _int(key, default):
+        raw = (g.get(key) or "").strip()
+        if not raw:
+            return default
+        try:
+            return int(raw)
+        except ValueError:
+            raise ValueError(f"{key} must be an integer")
+
+    def _bool(key, default):
+        raw = (g.get(key) or "").strip().lower()
+        if not raw:
+            return default
+        return raw in ("1", "true", "yes", "on")
+
+    params = {
+        "days": _int("days", ROUTE_DEFAULT_DAYS),
+        "include_expired": _bool("expired", True),
+        "start_location_id": _int("start_location", None),
+        "return_to_start": _bool("return", False),
+    }
+    lat, lon = (g.get("start_lat") or "").strip(), (g.get("start_lon") or "").strip()
+    if lat and lon and not params["start_location_id"]:
+        try:
+            params["start_lonlat"] = (float(lon), float(lat))
+        except ValueError:
+            raise ValueError("start_lat/start_lon must be numbers")
+    return params
+
+
+@require_GET
+@staff_member_required(login_url="/django-admin/login/")
+def verification_route_api(request: HttpRequest):
+    """
+    GET /api/map/verification-route/?days=30[&expired=1][&start_location=ID | &start_lat=&start_lon=]
+                                     [&return=1][&aimag=&sum=&location_type=]
+
+    Шалгалтын хугацаа дууссан / days хоногт дуусах багажтай станцуудыг
+    тойрох дараалал + алхам бүрийн зай (км).
+    """
+    try:
+        result = plan_verification_route(request, **_route_params(request))
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+    except Location.DoesNotExist as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=404)
+    return JsonResponse(result, json_dumps_params={"ensure_ascii": False})
+
+
+@require_GET
+@staff_member_required(login_url="/django-admin/login/")
+def verification_route_print_view(request: HttpRequest):
+    """Хэвлэх зориулалттай маршрутын хүснэгт (ижил GET параметрүүд)."""
+    error = ""
+    route = None
+    try:
+        route = plan_verification_route(request, **_route_params(request))
+    except (ValueError, Location.DoesNotExist) as e:
+        error = str(e)
+
+    ctx = {
+        "title": "Шалгалтын маршрут",
+        "route": route,
+        "error": error,
+        "query": request.GET.urlencode(),
+    }
+    return render(request, "admin/inventory/reports/verification_route.html", ctx)
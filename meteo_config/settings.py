@@ -53,6 +53,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # 0021-ийн хоёр салаа AuditEvent-ийг давхар үүсгэдэг тул тестийн DB-г
+        # migration-гүйгээр (model-уудаас шууд) үүсгэнэ
+        "TEST": {"MIGRATE": False},
     }
 }
 
@@ -86,6 +89,34 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# QR код / шошго / паспортод кодлох бүтэн URL-ийн үндэс (жишээ: https://meteo.example.mn).
+# Хоосон бол QR зурах үед ImproperlyConfigured (харьцангуй URL утсаар нээгдэхгүй).
+SITE_BASE_URL = os.environ.get("SITE_BASE_URL", "")
+
+# Django cache: газрын зургийн кэшийн version (inventory:map:version) болон NumPy
+# өгөгдлийг бүх worker хуваалцах ёстой — default LocMemCache процесс бүрт тусдаа тул
+# нэг worker-ийн bump бусдад хүрэхгүй. REDIS_URL өгвөл Redis (redis-py хэрэгтэй),
+# эс бөгөөс нэг серверийн бүх процессын хуваалцсан файл кэш.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / "var" / "django_cache",
+        }
+    }
+
+# Station MVT tile-ийн диск кэш — scope-той (аймгийн) tile-ууд тул MEDIA_ROOT/STATIC_ROOT-оос гадна
+STATION_TILE_CACHE_DIR = BASE_DIR / "var" / "tile_cache"
+# Хилийн GeoJSON-ийн WKB (pickle) кэш — static/ (collectstatic) дотор биш, вэбээр serve хийгдэхгүй хавтас
+GEOMETRY_CACHE_DIR = BASE_DIR / "var" / "geometry_cache"
+
 # =========================================================
 # JAZZMIN
 # =========================================================
@@ -198,3 +229,9 @@ X_FRAME_OPTIONS = "SAMEORIGIN"
 VERIF_DUE_30_DAYS = 30
 VERIF_DUE_90_DAYS = 90
 
+
+# ==================================================
+# Geo boundary indexes (static/data/*.geojson)
+# ==================================================
+# Worker эхлэхэд (AppConfig.ready) WKB кэшээс индексүүдийг ачаалах
+GEO_PRELOAD_ON_STARTUP = True